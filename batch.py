@@ -0,0 +1,9 @@
+# Standard library imports
+import sys
+
+# Local imports
+from interpreter.batch import main
+
+# Run a directory or manifest of scripts across a pool of processes; guarded, since the workers may import this module
+if (__name__ == '__main__'):
+    sys.exit(main())
@@ -0,0 +1 @@
+from .batch import *
\ No newline at end of file
@@ -0,0 +1,8 @@
+# Standard library imports
+import sys
+
+# Local imports
+from .batch import main
+
+if (__name__ == '__main__'):
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# Standard library imports
+import io
+import os
+import sys
+import json
+import time
+import signal
+import fnmatch
+import argparse
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TextIO
+
+# Local imports
+from ..lexer import FastLexer
+from ..parser.parser import Parser
+from ..optimizer import Optimizer
+from ..compiler import Compiler, Bytecode
+from ..vm import VirtualMachine, Limits, FunctionCache
+from ..errors import PseudocodeError, LimitExceededError
+
+# The seconds that a job can take to be compiled and run; the limits stop most runaway programs long before it
+DEFAULT_TIMEOUT: float = 10.0
+
+# The Limits that jobs are run with, unless they are given others
+DEFAULT_MAX_STEPS: int = 1000000
+DEFAULT_MAX_ARRAY_ELEMENTS: int = 10000000
+DEFAULT_MAX_STRING_LENGTH: int = (1 << 20)
+DEFAULT_MAX_OUTPUT: int = (1 << 20)
+
+DEFAULT_PATTERN: str = '*.pseudo'
+
+# How many times the pool is started again after a worker dies, before the jobs that are left are given up on
+MAX_POOL_RESTARTS: int = 3
+
+# What became of a job
+(STATUS_OK, STATUS_ERROR, STATUS_LIMIT_EXCEEDED, STATUS_TIMEOUT, STATUS_CRASHED) = ('ok', 'error', 'limit_exceeded', 'timeout', 'crashed')
+
+# Timeouts are enforced by the workers themselves, with an interval timer; the platforms that do not have one
+# run every job to the end
+TIMEOUTS_SUPPORTED: bool = hasattr(signal, 'setitimer')
+
+class Job:
+    def __init__(self, id: str, path: str, input: str = '') -> None:
+        self.id: str = id
+        self.path: str = path
+
+        # What the program's INPUT statements read
+        self.input: str = input
+
+# Raised from outside the program, so it derives from BaseException, which nothing in the VM catches
+class _Timeout(BaseException):
+    pass
+
+def default_limits() -> Limits:
+    return Limits(DEFAULT_MAX_STEPS, DEFAULT_MAX_ARRAY_ELEMENTS, DEFAULT_MAX_STRING_LENGTH, DEFAULT_MAX_OUTPUT)
+
+def _on_alarm(signum: int, frame: object) -> None:
+    raise _Timeout()
+
+def compile_source(source: str) -> Bytecode:
+    return Compiler().compile(Optimizer().optimize(Parser(FastLexer(source)).parse_program()))
+
+def run_source(source: str, input: str = '', timeout: (float | None) = DEFAULT_TIMEOUT, limits: (Limits | None) = None, memoize: (int | None) = None) -> dict[str, object]:
+    # Compiles and runs a program in the process that calls it, and describes what became of it: its status,
+    # output, error and timings. Only meant to be called from a worker process (or a process of its own),
+    # since it takes over SIGALRM.
+    # With memoize, the calls of pure FUNCTIONs go through a FunctionCache of that many entries, whose counts
+    # are added to the result
+    result: dict[str, object] = {'status': STATUS_OK, 'output': '', 'error': None, 'compile_seconds': None, 'run_seconds': None}
+    function_cache: (FunctionCache | None) = None if (memoize is None) else FunctionCache(memoize)
+    output: io.StringIO = io.StringIO()
+    start: float = time.perf_counter()
+    try:
+        try:
+            if (TIMEOUTS_SUPPORTED and timeout):
+                signal.signal(signal.SIGALRM, _on_alarm)
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+
+            bytecode: Bytecode = compile_source(source)
+            compiled: float = time.perf_counter()
+            result['compile_seconds'] = compiled - start
+
+            try:
+                VirtualMachine(io.StringIO(input), output, interactive=False, limits=(default_limits() if (limits is None) else limits), function_cache=function_cache).run(bytecode)
+            finally:
+                result['run_seconds'] = time.perf_counter() - compiled
+                if (function_cache is not None):
+                    result['function_cache'] = function_cache.stats()
+        finally:
+            # Inside the handlers below, so that a timer that goes off just as the program ends is still handled
+            if (TIMEOUTS_SUPPORTED and timeout):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except _Timeout:
+        (result['status'], result['error']) = (STATUS_TIMEOUT, f'took longer than {timeout:g} seconds')
+    except LimitExceededError as error:
+        (result['status'], result['error']) = (STATUS_LIMIT_EXCEEDED, str(error))
+    except PseudocodeError as error:
+        (result['status'], result['error']) = (STATUS_ERROR, str(error))
+    except Exception as error:
+        # Anything else is a fault of the interpreter rather than of the program
+        (result['status'], result['error']) = (STATUS_CRASHED, f'{type(error).__name__}: {error}')
+    result['output'] = output.getvalue()
+    result['total_seconds'] = time.perf_counter() - start
+    return result
+
+def run_job(job: Job, timeout: (float | None) = DEFAULT_TIMEOUT, limits: (Limits | None) = None, memoize: (int | None) = None) -> dict[str, object]:
+    # What became of a job, in the shape of a line of the results
+    try:
+        with open(job.path, 'r', encoding='utf-8') as file:
+            source: str = file.read()
+    except OSError as error:
+        return {'id': job.id, 'path': job.path, 'status': STATUS_ERROR, 'output': '', 'error': f'cannot read {repr(job.path)}: {error.strerror or error}', 'compile_seconds': None, 'run_seconds': None, 'total_seconds': None}
+    return {'id': job.id, 'path': job.path} | run_source(source, job.input, timeout, limits, memoize)
+
+def find_jobs(path: str, pattern: str = DEFAULT_PATTERN) -> list[Job]:
+    # The jobs of a directory (every file below it that matches the pattern, in a stable order) or of a
+    # manifest. Each line of a manifest is either the path of a script, or a JSON object with a "path", and
+    # optionally an "id" and an "input"; paths are relative to the manifest
+    if (os.path.isdir(path)):
+        paths: list[str] = []
+        for directory, directories, files in os.walk(path):
+            directories.sort()
+            paths.extend(os.path.join(directory, file) for file in sorted(files) if (fnmatch.fnmatch(file, pattern)))
+        return [Job(os.path.relpath(script, path), script) for script in paths]
+
+    jobs: list[Job] = []
+    base: str = os.path.dirname(path)
+    with open(path, 'r', encoding='utf-8') as file:
+        for number, line in enumerate(file, 1):
+            line = line.strip()
+            if (not line):
+                continue
+            if (not line.startswith('{')):
+                jobs.append(Job(line, os.path.join(base, line)))
+                continue
+            try:
+                entry: object = json.loads(line)
+                if ((type(entry) is not dict) or (type(entry.get('path')) is not str)):
+                    raise ValueError('expected an object with a "path"')
+                jobs.append(Job(str(entry.get('id', entry['path'])), os.path.join(base, entry['path']), str(entry.get('input', ''))))
+            except ValueError as error:
+                raise ValueError(f'{path}, line {number}: {error}') from None
+    return jobs
+
+def run_batch(jobs: list[Job], results: TextIO, workers: (int | None) = None, timeout: (float | None) = DEFAULT_TIMEOUT, limits: (Limits | None) = None, memoize: (int | None) = None) -> dict[str, int]:
+    # Runs the jobs across a pool of worker processes, and writes a line of JSON to results for each of them
+    # as it finishes, so the results are in the order the jobs finish in. Returns how many jobs ended with
+    # each status.
+    # A worker that dies (rather than a job failing) takes the pool down with it, so the jobs that had not
+    # finished are run again in a new pool, up to MAX_POOL_RESTARTS times
+    counts: dict[str, int] = {}
+
+    def report(result: dict[str, object]) -> None:
+        results.write(json.dumps(result) + '\n')
+        results.flush()
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    pending: list[Job] = jobs
+    restarts: int = 0
+    while (pending):
+        unfinished: list[Job] = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures: dict[Future, Job] = {executor.submit(run_job, job, timeout, limits, memoize): job for job in pending}
+            for future in as_completed(futures):
+                try:
+                    report(future.result())
+                except BrokenProcessPool:
+                    unfinished.append(futures[future])
+
+        if (unfinished and (restarts == MAX_POOL_RESTARTS)):
+            for job in unfinished:
+                report({'id': job.id, 'path': job.path, 'status': STATUS_CRASHED, 'output': '', 'error': 'the worker running it died', 'compile_seconds': None, 'run_seconds': None, 'total_seconds': None})
+            break
+        restarts += 1
+        pending = unfinished
+    return counts
+
+def add_limit_arguments(parser: argparse.ArgumentParser) -> None:
+    # The options of the Limits that programs are run with, shared by every command that runs them
+    parser.add_argument('--max-steps', type=int, default=DEFAULT_MAX_STEPS, help=f'the loop iterations and subroutine calls that each script can make (default: {DEFAULT_MAX_STEPS})')
+    parser.add_argument('--max-array-elements', type=int, default=DEFAULT_MAX_ARRAY_ELEMENTS, help=f'the elements that an array can have (default: {DEFAULT_MAX_ARRAY_ELEMENTS})')
+    parser.add_argument('--max-string-length', type=int, default=DEFAULT_MAX_STRING_LENGTH, help=f'the characters that a STRING can have (default: {DEFAULT_MAX_STRING_LENGTH})')
+    parser.add_argument('--max-output', type=int, default=DEFAULT_MAX_OUTPUT, help=f'the characters that each script can output, to the console and to files (default: {DEFAULT_MAX_OUTPUT})')
+
+def limits_from_arguments(options: argparse.Namespace) -> Limits:
+    return Limits(options.max_steps, options.max_array_elements, options.max_string_length, options.max_output)
+
+def main(arguments: (list[str] | None) = None) -> int:
+    parser = argparse.ArgumentParser(description='Runs many pseudocode scripts across a pool of processes, and writes what became of each one as a line of JSON.')
+    parser.add_argument('path', help='a directory of scripts, or a manifest with a path (or a JSON object with a "path", and optionally an "id" and an "input") on each line')
+    parser.add_argument('-o', '--output', metavar='PATH', help='where to write the results (default: standard output)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='how many worker processes to run (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help=f'the seconds that each script can take; 0 for no limit (default: {DEFAULT_TIMEOUT:g})')
+    add_limit_arguments(parser)
+    parser.add_argument('--memoize', type=int, metavar='ENTRIES', default=None, help="remember the values of up to this many calls of pure FUNCTIONs, and answer calls with the same arguments from them; results then report the cache's hits, misses and uncacheable calls (default: every call is made)")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN, help=f'the scripts to run in a directory (default: {DEFAULT_PATTERN})')
+    options = parser.parse_args(arguments)
+
+    if ((options.jobs is not None) and (options.jobs < 1)):
+        parser.error('--jobs must be at least 1')
+    if ((options.memoize is not None) and (options.memoize < 1)):
+        parser.error('--memoize must be at least 1')
+    if (options.timeout and (not TIMEOUTS_SUPPORTED)):
+        print('warning: timeouts are not supported on this platform, so every script is run to the end', file=sys.stderr)
+
+    try:
+        jobs: list[Job] = find_jobs(options.path, options.pattern)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    limits: Limits = limits_from_arguments(options)
+    start: float = time.perf_counter()
+    if (options.output):
+        with open(options.output, 'w', encoding='utf-8') as results:
+            counts: dict[str, int] = run_batch(jobs, results, options.jobs, options.timeout, limits, options.memoize)
+    else:
+        counts = run_batch(jobs, sys.stdout, options.jobs, options.timeout, limits, options.memoize)
+
+    summary: str = ', '.join(f'{count} {status}' for status, count in sorted(counts.items()))
+    print(f"{len(jobs)} scripts in {time.perf_counter() - start:.2f} seconds{': ' + summary if (summary) else ''}", file=sys.stderr)
+    return 0
@@ -0,0 +1,2 @@
+from .corpus import *
+from .benchmark import *
\ No newline at end of file
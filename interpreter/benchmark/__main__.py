@@ -0,0 +1,51 @@
+# Standard library imports
+import sys
+import argparse
+
+# Local imports
+from .corpus import GENERATORS, generate_corpus, write_corpus
+from .benchmark import DEFAULT_TOLERANCE, run_benchmarks, write_results, read_results, compare_results, format_results
+
+def main(arguments: (list[str] | None) = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m interpreter.benchmark', description='Benchmarks the interpreter on a generated corpus of pseudocode programs.')
+    parser.add_argument('--scale', type=int, default=1, help='how large the generated programs are (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='the seed that the programs are generated from (default: 0)')
+    parser.add_argument('--repeat', type=int, default=5, help='how many times each stage is timed; the fastest time is kept (default: 5)')
+    parser.add_argument('--kind', action='append', choices=list(GENERATORS), help='a kind of program to benchmark; may be given more than once (default: all of them)')
+    parser.add_argument('--output', metavar='PATH', help='where to write the results, as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='results to compare against; any regression makes the exit status 1')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help=f'how much worse than the baseline a metric can be (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--write-corpus', metavar='DIRECTORY', help='write the generated programs to the directory, and exit')
+    options = parser.parse_args(arguments)
+
+    if (options.scale < 1):
+        parser.error('--scale must be at least 1')
+    if (options.repeat < 1):
+        parser.error('--repeat must be at least 1')
+
+    programs = generate_corpus(options.scale, options.seed, options.kind)
+    if (options.write_corpus):
+        for path in write_corpus(programs, options.write_corpus):
+            print(path)
+        return 0
+
+    results = run_benchmarks(programs, options.repeat, options.scale, options.seed)
+    print(format_results(results))
+    if (options.output):
+        write_results(results, options.output)
+
+    if (options.baseline):
+        try:
+            regressions = compare_results(results, read_results(options.baseline), options.tolerance)
+        except (OSError, ValueError, KeyError) as error:
+            parser.error(f'cannot compare against {options.baseline}: {error}')
+        if (regressions):
+            print(f'\n{len(regressions)} regression(s) against {options.baseline}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'\nno regressions against {options.baseline}')
+    return 0
+
+if (__name__ == '__main__'):
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# Standard library imports
+import io
+import json
+import time
+import platform
+import tracemalloc
+from typing import Callable
+
+# Local imports
+from .. import __version__
+from ..token import TokenType, TokenStream
+from ..lexer import Lexer, FastLexer, lex
+from ..parser.parser import Parser
+from ..parser.ast import Node, ParsedProgram, node_fields
+from ..optimizer import Optimizer
+from ..compiler import Compiler, Bytecode
+from ..vm import VirtualMachine
+from .corpus import Program
+
+# The metrics that are better the higher they are, and those that are better the lower they are
+THROUGHPUT_METRICS: tuple[str, ...] = ('lexer_tokens_per_second', 'fast_lexer_tokens_per_second', 'parser_nodes_per_second', 'statements_per_second')
+FOOTPRINT_METRICS: tuple[str, ...] = ('peak_memory_bytes',)
+
+# How far a metric can be from the baseline, in the direction that is worse, before it counts as a regression.
+# Timings vary by a few percent from one run to the next, even on a quiet machine
+DEFAULT_TOLERANCE: float = 0.1
+
+def count_nodes(node: object) -> int:
+    # The number of AST nodes in the tree below (and including) node; tokens are not nodes
+    count: int = 0
+    pending: list[object] = [node]
+    while (pending):
+        item: object = pending.pop()
+        if (isinstance(item, Node)):
+            count += 1
+            pending.extend(getattr(item, field) for field in node_fields(type(item)))
+        elif (isinstance(item, (list, tuple))):
+            pending.extend(item)
+    return count
+
+def _best_time(function: Callable[[], object], repeat: int) -> float:
+    # The fastest of repeat runs, which is the one that the rest of the machine got in the way of the least
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _lex_with_lexer(source: str) -> int:
+    lexer: Lexer = Lexer(source)
+    count: int = 1
+    while (lexer.get_next_token().type != TokenType.EOF):
+        count += 1
+    return count
+
+def _compile(parsed_program: ParsedProgram) -> Bytecode:
+    return Compiler().compile(Optimizer().optimize(parsed_program))
+
+def _execute(bytecode: Bytecode) -> None:
+    # Output is kept in memory, so that it is the interpreter that is measured rather than the terminal
+    VirtualMachine(io.StringIO(), io.StringIO(), interactive=False).run(bytecode)
+
+def _peak_memory(source: str) -> int:
+    # The most memory that was allocated at once over every stage, from lexing to the end of the run. Tracing
+    # slows everything down, so this is a separate run from those that are timed
+    tracemalloc.start()
+    try:
+        _execute(_compile(Parser(FastLexer(source)).parse_program()))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _per_second(count: int, seconds: float) -> float:
+    return (count / seconds) if (seconds > 0) else 0.0
+
+def benchmark_program(program: Program, repeat: int = 5) -> dict[str, (int | float)]:
+    # The metrics of every stage of the interpreter for the program. Each stage is timed on its own, from
+    # the output of the one before it
+    source: str = program.source
+
+    tokens: int = len(lex(source))
+    parsed_program: ParsedProgram = Parser(FastLexer(source)).parse_program()
+    nodes: int = count_nodes(parsed_program)
+    bytecode: Bytecode = _compile(parsed_program)
+
+    # Lexed up front, so that the parser is timed on its own
+    stream: TokenStream = lex(source)
+
+    return {
+        'source_bytes': len(source.encode('utf-8')),
+        'tokens': tokens,
+        'nodes': nodes,
+        'executed_statements': program.executed_statements,
+        'lexer_tokens_per_second': _per_second(tokens, _best_time(lambda: _lex_with_lexer(source), repeat)),
+        'fast_lexer_tokens_per_second': _per_second(tokens, _best_time(lambda: lex(source), repeat)),
+        'parser_nodes_per_second': _per_second(nodes, _best_time(lambda: Parser(FastLexer(stream)).parse_program(), repeat)),
+        'statements_per_second': _per_second(program.executed_statements, _best_time(lambda: _execute(bytecode), repeat)),
+        'peak_memory_bytes': _peak_memory(source),
+    }
+
+def run_benchmarks(programs: list[Program], repeat: int = 5, scale: (int | None) = None, seed: (int | None) = None) -> dict[str, object]:
+    # The results of every program, along with what they were measured with, in the layout that is written
+    # out as JSON and compared against a baseline
+    return {
+        'interpreter_version': __version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'scale': scale,
+        'seed': seed,
+        'repeat': repeat,
+        'programs': {program.name: benchmark_program(program, repeat) for program in programs},
+    }
+
+def write_results(results: dict[str, object], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+        file.write('\n')
+
+def read_results(path: str) -> dict[str, object]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+class Regression:
+    def __init__(self, program: str, metric: str, baseline: float, current: float) -> None:
+        self.program: str = program
+        self.metric: str = metric
+        self.baseline: float = baseline
+        self.current: float = current
+
+    @property
+    def change(self) -> float:
+        # The relative change from the baseline; negative for throughput regressions, positive for footprint ones
+        return ((self.current - self.baseline) / self.baseline) if (self.baseline) else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.program}: {self.metric} went from {self.baseline:.6g} to {self.current:.6g} ({self.change:+.1%})'
+
+def compare_results(results: dict[str, object], baseline: dict[str, object], tolerance: float = DEFAULT_TOLERANCE) -> list[Regression]:
+    # Every metric that is worse than it is in the baseline by more than the tolerance. Programs that are
+    # only in one of the two are skipped, as are runs at a different scale, which are not comparable
+    if (results.get('scale') != baseline.get('scale')):
+        raise ValueError(f"the results are at scale {results.get('scale')}, but the baseline is at scale {baseline.get('scale')}")
+
+    regressions: list[Regression] = []
+    for name, metrics in results['programs'].items():
+        baseline_metrics: (dict[str, float] | None) = baseline['programs'].get(name)
+        if (baseline_metrics is None):
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if ((metric in baseline_metrics) and (metrics[metric] < baseline_metrics[metric] * (1 - tolerance))):
+                regressions.append(Regression(name, metric, baseline_metrics[metric], metrics[metric]))
+        for metric in FOOTPRINT_METRICS:
+            if ((metric in baseline_metrics) and (metrics[metric] > baseline_metrics[metric] * (1 + tolerance))):
+                regressions.append(Regression(name, metric, baseline_metrics[metric], metrics[metric]))
+    return regressions
+
+def format_results(results: dict[str, object]) -> str:
+    # A table of the results, one row per program
+    columns: tuple[tuple[str, str, (str | None)], ...] = (
+        ('tokens', 'tokens', '{:,}'),
+        ('nodes', 'nodes', '{:,}'),
+        ('lexer_tokens_per_second', 'lexer tok/s', '{:,.0f}'),
+        ('fast_lexer_tokens_per_second', 'fast lexer tok/s', '{:,.0f}'),
+        ('parser_nodes_per_second', 'parser nodes/s', '{:,.0f}'),
+        ('statements_per_second', 'statements/s', '{:,.0f}'),
+        ('peak_memory_bytes', 'peak KiB', None),
+    )
+    rows: list[list[str]] = [['program'] + [heading for _, heading, _ in columns]]
+    for name, metrics in results['programs'].items():
+        row: list[str] = [name]
+        for metric, _, template in columns:
+            row.append(template.format(metrics[metric]) if (template) else f'{metrics[metric] / 1024:,.0f}')
+        rows.append(row)
+
+    widths: list[int] = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    return '\n'.join(
+        '  '.join((cell.ljust(width) if (index == 0) else cell.rjust(width)) for index, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
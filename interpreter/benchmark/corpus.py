@@ -0,0 +1,156 @@
+# Standard library imports
+import os
+import random
+from typing import Callable
+
+class Program:
+    # A generated program, along with how many statements it executes when it is run (an IF counts as one, as
+    # does every statement of the branch that it takes), which the generator works out as it writes the program
+    def __init__(self, name: str, source: str, executed_statements: int) -> None:
+        self.name: str = name
+        self.source: str = source
+        self.executed_statements: int = executed_statements
+
+class _Writer:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.executed: int = 0
+        self._indentation: int = 0
+
+    def line(self, text: str, executed: bool = True) -> None:
+        self.lines.append(('    ' * self._indentation) + text)
+        self.executed += int(executed)
+
+    def indent(self) -> None:
+        self._indentation += 1
+
+    def dedent(self) -> None:
+        self._indentation -= 1
+
+    def program(self, name: str) -> Program:
+        return Program(name, '\n'.join(self.lines) + '\n', self.executed)
+
+# Every INTEGER that the generated programs compute is kept under this, so that the programs measure the
+# interpreter rather than arbitrary-precision arithmetic
+_MODULUS: int = 1009
+
+def _deep_expression(rng: random.Random, depth: int, variables: list[str]) -> str:
+    # Nests the arithmetic operators (and parentheses) depth deep; always an INTEGER, never a division by zero
+    if (depth == 0):
+        return rng.choice(variables) if (rng.random() < 0.6) else str(rng.randint(1, 99))
+    inner: str = _deep_expression(rng, depth - 1, variables)
+    operand: str = _deep_expression(rng, rng.randint(0, min(2, depth - 1)), variables)
+    match(rng.randrange(4)):
+        case 0:
+            return f'({inner} + {operand}) MOD {_MODULUS}'
+        case 1:
+            return f'({inner} - {operand} + {_MODULUS}) MOD {_MODULUS}'
+        case 2:
+            return f'({inner} * {operand}) MOD {_MODULUS}'
+    return f'(-{inner} + {operand} * 2) MOD {_MODULUS}'
+
+def deep_expressions(scale: int, rng: random.Random) -> Program:
+    # Assignments of deeply nested arithmetic expressions
+    writer: _Writer = _Writer()
+    variables: list[str] = [f'v{index}' for index in range(8)]
+    for index, variable in enumerate(variables):
+        writer.line(f'DECLARE {variable} : INTEGER')
+        writer.line(f'{variable} <- {index + 1}')
+    for _ in range(40 * scale):
+        writer.line(f'{rng.choice(variables)} <- {_deep_expression(rng, rng.randint(8, 16), variables)}')
+    writer.line(f"OUTPUT {', '.join(variables)}")
+    return writer.program('deep_expressions')
+
+def long_outputs(scale: int, rng: random.Random) -> Program:
+    # OUTPUT statements of many values each, of every datatype, and '&' chains
+    writer: _Writer = _Writer()
+    writer.line('DECLARE name : STRING')
+    writer.line('name <- "pseudocode"')
+    writer.line('DECLARE count : INTEGER')
+    writer.line('count <- 42')
+    writer.line('DECLARE ratio : REAL')
+    writer.line('ratio <- 0.25')
+    values: tuple[str, ...] = ('name', 'count', 'ratio', '"text"', "'c'", '17', '3.5', 'TRUE', 'D"17/08/2023"', 'count * 2', 'name & "!" & name', '", "')
+    for _ in range(60 * scale):
+        writer.line(f"OUTPUT {', '.join(rng.choice(values) for _ in range(rng.randint(20, 60)))}")
+    return writer.program('long_outputs')
+
+def _nested_if(writer: _Writer, rng: random.Random, depth: int, flags: list[tuple[str, bool]], executed: bool) -> None:
+    # An IF, followed by one on the opposite condition, which stands in for an ELSE
+    flag, value = rng.choice(flags)
+    negated: bool = (rng.random() < 0.5)
+    taken: bool = (value != negated)
+    for condition, branch_taken in ((f"{'NOT ' if (negated) else ''}{flag}", taken), (f"{'' if (negated) else 'NOT '}{flag}", (not taken))):
+        writer.line(f'IF {condition} THEN', executed)
+        writer.indent()
+        writer.line(f'total <- (total * 3 + {depth}) MOD {_MODULUS}', (executed and branch_taken))
+        if ((depth > 1) and (branch_taken or (rng.random() < 0.5))):
+            _nested_if(writer, rng, depth - 1, flags, (executed and branch_taken))
+        writer.dedent()
+        writer.line('ENDIF', False)
+
+def nested_ifs(scale: int, rng: random.Random) -> Program:
+    # IF blocks nested several deep, on BOOLEAN variables whose values the generator knows
+    writer: _Writer = _Writer()
+    flags: list[tuple[str, bool]] = [(f'flag{index}', (rng.random() < 0.5)) for index in range(6)]
+    for flag, value in flags:
+        writer.line(f'DECLARE {flag} : BOOLEAN')
+        writer.line(f"{flag} <- {'TRUE' if (value) else 'FALSE'}")
+    writer.line('DECLARE total : INTEGER')
+    writer.line('total <- 0')
+    for _ in range(12 * scale):
+        _nested_if(writer, rng, rng.randint(3, 8), flags, True)
+    writer.line('OUTPUT total')
+    return writer.program('nested_ifs')
+
+def big_arrays(scale: int, rng: random.Random) -> Program:
+    # Large array declarations (some too large to be allocated up front), and reads and writes of their elements
+    writer: _Writer = _Writer()
+    writer.line('DECLARE size : INTEGER')
+    writer.line(f'size <- {100 * scale}')
+    writer.line('DECLARE grid : ARRAY[1:500, 1:500] OF INTEGER')
+    writer.line('DECLARE cube : ARRAY[1:size, 1:size, 1:size] OF REAL')
+    writer.line('DECLARE flags : ARRAY[1:size] OF BOOLEAN')
+    writer.line('DECLARE names : ARRAY[1:size] OF STRING')
+    for _ in range(150 * scale):
+        i: int = rng.randint(1, 500)
+        j: int = rng.randint(1, 500)
+        k: int = rng.randint(1, 100 * scale)
+        match(rng.randrange(4)):
+            case 0:
+                writer.line(f'grid[{i}, {j}] <- (grid[{j}, {i}] + {k}) MOD {_MODULUS}')
+            case 1:
+                writer.line(f'cube[{k}, {rng.randint(1, 100 * scale)}, size] <- grid[{i}, {j}] / 2')
+            case 2:
+                writer.line(f'flags[{k}] <- NOT flags[size - {k} + 1]')
+            case 3:
+                writer.line(f'names[{k}] <- names[{k}] & "{chr(97 + (k % 26))}"')
+    writer.line('OUTPUT grid[1, 1], cube[1, 1, size], flags[1], names[1]')
+    return writer.program('big_arrays')
+
+# Every kind of program that the corpus has, by name
+GENERATORS: dict[str, Callable[[int, random.Random], Program]] = {
+    'deep_expressions': deep_expressions,
+    'long_outputs': long_outputs,
+    'nested_ifs': nested_ifs,
+    'big_arrays': big_arrays,
+}
+
+def generate_corpus(scale: int = 1, seed: int = 0, kinds: (list[str] | None) = None) -> list[Program]:
+    # The same scale and seed always give the same programs, so that runs of the benchmark can be compared
+    programs: list[Program] = []
+    for kind in (kinds or list(GENERATORS)):
+        if (kind not in GENERATORS):
+            raise ValueError(f"unknown kind of program {repr(kind)}; expected one of {', '.join(GENERATORS)}")
+        programs.append(GENERATORS[kind](scale, random.Random(f'{kind}/{seed}')))
+    return programs
+
+def write_corpus(programs: list[Program], directory: str) -> list[str]:
+    os.makedirs(directory, exist_ok=True)
+    paths: list[str] = []
+    for program in programs:
+        path: str = os.path.join(directory, program.name + '.pseudo')
+        with open(path, 'w', encoding='utf-8', newline='\n') as file:
+            file.write(program.source)
+        paths.append(path)
+    return paths
@@ -0,0 +1 @@
+from .program_cache import *
\ No newline at end of file
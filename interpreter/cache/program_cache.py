@@ -0,0 +1,130 @@
+# Standard library imports
+import hashlib, mmap, os, pickle, tempfile
+from collections import OrderedDict
+
+# Local imports
+from .. import __version__
+from ..lexer import FastLexer, StreamingLexer
+from ..parser.parser import Parser
+from ..optimizer import Optimizer
+from ..compiler import Compiler, Bytecode
+
+DEFAULT_CACHE_DIRECTORY: str = os.path.join(os.path.expanduser('~'), '.cache', 'al-pseudocode-interpreter')
+DEFAULT_MEMORY_LIMIT: int = (32 << 20)
+
+# Whatever goes wrong while reading a cache file, it is treated as a miss
+_CACHE_FILE_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError)
+
+class ProgramCache:
+    # Compiled programs, keyed by a hash of their source and the interpreter version, in two tiers: an in-process
+    # LRU that evicts once the (pickled) size of its entries goes over memory_limit, and a directory of pickled
+    # Bytecode that outlives the process, much like .pyc files. A hit skips lexing and parsing altogether.
+    # directory=None keeps the cache in memory only
+    def __init__(self, directory: (str | None) = DEFAULT_CACHE_DIRECTORY, memory_limit: int = DEFAULT_MEMORY_LIMIT) -> None:
+        self.directory: (str | None) = directory
+        self.memory_limit: int = memory_limit
+
+        # key -> (bytecode, size), least recently used first
+        self._entries: OrderedDict[str, tuple[Bytecode, int]] = OrderedDict()
+        self._memory_size: int = 0
+
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def key(source: (str | bytes | mmap.mmap)) -> str:
+        digest = hashlib.sha256(__version__.encode('utf-8') + b'\0')
+        digest.update(source.encode('utf-8') if (isinstance(source, str)) else source)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[0:2], key + '.pickle')
+
+    def _remember(self, key: str, bytecode: Bytecode, size: int) -> None:
+        if (size > self.memory_limit):
+            return
+
+        self._entries[key] = (bytecode, size)
+        self._memory_size += size
+
+        while (self._memory_size > self.memory_limit):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._memory_size -= evicted_size
+
+    def _lookup(self, key: str) -> (Bytecode | None):
+        entry: (tuple[Bytecode, int] | None) = self._entries.get(key)
+        if (entry is not None):
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return entry[0]
+
+        if (self.directory is None):
+            return None
+
+        try:
+            with open(self._path(key), 'rb') as file:
+                data: bytes = file.read()
+            bytecode: Bytecode = pickle.loads(data)
+        except _CACHE_FILE_ERRORS:
+            return None
+        if (type(bytecode) is not Bytecode):
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, bytecode, len(data))
+        return bytecode
+
+    def _store(self, key: str, bytecode: Bytecode) -> None:
+        data: bytes = pickle.dumps(bytecode, pickle.HIGHEST_PROTOCOL)
+        self._remember(key, bytecode, len(data))
+
+        if (self.directory is None):
+            return
+
+        # Written to a temporary file first, so that other processes never read a partially written entry
+        path: str = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as file:
+                    file.write(data)
+                os.replace(temporary_path, path)
+            except OSError:
+                os.unlink(temporary_path)
+                raise
+        except OSError:
+            # A cache that cannot be written to is only slower
+            pass
+
+    def load(self, source: str) -> Bytecode:
+        # The compiled program for the source; errors in the source are raised as usual, and are not cached
+        key: str = self.key(source)
+        bytecode: (Bytecode | None) = self._lookup(key)
+        if (bytecode is None):
+            self.misses += 1
+            bytecode = Compiler().compile(Optimizer().optimize(Parser(FastLexer(source)).parse_program()))
+            self._store(key, bytecode)
+        return bytecode
+
+    def load_file(self, path: (str | os.PathLike)) -> Bytecode:
+        # Like load(), for the script at the given path; the file is memory-mapped, so it is hashed and (on a
+        # miss) lexed without reading it into memory first
+        with open(path, 'rb') as file:
+            if (os.fstat(file.fileno()).st_size == 0):
+                return self.load('')
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                key: str = self.key(mapping)
+                bytecode: (Bytecode | None) = self._lookup(key)
+                if (bytecode is None):
+                    self.misses += 1
+                    bytecode = Compiler().compile(Optimizer().optimize(Parser(StreamingLexer(mapping)).parse_program()))
+                    self._store(key, bytecode)
+                return bytecode
+
+    def clear(self) -> None:
+        # Empties the in-process tier only; cache files are left alone
+        self._entries.clear()
+        self._memory_size = 0
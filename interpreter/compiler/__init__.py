@@ -0,0 +1,3 @@
+from .opcodes import *
+from .bytecode import *
+from .compiler import *
\ No newline at end of file
@@ -0,0 +1,87 @@
+# Local imports
+from ..files import FILE_MODES
+from .opcodes import Opcode, BINARY_OPERATIONS, UNARY_OPERATIONS, SCOPE_GLOBAL
+
+class Bytecode:
+    def __init__(self, code: list[int], constants: list[object], names: list[str], positions: list[tuple[int, int]], subroutines: (list['Subroutine'] | None) = None, global_names: (list[str] | None) = None) -> None:
+        # Flat list of (opcode, argument) pairs; the instruction at code offset n is code[n], code[n + 1]
+        self.code: list[int] = code
+
+        self.constants: list[object] = constants
+
+        # The identifier in every slot of the scope that the code runs in, and in those of the main program
+        self.names: list[str] = names
+        self.global_names: list[str] = names if (global_names is None) else global_names
+
+        # Line table: (line, column) of the source token that each instruction was compiled from,
+        # indexed by (code offset // 2)
+        self.positions: list[tuple[int, int]] = positions
+
+        # Every PROCEDURE and FUNCTION of the program, indexed by the argument of CALL instructions; the main
+        # program and all the subroutines share the same list
+        self.subroutines: list[Subroutine] = [] if (subroutines is None) else subroutines
+
+    def position(self, offset: int) -> tuple[int, int]:
+        return self.positions[offset // 2]
+
+    def _describe_argument(self, opcode: Opcode, argument: int) -> str:
+        match(opcode):
+            case Opcode.LOAD_CONST | Opcode.DECLARE_ARRAY | Opcode.DECLARE_STATIC_ARRAY:
+                return repr(self.constants[argument])
+            case Opcode.DECLARE | Opcode.DECLARE_RECORD:
+                slot, datatype = self.constants[argument]
+                return f'{self.names[slot]} : {datatype}'
+            case Opcode.LOAD_FIELD | Opcode.STORE_FIELD:
+                return self.constants[argument]
+            case Opcode.LOAD_REFERENCE | Opcode.LOAD_BUFFER | Opcode.STORE_BUFFER | Opcode.INPUT | Opcode.READ_FILE:
+                scope, slot = self.constants[argument]
+                return (self.global_names if (scope == SCOPE_GLOBAL) else self.names)[slot]
+            case Opcode.LOAD_LOCAL | Opcode.STORE_LOCAL | Opcode.DECLARE_CONSTANT | Opcode.LOAD_DEREF | Opcode.STORE_DEREF | Opcode.SAVE_TEMPORARY | Opcode.LOAD_TEMPORARY:
+                return self.names[argument]
+            case Opcode.LOAD_GLOBAL | Opcode.STORE_GLOBAL:
+                return self.global_names[argument]
+            case Opcode.CALL:
+                return self.subroutines[argument].name
+            case Opcode.BINARY_OP:
+                return BINARY_OPERATIONS[argument].value
+            case Opcode.UNARY_OP:
+                return UNARY_OPERATIONS[argument].value
+            case Opcode.OPEN_FILE:
+                return FILE_MODES[argument]
+        return str(argument)
+
+    def disassemble(self) -> str:
+        lines: list[str] = []
+        previous_line: int = 0
+        for offset in range(0, len(self.code), 2):
+            opcode: Opcode = Opcode(self.code[offset])
+            line, column = self.position(offset)
+            lines.append(f"{(str(line) if (line != previous_line) else ''):>5} {offset:>6} {opcode.name:<18} {self._describe_argument(opcode, self.code[offset + 1])}")
+            previous_line = line
+        return '\n'.join(lines)
+
+    def disassemble_all(self) -> str:
+        # The main program, followed by every subroutine
+        parts: list[str] = [self.disassemble()]
+        for subroutine in self.subroutines:
+            parts.append(f"{'FUNCTION' if (subroutine.returns) else 'PROCEDURE'} {subroutine.name}:\n{subroutine.bytecode.disassemble()}")
+        return '\n\n'.join(parts)
+
+class Subroutine:
+    def __init__(self, name: str, parameters: tuple[tuple[str, str, bool, bool], ...], returns: (str | None)) -> None:
+        self.name: str = name
+
+        # (identifier, datatype, is_array, by_reference) of every parameter; the datatype of an array parameter
+        # is that of its elements
+        self.parameters: tuple[tuple[str, str, bool, bool], ...] = parameters
+
+        # The datatype that a FUNCTION returns; None for a PROCEDURE
+        self.returns: (str | None) = returns
+
+        # Whether this is a FUNCTION whose value only depends on its arguments (see pure_functions()), so that a
+        # VirtualMachine with a FunctionCache can answer a call of it with the value of an earlier one
+        self.pure: bool = False
+
+        # Set once the body has been compiled, which is after every subroutine is known, so that they can call
+        # each other regardless of the order they are defined in
+        self.bytecode: (Bytecode | None) = None
\ No newline at end of file
@@ -0,0 +1,515 @@
+# Local imports
+from ..token import Token, TokenType
+from ..errors import CompilerError
+from ..parser.ast import ParsedProgram, statements, expressions
+from ..runtime import DATATYPES, RecordType, literal_value
+from ..resolver import Resolver, Resolution, SymbolTable, pure_functions, evaluated_expressions, nested_blocks
+from ..files import FILE_MODES
+from .opcodes import Opcode, BINARY_OPERATIONS, UNARY_OPERATIONS, SCOPE_LOCAL, SCOPE_GLOBAL, SCOPE_REFERENCE
+from .bytecode import Bytecode, Subroutine
+
+# The FUNCTION that tells whether a file has been read to its end; a subroutine of the program with the same name takes its place
+BUILTIN_EOF: str = 'EOF'
+
+class Compiler:
+    def __init__(self, profile: bool = False) -> None:
+        # Whether every statement starts with a LINE instruction, for the VirtualMachine to report to a Profiler
+        self._profile: bool = profile
+
+        self._code: list[int] = []
+        self._positions: list[tuple[int, int]] = []
+
+        self._constants: list[object] = []
+        self._constant_indexes: dict[tuple[type, object], int] = {}
+
+        # Every subroutine of the program, by name, along with its index in Bytecode.subroutines
+        self._subroutines: list[Subroutine] = []
+        self._subroutine_indexes: dict[str, int] = {}
+
+        # Every record type that the program defines with TYPE, by name
+        self._record_types: dict[str, RecordType] = {}
+
+        # The slots of the main program, and those of the scope being compiled (the same table, while
+        # compiling the main program)
+        self._globals: SymbolTable = SymbolTable()
+        self._table: SymbolTable = self._globals
+
+    def _emit(self, opcode: Opcode, argument: int, token: Token) -> int:
+        offset: int = len(self._code)
+        self._code.append(opcode.value)
+        self._code.append(argument)
+        self._positions.append((token.line, token.column))
+        return offset
+
+    def _patch_jump(self, offset: int) -> None:
+        # Points the jump instruction at the given offset to the next instruction to be emitted
+        self._code[offset + 1] = len(self._code)
+
+    def _constant(self, value: object) -> int:
+        # Keyed by type as well, since 1, 1.0 and TRUE are all equal to each other; and REALs by their repr,
+        # since so are 0.0 and -0.0
+        key: tuple[type, object] = (type(value), (repr(value) if (type(value) is float) else value))
+        index: (int | None) = self._constant_indexes.get(key)
+        if (index is None):
+            index = self._constant_indexes[key] = len(self._constants)
+            self._constants.append(value)
+        return index
+
+    def _slot(self, identifier: Token) -> tuple[int, int]:
+        # (scope, slot) of an identifier; the Resolver has made sure that every identifier is in one of the tables
+        table: SymbolTable = self._table
+        slot: (int | None) = table.slots.get(identifier.literal)
+        if (slot is None):
+            return (SCOPE_GLOBAL, self._globals.slots[identifier.literal])
+        if (identifier.literal in table.references):
+            return (SCOPE_REFERENCE, slot)
+        return (SCOPE_LOCAL, slot)
+
+    def _load(self, identifier: Token) -> None:
+        scope, slot = self._slot(identifier)
+        self._emit((Opcode.LOAD_LOCAL, Opcode.LOAD_GLOBAL, Opcode.LOAD_DEREF)[scope], slot, identifier)
+
+    def _store(self, identifier: Token) -> None:
+        scope, slot = self._slot(identifier)
+        self._emit((Opcode.STORE_LOCAL, Opcode.STORE_GLOBAL, Opcode.STORE_DEREF)[scope], slot, identifier)
+
+    def _declared_slot(self, identifier: Token) -> int:
+        # Declarations are always in the scope being compiled
+        if (identifier.literal in self._table.references):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} is already declared as a BYREF parameter")
+        return self._table.slots[identifier.literal]
+
+    def _subroutine(self, identifier: Token, is_function: bool) -> tuple[int, Subroutine]:
+        index: (int | None) = self._subroutine_indexes.get(identifier.literal)
+        kind: str = TokenType.FUNCTION.value if (is_function) else TokenType.PROCEDURE.value
+        if (index is None):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} is not defined as a {kind}")
+
+        subroutine: Subroutine = self._subroutines[index]
+        if ((subroutine.returns is not None) != is_function):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} is not a {kind}")
+        return (index, subroutine)
+
+    def _compile_call(self, identifier: Token, arguments: list[expressions.Expression], is_function: bool) -> None:
+        index, subroutine = self._subroutine(identifier, is_function)
+        if (len(arguments) != len(subroutine.parameters)):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} takes {len(subroutine.parameters)} argument(s), got {len(arguments)}")
+
+        for argument, (_, _, _, by_reference) in zip(arguments, subroutine.parameters):
+            if (not by_reference):
+                self._compile_expression(argument)
+                continue
+
+            # Nothing is evaluated or copied; the subroutine gets the variable itself
+            if ((type(argument) is not expressions.Atom) or (argument.token.type != TokenType.IDENTIFIER)):
+                token: Token = first_token(argument)
+                raise CompilerError(f"line {token.line}, col {token.column}; a BYREF argument must be a variable")
+            self._emit(Opcode.LOAD_REFERENCE, self._constant(self._slot(argument.token)), argument.token)
+
+        self._emit(Opcode.CALL, index, identifier)
+
+    def _literal(self, token: Token) -> object:
+        try:
+            return literal_value(token)
+        except ValueError:
+            raise CompilerError(f"line {token.line}, col {token.column}; invalid {token.type.value} literal {repr(token.literal)}")
+
+    def _datatype(self, datatype: Token) -> str:
+        if (datatype.literal in self._record_types):
+            raise CompilerError(f"line {datatype.line}, col {datatype.column}; the record type {repr(datatype.literal)} can only be used to DECLARE a variable")
+        if (datatype.literal not in DATATYPES):
+            raise CompilerError(f"line {datatype.line}, col {datatype.column}; unknown datatype {repr(datatype.literal)}")
+        return datatype.literal
+
+    def _compile_expression(self, expression: expressions.Expression) -> None:
+        match(expression):
+            case expressions.Atom():
+                token: Token = expression.token
+                if (token.type == TokenType.IDENTIFIER):
+                    self._load(token)
+                else:
+                    self._emit(Opcode.LOAD_CONST, self._constant(self._literal(token)), token)
+
+            case expressions.PrefixOperator():
+                self._compile_expression(expression.operand)
+                self._emit(Opcode.UNARY_OP, UNARY_OPERATIONS.index(expression.operator.type), expression.operator)
+
+            case expressions.InfixOperator():
+                operator: Token = expression.operator
+                if (operator.type == TokenType.PERIOD):
+                    field: expressions.Expression = expression.rhs
+                    if ((type(field) is not expressions.Atom) or (field.token.type != TokenType.IDENTIFIER)):
+                        token: Token = first_token(field)
+                        raise CompilerError(f"line {token.line}, col {token.column}; expected a field identifier")
+                    self._compile_expression(expression.lhs)
+                    self._emit(Opcode.LOAD_FIELD, self._constant(field.token.literal), field.token)
+                    return
+                if (operator.type not in BINARY_OPERATIONS):
+                    raise CompilerError(f"line {operator.line}, col {operator.column}; the {repr(operator.literal)} operator is not supported yet")
+
+                if (operator.type == TokenType.AMPERSAND):
+                    operands, operators = flatten_concatenation(expression)
+                    if (len(operands) > 2):
+                        # Every operand is appended to a list of pieces, which is joined once, after the last one
+                        self._compile_expression(operands[0])
+                        for index, (operand, concatenation) in enumerate(zip(operands[1:], operators), 2):
+                            self._compile_expression(operand)
+                            self._emit(Opcode.CONCAT, int(index == len(operands)), concatenation)
+                        return
+
+                self._compile_expression(expression.lhs)
+                self._compile_expression(expression.rhs)
+                self._emit(Opcode.BINARY_OP, BINARY_OPERATIONS.index(operator.type), operator)
+
+            case expressions.ArrayIndexing():
+                self._compile_expression(expression.identifier)
+                for index in expression.indexes:
+                    self._compile_expression(index)
+                self._emit(Opcode.LOAD_INDEX, len(expression.indexes), expression.identifier.token)
+
+            case expressions.FunctionCall():
+                identifier: Token = expression.identifier.token
+                if ((identifier.literal == BUILTIN_EOF) and (identifier.literal not in self._subroutine_indexes)):
+                    if (len(expression.arguments) != 1):
+                        raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} takes 1 argument(s), got {len(expression.arguments)}")
+                    self._compile_expression(expression.arguments[0])
+                    self._emit(Opcode.FILE_EOF, 0, identifier)
+                    return
+                self._compile_call(identifier, expression.arguments, is_function=True)
+
+            case expressions.CommonSubexpression():
+                # Temporaries take the slots after those of the scope's variables, which no identifier can name
+                slot: int = self._table.add(f'<temporary {expression.temporary}>')
+                if (expression.is_first):
+                    self._compile_expression(expression.expression)
+                    self._emit(Opcode.SAVE_TEMPORARY, slot, expression.token)
+                else:
+                    self._emit(Opcode.LOAD_TEMPORARY, slot, expression.token)
+
+            case _:
+                raise CompilerError(f"unsupported expression {str(expression)}")
+
+    def _compile_append(self, statement: statements.ASSIGNMENT) -> bool:
+        # Compiles an assignment of the form x <- x & ... so that the pieces are appended to the variable's buffer,
+        # instead of copying the whole STRING every time it is built up by one more piece. Not when an operand
+        # calls a FUNCTION, which might append to the same variable while it is being appended to
+        if ((type(statement.expression) is not expressions.InfixOperator) or (statement.expression.operator.type != TokenType.AMPERSAND)):
+            return False
+        operands, operators = flatten_concatenation(statement.expression)
+        target: expressions.Expression = operands[0]
+        if ((type(target) is not expressions.Atom) or (target.token.type != TokenType.IDENTIFIER) or (target.token.literal != statement.identifier.literal)):
+            return False
+        if (any(_calls_function(operand) for operand in operands[1:])):
+            return False
+
+        variable: int = self._constant(self._slot(statement.identifier))
+        self._emit(Opcode.LOAD_BUFFER, variable, target.token)
+        for operand, concatenation in zip(operands[1:], operators):
+            self._compile_expression(operand)
+            self._emit(Opcode.CONCAT, 0, concatenation)
+        self._emit(Opcode.STORE_BUFFER, variable, statement.identifier)
+        return True
+
+    def _compile_block(self, block: list[statements.Statement]) -> None:
+        for statement in block:
+            if (self._profile):
+                self._compile_profiled_statement(statement)
+            else:
+                self._compile_statement(statement)
+
+    def _compile_profiled_statement(self, statement: statements.Statement) -> None:
+        # Statements do not keep a token of their own, so the line of the LINE instruction is that of the
+        # first instruction compiled from the statement, which is patched in once it has been compiled
+        offset: int = len(self._code)
+        self._code += (Opcode.LINE.value, 0)
+        self._positions.append((0, 0))
+        self._compile_statement(statement)
+        if (len(self._code) == offset + 2):
+            del self._code[offset:]
+            self._positions.pop()
+            return
+        self._positions[offset // 2] = self._positions[(offset // 2) + 1]
+        self._code[offset + 1] = self._positions[offset // 2][0]
+
+    def _compile_statement(self, statement: statements.Statement) -> None:
+        match(statement):
+            case statements.DECLARE_ARRAY():
+                slot: int = self._declared_slot(statement.identifier)
+                sizes: list[object] = [(literal_value(size.token) if ((type(size) is expressions.Atom) and (size.token.type == TokenType.INTEGER)) else None) for size in statement.dimensions_sizes]
+                if (all(((type(size) is int) and (size >= 1)) for size in sizes)):
+                    # The dimension sizes are literals, so they are not evaluated at run time
+                    declaration: tuple[int, str, tuple[int, ...]] = (slot, self._datatype(statement.datatype), tuple(sizes))
+                    self._emit(Opcode.DECLARE_STATIC_ARRAY, self._constant(declaration), statement.identifier)
+                    return
+
+                for size in statement.dimensions_sizes:
+                    self._compile_expression(size)
+                declaration: tuple[int, str, int] = (slot, self._datatype(statement.datatype), len(statement.dimensions_sizes))
+                self._emit(Opcode.DECLARE_ARRAY, self._constant(declaration), statement.identifier)
+
+            case statements.DECLARE():
+                record_type: (RecordType | None) = self._record_types.get(statement.datatype.literal)
+                if (record_type is not None):
+                    declaration: tuple[int, RecordType] = (self._declared_slot(statement.identifier), record_type)
+                    self._emit(Opcode.DECLARE_RECORD, self._constant(declaration), statement.identifier)
+                    return
+                declaration: tuple[int, str] = (self._declared_slot(statement.identifier), self._datatype(statement.datatype))
+                self._emit(Opcode.DECLARE, self._constant(declaration), statement.identifier)
+
+            case statements.CONSTANT():
+                slot: int = self._declared_slot(statement.identifier)
+                self._emit(Opcode.LOAD_CONST, self._constant(self._literal(statement.value)), statement.value)
+                self._emit(Opcode.DECLARE_CONSTANT, slot, statement.identifier)
+
+            case statements.ASSIGNMENT_ARRAY():
+                self._compile_expression(statement.expression)
+                self._load(statement.identifier)
+                for index in statement.indexes:
+                    self._compile_expression(index)
+                self._emit(Opcode.STORE_INDEX, len(statement.indexes), statement.identifier)
+
+            case statements.ASSIGNMENT_FIELD():
+                self._compile_expression(statement.expression)
+                self._load(statement.identifier)
+                self._emit(Opcode.STORE_FIELD, self._constant(statement.field.literal), statement.field)
+
+            case statements.ASSIGNMENT():
+                if (self._compile_append(statement)):
+                    return
+                self._compile_expression(statement.expression)
+                self._store(statement.identifier)
+
+            case statements.INPUT():
+                self._emit(Opcode.INPUT, self._constant(self._slot(statement.identifier)), statement.identifier)
+
+            case statements.OUTPUT():
+                for expression in statement.expressions:
+                    self._compile_expression(expression)
+                self._emit(Opcode.OUTPUT, len(statement.expressions), first_token(statement.expressions[0]))
+
+            case statements.OPENFILE():
+                self._compile_expression(statement.file)
+                self._emit(Opcode.OPEN_FILE, FILE_MODES.index(statement.mode.type.value), first_token(statement.file))
+
+            case statements.READFILE():
+                self._compile_expression(statement.file)
+                self._emit(Opcode.READ_FILE, self._constant(self._slot(statement.identifier)), statement.identifier)
+
+            case statements.WRITEFILE():
+                self._compile_expression(statement.file)
+                self._compile_expression(statement.expression)
+                self._emit(Opcode.WRITE_FILE, 0, first_token(statement.file))
+
+            case statements.CLOSEFILE():
+                self._compile_expression(statement.file)
+                self._emit(Opcode.CLOSE_FILE, 0, first_token(statement.file))
+
+            case statements.SEEK():
+                self._compile_expression(statement.file)
+                self._compile_expression(statement.address)
+                self._emit(Opcode.SEEK_FILE, 0, first_token(statement.file))
+
+            case statements.GETRECORD():
+                # The record is read into, or written from, in place
+                self._compile_expression(statement.file)
+                self._load(statement.identifier)
+                self._emit(Opcode.PUT_RECORD if (type(statement) is statements.PUTRECORD) else Opcode.GET_RECORD, 0, statement.identifier)
+
+            case statements.IF():
+                end_jumps: list[int] = []
+                for index, (condition, block) in enumerate(statement.branches):
+                    self._compile_expression(condition)
+                    condition_token: Token = first_token(condition)
+                    next_branch_jump: int = self._emit(Opcode.POP_JUMP_IF_FALSE, 0, condition_token)
+                    self._compile_block(block)
+                    if (index != (len(statement.branches) - 1)):
+                        end_jumps.append(self._emit(Opcode.JUMP, 0, condition_token))
+                    self._patch_jump(next_branch_jump)
+                for jump in end_jumps:
+                    self._patch_jump(jump)
+
+            case statements.WHILE():
+                # The LINE instruction of a profiled loop is run again with every iteration, so that each one is a hit
+                start: int = (len(self._code) - 2) if (self._profile) else len(self._code)
+                self._compile_expression(statement.condition)
+                condition_token: Token = first_token(statement.condition)
+                exit_jump: int = self._emit(Opcode.POP_JUMP_IF_FALSE, 0, condition_token)
+                self._compile_block(statement.statements)
+                # The only jump backwards, which is where the VirtualMachine counts the steps of a run
+                self._emit(Opcode.JUMP, start, condition_token)
+                self._patch_jump(exit_jump)
+
+            case statements.CALL():
+                self._compile_call(statement.identifier, statement.arguments, is_function=False)
+
+            case statements.RETURN():
+                self._compile_expression(statement.expression)
+                self._emit(Opcode.RETURN_VALUE, 0, statement.keyword)
+
+            case statements.PROCEDURE():
+                # Those at the top level are compiled separately, by compile()
+                raise CompilerError(f"line {statement.identifier.line}, col {statement.identifier.column}; subroutines can only be defined at the top level")
+
+            case statements.TYPE():
+                # As are these, which do not compile to any code
+                raise CompilerError(f"line {statement.identifier.line}, col {statement.identifier.column}; record types can only be defined at the top level")
+
+            case _:
+                raise CompilerError(f"unsupported statement {str(statement)}")
+
+    def _define_type(self, definition: statements.TYPE) -> None:
+        identifier: Token = definition.identifier
+        if (identifier.literal in self._record_types):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; the record type {repr(identifier.literal)} is already defined")
+
+        fields: list[tuple[str, str]] = []
+        for field in definition.fields:
+            if (type(field) is statements.DECLARE_ARRAY):
+                raise CompilerError(f"line {field.identifier.line}, col {field.identifier.column}; the fields of a record cannot be arrays")
+            if (any((field.identifier.literal == other[0]) for other in fields)):
+                raise CompilerError(f"line {field.identifier.line}, col {field.identifier.column}; duplicate field {repr(field.identifier.literal)}")
+            fields.append((field.identifier.literal, self._datatype(field.datatype)))
+
+        self._record_types[identifier.literal] = RecordType(identifier.literal, tuple(fields))
+
+    def _define(self, definition: statements.PROCEDURE) -> None:
+        identifier: Token = definition.identifier
+        if (identifier.literal in self._subroutine_indexes):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} is already defined")
+
+        parameters: list[tuple[str, str, bool, bool]] = []
+        for parameter in definition.parameters:
+            if (any((parameter.identifier.literal == other[0]) for other in parameters)):
+                raise CompilerError(f"line {parameter.identifier.line}, col {parameter.identifier.column}; duplicate parameter {repr(parameter.identifier.literal)}")
+            parameters.append((parameter.identifier.literal, self._datatype(parameter.datatype), parameter.is_array, parameter.by_reference))
+
+        returns: (str | None) = self._datatype(definition.returns) if (type(definition) is statements.FUNCTION) else None
+
+        self._subroutine_indexes[identifier.literal] = len(self._subroutines)
+        self._subroutines.append(Subroutine(identifier.literal, tuple(parameters), returns))
+
+    def _compile_subroutine(self, definition: statements.PROCEDURE, table: SymbolTable) -> Bytecode:
+        compiler: Compiler = Compiler(self._profile)
+        compiler._subroutines = self._subroutines
+        compiler._subroutine_indexes = self._subroutine_indexes
+        compiler._record_types = self._record_types
+        compiler._globals = self._globals
+        compiler._table = table
+
+        compiler._compile_block(definition.statements)
+        # Reached at the end of a PROCEDURE, or when a FUNCTION runs out of statements without a RETURN
+        compiler._emit(Opcode.RETURN, 0, definition.identifier)
+        return Bytecode(compiler._code, compiler._constants, table.names, compiler._positions, self._subroutines, self._globals.names)
+
+    def compile(self, parsed_program: ParsedProgram) -> Bytecode:
+        try:
+            return self._compile_program(parsed_program)
+        except RecursionError:
+            raise nesting_error(parsed_program) from None
+
+    def _compile_program(self, parsed_program: ParsedProgram) -> Bytecode:
+        resolution: Resolution = Resolver().resolve(parsed_program)
+        self._globals = self._table = resolution.globals
+
+        # Record types and subroutines are known before any code is compiled, so they can be used before their definition
+        for statement in parsed_program.statements:
+            if (type(statement) is statements.TYPE):
+                self._define_type(statement)
+        definitions: list[statements.PROCEDURE] = [statement for statement in parsed_program.statements if (isinstance(statement, statements.PROCEDURE))]
+        for definition in definitions:
+            self._define(definition)
+        # The FUNCTIONs whose calls a FunctionCache can answer
+        pure: set[str] = pure_functions(parsed_program)
+        for subroutine in self._subroutines:
+            subroutine.pure = (subroutine.name in pure)
+
+        self._compile_block([statement for statement in parsed_program.statements if (not isinstance(statement, (statements.PROCEDURE, statements.TYPE)))])
+
+        for definition, subroutine, table in zip(definitions, self._subroutines, resolution.subroutines):
+            subroutine.bytecode = self._compile_subroutine(definition, table)
+
+        return Bytecode(self._code, self._constants, self._globals.names, self._positions, self._subroutines, self._globals.names)
+
+def first_token(expression: expressions.Expression) -> Token:
+    # The leftmost token of an expression, used to report where a statement starts
+    while (True):
+        match(expression):
+            case expressions.Atom() | expressions.CommonSubexpression():
+                return expression.token
+            case expressions.PrefixOperator():
+                return expression.operator
+            case expressions.InfixOperator():
+                expression = expression.lhs
+            case expressions.FunctionCall() | expressions.ArrayIndexing():
+                expression = expression.identifier
+            case expressions.PostfixOperator():
+                expression = expression.operand
+            case _:
+                raise CompilerError(f"unsupported expression {str(expression)}")
+
+def nesting_error(parsed_program: ParsedProgram) -> CompilerError:
+    # The passes over a program recurse into its blocks and expressions, so one that is nested deeply enough
+    # runs out of stack; it is reported where its most deeply nested expression starts
+    deepest: int = 0
+    token: (Token | None) = None
+    deepest_expression: (expressions.Expression | None) = None
+    pending: list[tuple[statements.Statement, int]] = [(statement, 1) for statement in parsed_program.statements]
+    while (pending):
+        statement, depth = pending.pop()
+        if (isinstance(statement, statements.PROCEDURE)):
+            if (depth > deepest):
+                deepest, token, deepest_expression = depth, statement.identifier, None
+            pending.extend((nested, depth + 1) for nested in statement.statements)
+            continue
+        for block in nested_blocks(statement):
+            pending.extend((nested, depth + 1) for nested in block)
+        for expression in evaluated_expressions(statement):
+            nesting: list[tuple[expressions.Expression, int]] = [(expression, depth + 1)]
+            while (nesting):
+                inner, inner_depth = nesting.pop()
+                if (inner_depth > deepest):
+                    deepest, deepest_expression = inner_depth, expression
+                match(inner):
+                    case expressions.PrefixOperator() | expressions.PostfixOperator():
+                        nesting.append((inner.operand, inner_depth + 1))
+                    case expressions.InfixOperator():
+                        nesting.extend(((inner.lhs, inner_depth + 1), (inner.rhs, inner_depth + 1)))
+                    case expressions.ArrayIndexing():
+                        nesting.append((inner.identifier, inner_depth + 1))
+                        nesting.extend((index, inner_depth + 1) for index in inner.indexes)
+                    case expressions.FunctionCall():
+                        nesting.extend((argument, inner_depth + 1) for argument in inner.arguments)
+                    case expressions.CommonSubexpression():
+                        nesting.append((inner.expression, inner_depth + 1))
+    if (deepest_expression is not None):
+        token = first_token(deepest_expression)
+    if (token is None):
+        return CompilerError("the program is nested too deeply to be compiled")
+    return CompilerError(f"line {token.line}, col {token.column}; the expression is nested too deeply to be compiled")
+
+def flatten_concatenation(expression: expressions.InfixOperator) -> tuple[list[expressions.Expression], list[Token]]:
+    # The operands and operators of a chain of '&' operators, from left to right; a & b & c is parsed as (a & b) & c
+    operands: list[expressions.Expression] = []
+    operators: list[Token] = []
+    while ((type(expression) is expressions.InfixOperator) and (expression.operator.type == TokenType.AMPERSAND)):
+        operands.append(expression.rhs)
+        operators.append(expression.operator)
+        expression = expression.lhs
+    operands.append(expression)
+    operands.reverse()
+    operators.reverse()
+    return (operands, operators)
+
+def _calls_function(expression: expressions.Expression) -> bool:
+    match(expression):
+        case expressions.FunctionCall():
+            return True
+        case expressions.PrefixOperator() | expressions.PostfixOperator():
+            return _calls_function(expression.operand)
+        case expressions.InfixOperator():
+            return (_calls_function(expression.lhs) or _calls_function(expression.rhs))
+        case expressions.ArrayIndexing():
+            return any(_calls_function(index) for index in expression.indexes)
+        case expressions.CommonSubexpression():
+            return _calls_function(expression.expression)
+    return False
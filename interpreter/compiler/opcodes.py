@@ -0,0 +1,84 @@
+# Standard library imports
+import enum
+
+# Local imports
+from ..token import TokenType
+from ..runtime import BINARY_OPERATORS, UNARY_OPERATORS
+
+class Opcode(enum.IntEnum):
+    # Every instruction is an (opcode, argument) pair; opcodes that take no argument are given 0
+
+    ##### Stack
+    LOAD_CONST = enum.auto()        # push constants[arg]
+
+    ##### Variables
+    # Variables live in numbered slots, one set for the main program and one for every subroutine call;
+    # names[slot] is the identifier of a slot of the scope that the code belongs to
+    LOAD_LOCAL = enum.auto()        # push the value in slot arg of the scope being run
+    STORE_LOCAL = enum.auto()       # pop a value and bind it to slot arg of the scope being run
+    DECLARE = enum.auto()           # constants[arg] = (slot, datatype)
+    DECLARE_ARRAY = enum.auto()     # constants[arg] = (slot, datatype, dimensions); pops the dimension sizes
+    DECLARE_STATIC_ARRAY = enum.auto() # constants[arg] = (slot, datatype, dimension sizes), known at compile time
+    DECLARE_CONSTANT = enum.auto()  # pop a value and bind it as a constant to slot arg
+    LOAD_GLOBAL = enum.auto()       # push the value in slot arg of the main program, from a subroutine
+    STORE_GLOBAL = enum.auto()      # pop a value and bind it to slot arg of the main program, from a subroutine
+    LOAD_DEREF = enum.auto()        # push the value of the variable that the BYREF parameter in slot arg refers to
+    STORE_DEREF = enum.auto()       # pop a value and bind it to the variable that the BYREF parameter in slot arg refers to
+    LOAD_REFERENCE = enum.auto()    # constants[arg] = (scope, slot); push a reference to the variable, for a BYREF argument
+    LOAD_BUFFER = enum.auto()       # constants[arg] = (scope, slot); push the variable to be appended to by x <- x & ...
+    STORE_BUFFER = enum.auto()      # constants[arg] = (scope, slot); pop the pieces of x & ... and bind them to the variable
+
+    ##### Arrays
+    LOAD_INDEX = enum.auto()        # pop arg indexes and an array, push the element
+    STORE_INDEX = enum.auto()       # pop arg indexes, an array and a value, store the value as the element
+
+    ##### Records
+    DECLARE_RECORD = enum.auto()    # constants[arg] = (slot, record type)
+    LOAD_FIELD = enum.auto()        # constants[arg] = field identifier; pop a record, push the value of the field
+    STORE_FIELD = enum.auto()       # constants[arg] = field identifier; pop a record and a value, store the value in the field
+
+    ##### Operators
+    BINARY_OP = enum.auto()         # pop rhs and lhs, push the result of BINARY_OPERATIONS[arg]
+    UNARY_OP = enum.auto()          # pop operand, push the result of UNARY_OPERATIONS[arg]
+    CONCAT = enum.auto()            # pop rhs, append it to the pieces of the '&' chain under it; then join them into a STRING if arg is 1
+
+    ##### Control flow
+    JUMP = enum.auto()              # continue at code offset arg
+    POP_JUMP_IF_FALSE = enum.auto() # pop a BOOLEAN, continue at code offset arg if it is FALSE
+
+    ##### Subroutines
+    CALL = enum.auto()              # pop the arguments of subroutines[arg] and run it; a FUNCTION pushes its value
+    RETURN_VALUE = enum.auto()      # pop a value and return it from the FUNCTION being run
+    RETURN = enum.auto()            # return from the PROCEDURE being run; an error in a FUNCTION
+
+    ##### Console input and output
+    OUTPUT = enum.auto()            # pop arg values and output them as one line
+    INPUT = enum.auto()             # constants[arg] = (scope, slot); read a line and bind it to the variable
+
+    ##### Text files
+    # A file is referred to by the name it was opened with, which these pop from under any other operand
+    OPEN_FILE = enum.auto()         # pop a file name and open the file in FILE_MODES[arg]
+    READ_FILE = enum.auto()         # constants[arg] = (scope, slot); pop a file name, read a line of it and bind it to the variable
+    WRITE_FILE = enum.auto()        # pop a value and a file name, write the value to the file as one line
+    CLOSE_FILE = enum.auto()        # pop a file name and close the file
+    FILE_EOF = enum.auto()          # pop a file name, push whether there is nothing more to read from the file
+    SEEK_FILE = enum.auto()         # pop a record address and a file name, move the RANDOM file to that record
+    GET_RECORD = enum.auto()        # pop a record and a file name, read the record at the RANDOM file's address into it
+    PUT_RECORD = enum.auto()        # pop a record and a file name, write it to the RANDOM file at its address
+
+    ##### Common subexpressions
+    # Temporaries are hidden slots of the scope being run, after those of its variables, which hold the value
+    # of an expression that is evaluated once and used again (see expressions.CommonSubexpression)
+    SAVE_TEMPORARY = enum.auto()    # copy the value on top of the stack into slot arg, leaving it on the stack
+    LOAD_TEMPORARY = enum.auto()    # push the value in slot arg
+
+    ##### Profiling
+    LINE = enum.auto()              # the statement on source line arg starts; only emitted by Compiler(profile=True)
+
+# Where the variable of a LOAD_REFERENCE, LOAD_BUFFER, STORE_BUFFER, INPUT or READ_FILE instruction is: in the scope being run (the main program's, or
+# that of a subroutine call), in the main program's from a subroutine, or behind a BYREF parameter
+(SCOPE_LOCAL, SCOPE_GLOBAL, SCOPE_REFERENCE) = range(3)
+
+# The operator of a BINARY_OP/UNARY_OP instruction is encoded as its index in these tuples
+BINARY_OPERATIONS: tuple[TokenType, ...] = tuple(BINARY_OPERATORS)
+UNARY_OPERATIONS: tuple[TokenType, ...] = tuple(UNARY_OPERATORS)
\ No newline at end of file
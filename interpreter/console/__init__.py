@@ -0,0 +1 @@
+from .console import *
\ No newline at end of file
@@ -0,0 +1,84 @@
+# Standard library imports
+import sys
+from typing import TextIO
+
+# Buffered output is written out to the stream once this many characters have built up
+OUTPUT_BUFFER_SIZE: int = (1 << 16)
+
+def _is_terminal(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+class Console:
+    # What a running program's OUTPUT and INPUT statements go through.
+    # Output is collected and written to the stream in large blocks. That happens once OUTPUT_BUFFER_SIZE
+    # characters have built up, before a line of input is read from the stream, and on flush(), which the
+    # backends call when a program ends. Input from a pipe or a file is read in one go, the first time a line
+    # is needed, and split into lines.
+    # Interactive mode writes out (and flushes) every line straight away, and reads input a line at a time.
+    # interactive=None picks it for each stream separately, depending on whether the stream is a terminal.
+    # A program whose input is piped from another program that waits for its output (rather than from a
+    # file) has to be run in interactive mode.
+    def __init__(self, input_stream: TextIO = sys.stdin, output_stream: TextIO = sys.stdout, interactive: (bool | None) = None) -> None:
+        self._input_stream: TextIO = input_stream
+        self._output_stream: TextIO = output_stream
+
+        self._line_buffered: bool = _is_terminal(output_stream) if (interactive is None) else interactive
+        self._bulk_input: bool = (not _is_terminal(input_stream)) if (interactive is None) else (not interactive)
+
+        self._output: list[str] = []
+        self._output_size: int = 0
+
+        # Every line of bulk input, once it has been read, and the index of the next one
+        self._lines: (list[str] | None) = None
+        self._line_index: int = 0
+
+    def write(self, text: str) -> None:
+        if (self._line_buffered):
+            self._output_stream.write(text)
+            self._output_stream.flush()
+            return
+
+        self._output.append(text)
+        self._output_size += len(text)
+        if (self._output_size >= OUTPUT_BUFFER_SIZE):
+            self._write_out()
+
+    def _write_out(self) -> None:
+        if (self._output):
+            text: str = ''.join(self._output)
+            self._output.clear()
+            self._output_size = 0
+            self._output_stream.write(text)
+
+    def flush(self) -> None:
+        self._write_out()
+        self._output_stream.flush()
+
+    def _read_lines(self) -> list[str]:
+        # Split as readline() would split the stream, which has already translated any '\r\n' to '\n' if the
+        # stream does that
+        lines: list[str] = self._input_stream.read().split('\n')
+        if (lines[-1] == ''):
+            lines.pop()
+        return lines
+
+    def read_line(self) -> str:
+        # The next line of input, without its line ending
+        if (self._bulk_input):
+            if (self._lines is None):
+                self._lines = self._read_lines()
+            if (self._line_index == len(self._lines)):
+                raise EOFError('there is no more input to read')
+            line: str = self._lines[self._line_index]
+            self._line_index += 1
+            return line.rstrip('\r')
+
+        # Whatever the program has output so far may be what the user is answering
+        self.flush()
+        line: str = self._input_stream.readline()
+        if (not line):
+            raise EOFError('there is no more input to read')
+        return line.rstrip('\r\n')
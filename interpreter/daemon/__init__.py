@@ -0,0 +1 @@
+from .daemon import *
\ No newline at end of file
@@ -0,0 +1,434 @@
+# Standard library imports
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import selectors
+from collections import deque
+from typing import Callable
+
+# Local imports
+from ..vm import Limits
+from ..batch import run_source, add_limit_arguments, limits_from_arguments, DEFAULT_TIMEOUT, STATUS_TIMEOUT, STATUS_CRASHED
+
+# Workers are forked from the daemon, which has already imported (and warmed up) the interpreter
+FORK_SUPPORTED: bool = hasattr(os, 'fork')
+
+# What became of a request that could not be run at all
+STATUS_BAD_REQUEST: str = 'bad_request'
+
+# The limits that a request can ask for, on top of the timeout; a request can only make them tighter
+LIMIT_NAMES: tuple[str, ...] = ('max_steps', 'max_array_elements', 'max_string_length', 'max_output')
+
+# The longest line that a client can send, which is mostly the source of the program
+MAX_REQUEST_BYTES: int = (1 << 24)
+
+# How long past the timeout a worker has to report back before it is killed. Workers stop themselves when
+# the timeout goes off, so this only catches those that are stuck where the timer cannot interrupt them
+KILL_GRACE: float = 1.0
+
+# Run once before any worker is forked, so that whatever the interpreter sets up on first use is already set
+# up in every worker
+_WARM_UP_SOURCE: str = '''DECLARE count : INTEGER
+DECLARE text : STRING
+count <- 0
+text <- ""
+WHILE count < 3
+    count <- count + 1
+    text <- text & "."
+ENDWHILE
+OUTPUT count, text
+'''
+
+class Request:
+    def __init__(self, id: object, source: str, stdin: str, timeout: (float | None), limits: Limits) -> None:
+        # Echoed back in the response, so that a client can send several requests at once
+        self.id: object = id
+        self.source: str = source
+        self.stdin: str = stdin
+        self.timeout: (float | None) = timeout
+        self.limits: Limits = limits
+
+def _tighter(value: object, name: str, current: (int | float | None), kind: type) -> (int | float | None):
+    if ((type(value) is not kind) and ((kind is not float) or (type(value) is not int))):
+        raise ValueError(f'"{name}" must be a{"n integer" if (kind is int) else " number"}')
+    if (value < 0):
+        raise ValueError(f'"{name}" cannot be negative')
+    return value if (current is None) else min(value, current)
+
+def parse_request(request: object, timeout: (float | None), limits: Limits) -> Request:
+    # A request is a JSON object with the "source" of a program, and optionally an "id", the "stdin" that its
+    # INPUT statements read, and "limits" (any of LIMIT_NAMES, and a "timeout" in seconds). The limits of
+    # the daemon are the most that a request can have
+    if (type(request) is not dict):
+        raise ValueError('expected a JSON object')
+    if (type(request.get('source')) is not str):
+        raise ValueError('expected a "source" string')
+    if (type(request.get('stdin', '')) is not str):
+        raise ValueError('"stdin" must be a string')
+
+    overrides: object = request.get('limits', {})
+    if (type(overrides) is not dict):
+        raise ValueError('"limits" must be an object')
+    for name in overrides:
+        if ((name not in LIMIT_NAMES) and (name != 'timeout')):
+            raise ValueError(f'unknown limit {repr(name)}')
+
+    if ('timeout' in overrides):
+        if (overrides['timeout'] == 0):
+            raise ValueError('"timeout" must be more than 0')
+        timeout = _tighter(overrides['timeout'], 'timeout', (timeout or None), float)
+    values: dict[str, (int | None)] = {name: getattr(limits, name) for name in LIMIT_NAMES}
+    for name in LIMIT_NAMES:
+        if (name in overrides):
+            values[name] = _tighter(overrides[name], name, values[name], int)
+    return Request(request.get('id'), request['source'], request.get('stdin', ''), timeout, Limits(**values))
+
+def _work(connection: socket.socket) -> None:
+    # The whole life of a worker: it runs a single request, and exits, so that nothing that a program does can
+    # affect the next one
+    with connection.makefile('rb') as file:
+        line: bytes = file.readline()
+    if (not line):
+        return
+    job: dict[str, object] = json.loads(line)
+    result: dict[str, object] = run_source(job['source'], job['stdin'], job['timeout'], Limits(**job['limits']))
+    connection.sendall(json.dumps(result).encode('utf-8') + b'\n')
+
+class _Client:
+    def __init__(self, reader: object, write: Callable[[bytes], None]) -> None:
+        self.reader: object = reader
+        self.write: Callable[[bytes], None] = write
+        self.buffer: bytearray = bytearray()
+
+        # Requests of the client that have not been answered yet, and whether it has stopped sending them
+        self.pending: int = 0
+        self.finished: bool = False
+        self.closed: bool = False
+
+class _Worker:
+    def __init__(self, pid: int, connection: socket.socket) -> None:
+        self.pid: int = pid
+        self.connection: socket.socket = connection
+        self.buffer: bytearray = bytearray()
+
+        # The request that the worker is running, who it is for, and when the worker is killed if it has not
+        # answered by then
+        self.request: (Request | None) = None
+        self.client: (_Client | None) = None
+        self.deadline: (float | None) = None
+
+class Daemon:
+    # Runs programs for clients, which send requests as lines of JSON (see parse_request()) and get a line of JSON
+    # back for each of them, in the order that they finish in, with the same fields as the results of a batch.
+    # The interpreter is imported once, by the daemon; it keeps a pool of workers forked from itself ready, and
+    # hands every request to one of them, so a request does not wait for Python to start or for the
+    # interpreter to be imported, and each one still runs in a process of its own. A new worker is forked as
+    # soon as one is taken, while the request runs
+    def __init__(self, workers: int = (os.cpu_count() or 1), timeout: (float | None) = DEFAULT_TIMEOUT, limits: (Limits | None) = None) -> None:
+        if (not FORK_SUPPORTED):
+            raise OSError('the daemon needs os.fork(), which this platform does not have')
+        self.workers: int = workers
+        self.timeout: (float | None) = timeout
+        self.limits: Limits = Limits() if (limits is None) else limits
+
+        self._selector: selectors.BaseSelector = selectors.DefaultSelector()
+        self._idle: deque[_Worker] = deque()
+        self._busy: dict[int, _Worker] = {}
+        self._queue: deque[tuple[_Client, Request]] = deque()
+        self._exited: list[int] = []
+        self._running: bool = False
+
+    def _fork(self) -> None:
+        (ours, theirs) = socket.socketpair()
+        pid: int = os.fork()
+        if (pid == 0):
+            status: int = 0
+            try:
+                # Nothing of the daemon's is the worker's to touch; Ctrl+C and SIGTERM are handled by the daemon,
+                # which stops its workers itself
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                for key in list(self._selector.get_map().values()):
+                    if (isinstance(key.fileobj, socket.socket)):
+                        key.fileobj.close()
+                self._selector.close()
+                ours.close()
+                _work(theirs)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+
+        theirs.close()
+        worker: _Worker = _Worker(pid, ours)
+        self._selector.register(ours, selectors.EVENT_READ, (lambda: self._on_worker(worker)))
+        self._idle.append(worker)
+
+    def _respond(self, client: _Client, response: dict[str, object]) -> None:
+        client.pending -= 1
+        if (not client.closed):
+            try:
+                client.write(json.dumps(response).encode('utf-8') + b'\n')
+            except OSError:
+                self._close(client)
+        if (client.finished and (not client.pending)):
+            self._close(client)
+
+    def _close(self, client: _Client) -> None:
+        if (client.closed):
+            return
+        client.closed = True
+        if (not client.finished):
+            self._selector.unregister(client.reader)
+        if (isinstance(client.reader, socket.socket)):
+            client.reader.close()
+        else:
+            # Requests from standard input: the daemon is done once they are all answered
+            self._running = False
+
+    def _on_client(self, client: _Client) -> None:
+        # Closed by an earlier event of the same round
+        if (client.closed):
+            return
+        try:
+            data: bytes = client.reader.recv(65536) if (isinstance(client.reader, socket.socket)) else os.read(client.reader.fileno(), 65536)
+        except OSError:
+            data = b''
+        if (not data):
+            client.finished = True
+            self._selector.unregister(client.reader)
+            # The last request does not have to end with a newline
+            last: bytes = bytes(client.buffer)
+            client.buffer.clear()
+            if (last.strip()):
+                self._accept_request(client, last)
+            if (not client.pending):
+                self._close(client)
+            return
+
+        client.buffer += data
+        while (True):
+            end: int = client.buffer.find(b'\n')
+            if (end < 0):
+                break
+            line: bytes = bytes(client.buffer[:end])
+            del client.buffer[:end + 1]
+            if (line.strip()):
+                self._accept_request(client, line)
+        if (len(client.buffer) > MAX_REQUEST_BYTES):
+            client.pending += 1
+            self._respond(client, self._response(None, STATUS_BAD_REQUEST, f'a request cannot be longer than {MAX_REQUEST_BYTES} bytes'))
+            self._close(client)
+
+    def _accept_request(self, client: _Client, line: bytes) -> None:
+        client.pending += 1
+        try:
+            decoded: object = json.loads(line)
+        except ValueError as error:
+            self._respond(client, self._response(None, STATUS_BAD_REQUEST, f'not valid JSON: {error}'))
+            return
+        try:
+            request: Request = parse_request(decoded, self.timeout, self.limits)
+        except ValueError as error:
+            self._respond(client, self._response((decoded.get('id') if (type(decoded) is dict) else None), STATUS_BAD_REQUEST, str(error)))
+            return
+        self._queue.append((client, request))
+
+    def _on_connection(self, listener: socket.socket) -> None:
+        try:
+            (connection, _) = listener.accept()
+        except OSError:
+            return
+        client: _Client = _Client(connection, connection.sendall)
+        self._selector.register(connection, selectors.EVENT_READ, (lambda: self._on_client(client)))
+
+    def _on_worker(self, worker: _Worker) -> None:
+        try:
+            data: bytes = worker.connection.recv(1 << 20)
+        except OSError:
+            data = b''
+        worker.buffer += data
+        if (data and (not worker.buffer.endswith(b'\n'))):
+            return
+
+        self._retire(worker)
+        if (worker.client is None):
+            # An idle worker died before it was given anything to do
+            return
+        if (data):
+            self._respond(worker.client, {'id': worker.request.id} | json.loads(worker.buffer))
+        else:
+            self._respond(worker.client, self._response(worker.request.id, STATUS_CRASHED, 'the worker running it died'))
+
+    def _retire(self, worker: _Worker) -> None:
+        self._selector.unregister(worker.connection)
+        worker.connection.close()
+        self._busy.pop(worker.pid, None)
+        if (worker in self._idle):
+            self._idle.remove(worker)
+        self._exited.append(worker.pid)
+
+    @staticmethod
+    def _response(id: object, status: str, error: str) -> dict[str, object]:
+        return {'id': id, 'status': status, 'output': '', 'error': error, 'compile_seconds': None, 'run_seconds': None, 'total_seconds': None}
+
+    def _dispatch(self) -> None:
+        while (self._queue and self._idle):
+            (client, request) = self._queue.popleft()
+            if (client.closed):
+                client.pending -= 1
+                continue
+            worker: _Worker = self._idle.popleft()
+            (worker.request, worker.client) = (request, client)
+            if (request.timeout):
+                worker.deadline = time.monotonic() + request.timeout + KILL_GRACE
+            self._busy[worker.pid] = worker
+            job: dict[str, object] = {'source': request.source, 'stdin': request.stdin, 'timeout': request.timeout, 'limits': vars(request.limits)}
+            try:
+                worker.connection.sendall(json.dumps(job).encode('utf-8') + b'\n')
+            except OSError:
+                # Reported when the worker's end of the connection is read
+                pass
+
+    def _expire(self) -> (float | None):
+        # Kills the workers that are past their deadlines, and returns how long until the next deadline
+        now: float = time.monotonic()
+        wait: (float | None) = None
+        for worker in list(self._busy.values()):
+            if (worker.deadline is None):
+                continue
+            if (worker.deadline <= now):
+                try:
+                    os.kill(worker.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._retire(worker)
+                self._respond(worker.client, self._response(worker.request.id, STATUS_TIMEOUT, f'took longer than {worker.request.timeout:g} seconds'))
+            else:
+                wait = min(wait, worker.deadline - now) if (wait is not None) else (worker.deadline - now)
+        return wait
+
+    def _reap(self) -> None:
+        for pid in list(self._exited):
+            try:
+                if (os.waitpid(pid, os.WNOHANG)[0]):
+                    self._exited.remove(pid)
+            except ChildProcessError:
+                self._exited.remove(pid)
+
+    def _warm_up(self) -> None:
+        run_source(_WARM_UP_SOURCE, '', None, Limits())
+        # Whatever is allocated by now is shared with every worker; frozen, the garbage collector of a worker
+        # never touches it, and so never makes the worker copy those pages
+        gc.collect()
+        gc.freeze()
+
+    def _serve(self) -> None:
+        self._warm_up()
+        self._running = True
+        try:
+            while (self._running):
+                self._dispatch()
+                # Forking takes a few milliseconds, so workers are only replaced once there is nothing else to do,
+                # rather than while a response is waiting to be read
+                missing: bool = ((len(self._idle) + len(self._busy)) < self.workers)
+                wait: (float | None) = self._expire()
+                events: list[tuple[selectors.SelectorKey, int]] = self._selector.select(0 if (missing) else wait)
+                for key, _ in events:
+                    key.data()
+                if (missing and (not events)):
+                    self._fork()
+                self._reap()
+        finally:
+            for worker in list(self._idle) + list(self._busy.values()):
+                try:
+                    os.kill(worker.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._retire(worker)
+            for pid in self._exited:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            self._exited.clear()
+            self._selector.close()
+
+    def serve_stdio(self) -> None:
+        # Reads requests from standard input, and writes the responses to standard output, until standard input
+        # ends and every request has been answered
+        output = sys.stdout.buffer
+
+        def write(data: bytes) -> None:
+            output.write(data)
+            output.flush()
+
+        client: _Client = _Client(sys.stdin.buffer, write)
+        try:
+            self._selector.register(sys.stdin.buffer, selectors.EVENT_READ, (lambda: self._on_client(client)))
+        except PermissionError:
+            # Standard input is a regular file, which epoll cannot wait on; select() takes it, as always ready
+            self._selector.close()
+            self._selector = selectors.SelectSelector()
+            self._selector.register(sys.stdin.buffer, selectors.EVENT_READ, (lambda: self._on_client(client)))
+        self._serve()
+
+    def serve_socket(self, path: str) -> None:
+        # Accepts connections on a Unix socket, each of which can send any number of requests, until the daemon is
+        # stopped. A socket that is left over from an earlier daemon is replaced
+        if (os.path.exists(path)):
+            os.unlink(path)
+        listener: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(path)
+            listener.listen(128)
+            self._selector.register(listener, selectors.EVENT_READ, (lambda: self._on_connection(listener)))
+            self._serve()
+        finally:
+            listener.close()
+            if (os.path.exists(path)):
+                os.unlink(path)
+
+def request(path: str, source: str, stdin: str = '', limits: (dict[str, (int | float)] | None) = None, id: object = None) -> dict[str, object]:
+    # Runs a program on the daemon that is listening on the socket at path, and returns its response
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps({'id': id, 'source': source, 'stdin': stdin, 'limits': (limits or {})}).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as file:
+            line: bytes = file.readline()
+    if (not line):
+        raise ConnectionError('the daemon closed the connection without responding')
+    return json.loads(line)
+
+def _stop(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt()
+
+def main(arguments: (list[str] | None) = None) -> int:
+    parser = argparse.ArgumentParser(description='Runs pseudocode programs for clients, which send a JSON object with the "source" of a program (and optionally an "id", the "stdin" that it reads and its "limits") on each line, and get a line of JSON back for each one.')
+    parser.add_argument('--socket', metavar='PATH', help='the Unix socket to listen on (default: read requests from standard input, and write responses to standard output)')
+    parser.add_argument('-j', '--workers', type=int, default=(os.cpu_count() or 1), help='how many workers to keep ready (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help=f'the seconds that each program can take; 0 for no limit (default: {DEFAULT_TIMEOUT:g})')
+    add_limit_arguments(parser)
+    options = parser.parse_args(arguments)
+
+    if (options.workers < 1):
+        parser.error('--workers must be at least 1')
+    if (not FORK_SUPPORTED):
+        parser.error('the daemon is not supported on this platform')
+
+    daemon: Daemon = Daemon(options.workers, (options.timeout or None), limits_from_arguments(options))
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        if (options.socket):
+            print(f'listening on {options.socket}', file=sys.stderr)
+            daemon.serve_socket(options.socket)
+        else:
+            daemon.serve_stdio()
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -7,4 +7,16 @@ class LexerError(PseudocodeError):
 
 class ParserError(PseudocodeError):
     def __init__(self, message: str) -> None:
-        super().__init__('ParserError: ' + message)
\ No newline at end of file
+        super().__init__('ParserError: ' + message)
+
+class CompilerError(PseudocodeError):
+    def __init__(self, message: str) -> None:
+        super().__init__('CompilerError: ' + message)
+
+class ExecutionError(PseudocodeError):
+    def __init__(self, message: str) -> None:
+        super().__init__('ExecutionError: ' + message)
+
+class LimitExceededError(PseudocodeError):
+    def __init__(self, message: str) -> None:
+        super().__init__('LimitExceededError: ' + message)
\ No newline at end of file
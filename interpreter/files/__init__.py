@@ -0,0 +1 @@
+from .files import *
\ No newline at end of file
@@ -0,0 +1,248 @@
+# Standard library imports
+import os
+import mmap
+from typing import TextIO
+
+# Local imports
+from ..token import TokenType
+from ..runtime import Char, Record, RecordType, type_name
+
+# The modes that OPENFILE can open a file in; the argument of an OPEN_FILE instruction is the index of its mode
+FILE_MODES: tuple[str, ...] = (TokenType.READ.value, TokenType.WRITE.value, TokenType.APPEND.value, TokenType.RANDOM.value)
+(MODE_READ, MODE_WRITE, MODE_APPEND, MODE_RANDOM) = range(len(FILE_MODES))
+
+# Files are read this many characters at a time, and split into lines a whole chunk at a time
+READ_CHUNK_SIZE: int = (1 << 20)
+
+# Lines written to a file are held back until this many characters have built up, and then written in one go
+WRITE_BUFFER_SIZE: int = (1 << 18)
+
+_ENCODING: str = 'utf-8'
+
+class _FileReader:
+    def __init__(self, file: TextIO) -> None:
+        self._file: TextIO = file
+
+        # The whole lines of the last chunk that was read, the index of the next one to be read, and the start
+        # of a line that carries on into the next chunk
+        self._lines: list[str] = []
+        self._index: int = 0
+        self._partial: str = ''
+        self._exhausted: bool = False
+
+    def _fill(self) -> bool:
+        # Reads chunks until there is a line to be read, or there is nothing more in the file
+        while ((self._index == len(self._lines)) and (not self._exhausted)):
+            chunk: str = self._file.read(READ_CHUNK_SIZE)
+            if (not chunk):
+                self._exhausted = True
+                (self._lines, self._index) = (([self._partial] if (self._partial) else []), 0)
+                self._partial = ''
+                break
+            lines: list[str] = (self._partial + chunk).split('\n')
+            self._partial = lines.pop()
+            (self._lines, self._index) = (lines, 0)
+        return (self._index < len(self._lines))
+
+    def at_end(self) -> bool:
+        return ((self._index == len(self._lines)) and (not self._fill()))
+
+    def read_line(self, name: object) -> str:
+        index: int = self._index
+        if (index == len(self._lines)):
+            if (not self._fill()):
+                raise EOFError(f"there is no more data to read from {repr(str(name))}")
+            index = 0
+        self._index = index + 1
+        return self._lines[index]
+
+    def close(self) -> None:
+        self._file.close()
+
+class _FileWriter:
+    def __init__(self, file: TextIO) -> None:
+        self._file: TextIO = file
+        self._pending: list[str] = []
+        self._pending_size: int = 0
+
+    def write_line(self, line: str) -> None:
+        self._pending.append(line)
+        self._pending.append('\n')
+        self._pending_size += len(line) + 1
+        if (self._pending_size >= WRITE_BUFFER_SIZE):
+            self._write_out()
+
+    def _write_out(self) -> None:
+        if (self._pending):
+            text: str = ''.join(self._pending)
+            self._pending.clear()
+            self._pending_size = 0
+            self._file.write(text)
+
+    def close(self) -> None:
+        try:
+            self._write_out()
+        finally:
+            self._file.close()
+
+class _RecordFile:
+    # A RANDOM file: a run of fixed-size records, laid out as their RecordType says, which is mapped into
+    # memory, so that seeking costs nothing and records are read and written in place. The record type is fixed
+    # by the first GETRECORD or PUTRECORD
+    def __init__(self, descriptor: int) -> None:
+        self._descriptor: int = descriptor
+
+        # The size of the records in the file, and that of the file while it is open, which grows ahead of it
+        # as records are put past its end, so that it is not mapped again for every one of them
+        self._size: int = os.fstat(descriptor).st_size
+        self._capacity: int = self._size
+        self._map: (mmap.mmap | None) = mmap.mmap(descriptor, self._size) if (self._size) else None
+
+        self._record_type: (RecordType | None) = None
+
+        # The index of the record that the next GETRECORD or PUTRECORD is at
+        self._position: int = 0
+
+    def _check_type(self, name: str, record: object) -> RecordType:
+        if (type(record) is not Record):
+            raise TypeError(f"records of a file must be of a record type, got {type_name(record)}")
+        record_type: RecordType = record.record_type
+        if (self._record_type is not record_type):
+            if (self._record_type is not None):
+                raise TypeError(f"the file {repr(name)} holds {self._record_type.name} records, got {record_type.name}")
+            if (not record_type.size):
+                raise ValueError(f"{record_type.name} records have no fields, so they cannot be kept in a file")
+            if (self._size % record_type.size):
+                raise ValueError(f"the file {repr(name)} does not hold {record_type.name} records")
+            self._record_type = record_type
+        return record_type
+
+    def seek(self, address: object) -> None:
+        if (type(address) is not int):
+            raise TypeError(f"a record address must be an INTEGER, got {type_name(address)}")
+        if (address < 1):
+            raise ValueError(f"record addresses start at 1, got {address}")
+        self._position = address - 1
+
+    def get_record(self, name: str, record: object) -> None:
+        record_type: RecordType = self._check_type(name, record)
+        offset: int = self._position * record_type.size
+        if (offset + record_type.size > self._size):
+            raise EOFError(f"there is no record {self._position + 1} in {repr(name)}")
+        record.values = record_type.unpack_from(self._map, offset)
+        self._position += 1
+
+    def put_record(self, name: str, record: object) -> None:
+        record_type: RecordType = self._check_type(name, record)
+        offset: int = self._position * record_type.size
+        end: int = offset + record_type.size
+        if (end > self._capacity):
+            self._grow(max(end, 2 * self._capacity))
+        record_type.pack_into(self._map, offset, record)
+        self._size = max(self._size, end)
+        self._position += 1
+
+    def _grow(self, capacity: int) -> None:
+        # Extending the file fills it with zero bytes, which is what a record of default values is
+        if (self._map is not None):
+            self._map.close()
+        os.ftruncate(self._descriptor, capacity)
+        self._map = mmap.mmap(self._descriptor, capacity)
+        self._capacity = capacity
+
+    def at_end(self) -> bool:
+        if (self._record_type is None):
+            return (self._size == 0)
+        return ((self._position * self._record_type.size) >= self._size)
+
+    def close(self) -> None:
+        try:
+            if (self._map is not None):
+                self._map.flush()
+                self._map.close()
+            if (self._capacity != self._size):
+                os.ftruncate(self._descriptor, self._size)
+        finally:
+            os.close(self._descriptor)
+
+# The kind of file that each mode opens
+_FILE_KINDS: tuple[type, ...] = (_FileReader, _FileWriter, _FileWriter, _RecordFile)
+
+class FileTable:
+    # The files that a running program has open, by the name they were opened with, which is how the file
+    # statements refer to them. Every line of a text file is a value, as it is for INPUT and OUTPUT; a RANDOM
+    # file holds records
+    def __init__(self) -> None:
+        self._files: dict[str, (_FileReader | _FileWriter | _RecordFile)] = {}
+
+    @staticmethod
+    def _name(name: object) -> str:
+        if ((type(name) is not str) and (type(name) is not Char)):
+            raise TypeError(f"a file name must be a STRING, got {type_name(name)}")
+        return str(name)
+
+    def _file(self, name: object, mode: int) -> (_FileReader | _FileWriter | _RecordFile):
+        # A name that is not a STRING is never in the table, so it is only checked once it is not found
+        file: (_FileReader | _FileWriter | _RecordFile | None) = self._files.get(name) if (type(name) is str) else None
+        if (file is None):
+            name = self._name(name)
+            file = self._files.get(name)
+            if (file is None):
+                raise ValueError(f"the file {repr(name)} is not open")
+        if (type(file) is not _FILE_KINDS[mode]):
+            raise ValueError(f"the file {repr(name)} is not open for {FILE_MODES[mode]}")
+        return file
+
+    def open(self, name: object, mode: int) -> None:
+        name = self._name(name)
+        if (name in self._files):
+            raise ValueError(f"the file {repr(name)} is already open")
+        try:
+            if (mode == MODE_READ):
+                self._files[name] = _FileReader(open(name, 'r', encoding=_ENCODING))
+            elif (mode == MODE_RANDOM):
+                self._files[name] = _RecordFile(os.open(name, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o666))
+            else:
+                self._files[name] = _FileWriter(open(name, ('w' if (mode == MODE_WRITE) else 'a'), encoding=_ENCODING))
+        except OSError as error:
+            raise OSError(f"cannot open {repr(name)}: {error.strerror or error}") from None
+
+    def read_line(self, name: object) -> str:
+        return self._file(name, MODE_READ).read_line(name)
+
+    def write_line(self, name: object, line: str) -> None:
+        self._file(name, MODE_WRITE).write_line(line)
+
+    def at_end(self, name: object) -> bool:
+        if ((type(name) is str) and (type(self._files.get(name)) is _RecordFile)):
+            return self._files[name].at_end()
+        return self._file(name, MODE_READ).at_end()
+
+    def seek(self, name: object, address: object) -> None:
+        self._file(name, MODE_RANDOM).seek(address)
+
+    def get_record(self, name: object, record: object) -> None:
+        self._file(name, MODE_RANDOM).get_record(str(name), record)
+
+    def put_record(self, name: object, record: object) -> None:
+        self._file(name, MODE_RANDOM).put_record(str(name), record)
+
+    def close(self, name: object) -> None:
+        name = self._name(name)
+        file: (_FileReader | _FileWriter | _RecordFile | None) = self._files.pop(name, None)
+        if (file is None):
+            raise ValueError(f"the file {repr(name)} is not open")
+        file.close()
+
+    def close_all(self) -> None:
+        # Closes whatever the program has left open, once it ends; the first error is raised once they are all closed
+        files: list[(_FileReader | _FileWriter | _RecordFile)] = list(self._files.values())
+        self._files.clear()
+        error: (OSError | None) = None
+        for file in files:
+            try:
+                file.close()
+            except OSError as close_error:
+                error = error or close_error
+        if (error is not None):
+            raise error
@@ -1 +1,3 @@
-from .lexer import *
\ No newline at end of file
+from .lexer import *
+from .fast_lexer import *
+from .streaming_lexer import *
\ No newline at end of file
@@ -0,0 +1,217 @@
+# Standard library imports
+import re
+
+# Local imports
+from ..token import Token, TokenType, TokenStream, TOKEN_KINDS
+from ..errors import LexerError
+from .lexer import Lexer
+
+# One pass over the source: optional whitespace, followed by exactly one of the alternatives below.
+# Character classes are ASCII-only; a token that touches a non-ASCII character is handed over to Lexer,
+# since str.isalpha()/str.isdigit() (which Lexer relies on) have no exact regex equivalent
+_MASTER_PATTERN: re.Pattern = re.compile(
+    r'[ \t\r]*(?:'
+    r'(?P<EOL>\n)'
+    r'|(?P<COMMENT>//[^\n]*)'
+    r'|(?P<DATE>D")'
+    r'|(?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|(?P<NUMBER>[0-9]+(?:\.[0-9]*)?|\.[0-9]+)'
+    r'|(?P<STRING>")'
+    r'|(?P<CHAR>\')'
+    r'|(?P<OPERATOR><-|<>|<=|>=|[-+*/^.:=&()\[\],<>])'
+    r'|(?P<OTHER>.)'
+    r'|(?P<EOF>\Z)'
+    r')'
+)
+
+# The rest of a string/char literal after its opening quote, up to the first closing quote that is not escaped
+_STRING_BODY_PATTERNS: dict[str, re.Pattern] = {
+    TokenType.DOUBLE_QUOTE.value: re.compile(r'[^\n]*?(?<!\\)"'),
+    TokenType.SINGLE_QUOTE.value: re.compile(r"[^\n]*?(?<!\\)'"),
+}
+
+_OPERATOR_TOKEN_TYPES: dict[str, TokenType] = {
+    **{literal: token_type for literal, token_type in Lexer.SIMPLE_TOKEN_TYPES.items() if (literal not in (TokenType.EOF.value, TokenType.EOL.value))},
+    TokenType.ASSIGNMENT.value: TokenType.ASSIGNMENT,
+    TokenType.NOT_EQUALS_TO.value: TokenType.NOT_EQUALS_TO,
+    TokenType.LESSER_OR_EQUALS_TO.value: TokenType.LESSER_OR_EQUALS_TO,
+    TokenType.GREATER_OR_EQUALS_TO.value: TokenType.GREATER_OR_EQUALS_TO,
+    TokenType.L_ANGLE_BRACKET.value: TokenType.L_ANGLE_BRACKET,
+    TokenType.R_ANGLE_BRACKET.value: TokenType.R_ANGLE_BRACKET,
+    TokenType.FORWARD_SLASH.value: TokenType.FORWARD_SLASH,
+    TokenType.PERIOD.value: TokenType.PERIOD,
+}
+
+_OPERATOR_KINDS: dict[str, int] = {literal: TOKEN_KINDS[token_type] for literal, token_type in _OPERATOR_TOKEN_TYPES.items()}
+
+# Group numbers of the alternatives above, compared against Match.lastindex
+(_EOL, _COMMENT, _DATE, _IDENTIFIER, _NUMBER, _STRING, _CHAR, _OPERATOR, _OTHER, _EOF) = range(1, 11)
+
+# Enum member values are looked up through a descriptor, which is too slow for the scanning loop
+_PERIOD: str = TokenType.PERIOD.value
+
+def _line_end(source: str, position: int) -> int:
+    line_end: int = source.find(TokenType.EOL.value, position)
+    return len(source) if (line_end == -1) else line_end
+
+def lex(source: str, first_line: int = 1) -> TokenStream:
+    # Scans the whole source into a TokenStream, holding exactly the tokens that Lexer.get_next_token() returns
+    # for the same source, up to and including the first EOF token. A LexerError stops the scan and is kept
+    # in TokenStream.error, so that it can be raised at the same point in the token stream as Lexer raises it.
+    # Line numbers start from first_line, for sources that are whole lines sliced out of a larger input
+    stream: TokenStream = TokenStream(source, first_line)
+
+    match = _MASTER_PATTERN.match
+    keywords: dict[str, TokenType] = Lexer.KEYWORD_TOKEN_TYPES
+    kinds: dict[TokenType, int] = TOKEN_KINDS
+    operator_kinds: dict[str, int] = _OPERATOR_KINDS
+    length: int = len(source)
+
+    append_kind = stream.kinds.append
+    append_start = stream.starts.append
+    append_end = stream.ends.append
+    append_line = stream.lines.append
+    append_literal_flag = stream.literal_flags.append
+    append_line_start = stream.line_starts.append
+
+    identifier_kind: int = kinds[TokenType.IDENTIFIER]
+    boolean_kind: int = kinds[TokenType.BOOLEAN]
+    integer_kind: int = kinds[TokenType.INTEGER]
+    real_kind: int = kinds[TokenType.REAL]
+    eol_kind: int = kinds[TokenType.EOL]
+    illegal_kind: int = kinds[TokenType.ILLEGAL]
+    eof_kind: int = kinds[TokenType.EOF]
+    string_kinds: dict[int, int] = {_STRING: kinds[TokenType.STRING], _CHAR: kinds[TokenType.CHAR], _DATE: kinds[TokenType.DATE]}
+
+    position: int = 0
+    line: int = first_line
+    line_start: int = 0
+
+    fallback_lexer: Lexer = Lexer(source)
+
+    try:
+        while True:
+            match_object: re.Match = match(source, position)
+            kind: int = match_object.lastindex
+            start, end = match_object.span(kind)
+
+            if (((end < length) and (source[end] >= '\x80') and ((kind == _IDENTIFIER) or (kind == _NUMBER) or ((kind == _OPERATOR) and (source[start] == _PERIOD))))
+                    or ((kind == _OTHER) and (source[start] >= '\x80'))):
+                # Lets Lexer read this token instead, starting from the same position
+                fallback_lexer._position = start - 1
+                fallback_lexer._line = line
+                fallback_lexer._column = start - line_start
+                token: Token = fallback_lexer.get_next_token()
+                position = fallback_lexer._position + 1
+
+                append_kind(kinds[token.type])
+                append_start(start)
+                append_end(position)
+                append_line(line)
+                append_literal_flag(hasattr(token, 'is_literal'))
+                continue
+
+            if (kind == _IDENTIFIER):
+                identifier: str = source[start:end]
+                if ((identifier == 'TRUE') or (identifier == 'FALSE')):
+                    append_kind(boolean_kind)
+                    append_literal_flag(True)
+                else:
+                    keyword: (TokenType | None) = keywords.get(identifier)
+                    append_kind(identifier_kind if (keyword is None) else kinds[keyword])
+                    append_literal_flag(False)
+
+            elif (kind == _OPERATOR):
+                append_kind(operator_kinds[source[start:end]])
+                append_literal_flag(False)
+
+            elif (kind == _EOL):
+                append_kind(eol_kind)
+                append_literal_flag(False)
+
+            elif (kind == _NUMBER):
+                if ((end < length) and (source[end] == _PERIOD)):
+                    # Only reachable once the number already has a decimal point
+                    raise LexerError(f"line {line}, col {end - line_start}; more than one decimal point")
+
+                append_kind(real_kind if (_PERIOD in source[start:end]) else integer_kind)
+                append_literal_flag(True)
+
+            elif (kind == _COMMENT):
+                position = end
+                continue
+
+            elif ((kind == _STRING) or (kind == _CHAR) or (kind == _DATE)):
+                column: int = start - line_start + 1
+                quote: str = source[end - 1]
+                body: (re.Match | None) = _STRING_BODY_PATTERNS[quote].match(source, end)
+                if (body is None):
+                    # Lexer reports the position of the last character before the end of the line
+                    raise LexerError(f"line {line}, col {_line_end(source, end) - line_start}; unclosed {'string' if (quote == TokenType.DOUBLE_QUOTE.value) else 'char'} literal")
+
+                string_end: int = body.end()
+                if (kind == _CHAR):
+                    if (len(source[end : (string_end - 1)].replace('\\', '')) > 1):
+                        raise LexerError(f"line {line}, col {column}; a char literal can only consist of one character")
+                elif (kind == _DATE):
+                    if (not Lexer._is_valid_date(source[end : (string_end - 1)].replace('\\', ''))):
+                        raise LexerError(f'line {line}, col {column}; incorrect date format. the correct format is D"dd/mm/yyyy"')
+
+                end = string_end
+                append_kind(string_kinds[kind])
+                append_literal_flag(True)
+
+            elif (kind == _OTHER):
+                append_kind(illegal_kind)
+                append_literal_flag(False)
+
+            else:
+                append_kind(eof_kind)
+                append_start(start)
+                append_end(end)
+                append_line(line)
+                append_literal_flag(False)
+                break
+
+            append_start(start)
+            append_end(end)
+            append_line(line)
+            position = end
+
+            if (kind == _EOL):
+                line += 1
+                line_start = end
+                append_line_start(end)
+    except LexerError as error:
+        stream.error = error
+
+    return stream
+
+def tokenize(source: str) -> list[Token]:
+    # All the tokens of the source, ending with a single EOF token
+    stream: TokenStream = lex(source)
+    if (stream.error):
+        raise stream.error
+    return stream.tokens()
+
+class FastLexer(Lexer):
+    # Drop-in replacement for Lexer that hands out the tokens of a TokenStream, scanned in one pass by a single
+    # compiled regular expression instead of per-character steps. Token objects are only built as they are read
+    def __init__(self, input: (str | TokenStream)) -> None:
+        self._stream: TokenStream = input if (isinstance(input, TokenStream)) else lex(input)
+        super().__init__(self._stream.source)
+        self._index: int = 0
+
+    def get_next_token(self) -> Token:
+        stream: TokenStream = self._stream
+        index: int = self._index
+        self._index += 1
+
+        if (index < len(stream)):
+            return stream.token(index)
+        if (stream.error):
+            raise stream.error
+
+        # Lexer keeps advancing past the end of the input, one column per call
+        last: int = len(stream) - 1
+        return Token(TokenType.EOF, TokenType.EOF.value, stream.lines[last], stream.column(last) + (index - last))
\ No newline at end of file
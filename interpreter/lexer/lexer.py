@@ -1,3 +1,6 @@
+# Standard library imports
+import sys
+
 # Local imports
 from ..token import Token, TokenType
 from ..errors import LexerError
@@ -63,6 +66,7 @@ class Lexer:
         TokenType.CALL.value: TokenType.CALL,
         
         TokenType.BYREF.value: TokenType.BYREF,
+        TokenType.BYVAL.value: TokenType.BYVAL,
         
         TokenType.FUNCTION.value: TokenType.FUNCTION,
         TokenType.RETURNS.value: TokenType.RETURNS,
@@ -84,9 +88,14 @@ class Lexer:
         TokenType.OPENFILE.value: TokenType.OPENFILE,
         TokenType.READFILE.value: TokenType.READFILE,
         TokenType.WRITEFILE.value: TokenType.WRITEFILE,
+        TokenType.CLOSEFILE.value: TokenType.CLOSEFILE,
         TokenType.READ.value: TokenType.READ,
         TokenType.WRITE.value: TokenType.WRITE,
         TokenType.APPEND.value: TokenType.APPEND,
+        TokenType.RANDOM.value: TokenType.RANDOM,
+        TokenType.SEEK.value: TokenType.SEEK,
+        TokenType.GETRECORD.value: TokenType.GETRECORD,
+        TokenType.PUTRECORD.value: TokenType.PUTRECORD,
         
         TokenType.PUBLIC.value: TokenType.PUBLIC,
         TokenType.PRIVATE.value: TokenType.PRIVATE,
@@ -180,6 +189,17 @@ class Lexer:
         
         return self._input[(start_pos + 1) : end_pos].replace('\\', '')
     
+    @staticmethod
+    def _is_valid_date(string: str) -> bool:
+        try:
+            dd, mm, yyyy = string.split('/')
+            dd = int(dd)
+            mm = int(mm)
+            yyyy = int(yyyy)
+        except Exception:
+            return False
+        return not ((dd < 0) or (dd > 31) or (mm < 0) or (mm > 12) or (yyyy < 0) or (yyyy > 9999))
+    
     def get_next_token(self) -> Token:
         self._advance()
         self._skip_whitespace()
@@ -249,14 +269,7 @@ class Lexer:
                 if (following_char == TokenType.DOUBLE_QUOTE.value):
                     self._advance()
                     string = self._read_string(TokenType.DOUBLE_QUOTE)
-                    try:
-                        dd, mm, yyyy = string.split('/')
-                        dd = int(dd)
-                        mm = int(mm)
-                        yyyy = int(yyyy)
-                        if ((dd < 0) or (dd > 31) or (mm < 0) or (mm > 12) or (yyyy < 0) or (yyyy > 9999)):
-                            raise Exception()
-                    except:
+                    if (not self._is_valid_date(string)):
                         raise LexerError(f'line {line}, col {column}; incorrect date format. the correct format is D"dd/mm/yyyy"')
                     token: Token = Token(TokenType.DATE, string, line, column)
                     token.is_literal = True
@@ -276,6 +289,9 @@ class Lexer:
                 return token
             
             token_type: TokenType = (self.KEYWORD_TOKEN_TYPES.get(identifier) or TokenType.IDENTIFIER)
+            if (token_type == TokenType.IDENTIFIER):
+                # Interned, so that every use of a name is the same string, which hashes and compares by identity
+                identifier = sys.intern(identifier)
             
             return Token(token_type, identifier, line, column)
         
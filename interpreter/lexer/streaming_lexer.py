@@ -0,0 +1,123 @@
+# Standard library imports
+import codecs, mmap, os
+from typing import BinaryIO, TextIO
+
+# Local imports
+from ..token import Token, TokenType, TokenStream
+from ..errors import LexerError
+from .lexer import Lexer
+from .fast_lexer import lex
+
+DEFAULT_CHUNK_SIZE: int = (1 << 20)
+
+class StreamingLexer(Lexer):
+    # Lexes a file object or an mmap in fixed-size chunks, handing out tokens lazily, so that memory use is
+    # bounded by the chunk size (plus the longest line) rather than the size of the input.
+    # No token spans an EOL (strings, dates and comments all end at the end of their line), so the input is
+    # lexed one run of complete lines at a time; a partial line at the end of a chunk waits for the next chunk
+    def __init__(self, source: (TextIO | BinaryIO | mmap.mmap), chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        super().__init__('')
+
+        self._source: (TextIO | BinaryIO | mmap.mmap) = source
+        self._chunk_size: int = chunk_size
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder('utf-8')()
+
+        # Text read past the last EOL so far, i.e. the start of a line that is not complete yet
+        self._partial_line: list[str] = []
+        self._next_line: int = 1
+
+        self._stream: (TokenStream | None) = None
+        self._index: int = 0
+        self._limit: int = 0
+
+        self._eof: (Token | None) = None
+
+        # Objects opened by from_path(), closed along with the lexer
+        self._owned: list[object] = []
+
+    @classmethod
+    def from_path(cls, path: (str | os.PathLike), chunk_size: int = DEFAULT_CHUNK_SIZE) -> 'StreamingLexer':
+        file: BinaryIO = open(path, 'rb')
+        if (os.fstat(file.fileno()).st_size == 0):
+            # An empty file cannot be memory-mapped
+            lexer: StreamingLexer = cls(file, chunk_size)
+            lexer._owned.append(file)
+            return lexer
+
+        mapping: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        lexer: StreamingLexer = cls(mapping, chunk_size)
+        lexer._owned += [mapping, file]
+        return lexer
+
+    def close(self) -> None:
+        for owned in self._owned:
+            owned.close()
+        self._owned.clear()
+
+    def __enter__(self) -> 'StreamingLexer':
+        return self
+
+    def __exit__(self, *exception: object) -> None:
+        self.close()
+
+    def _decode(self, data: (str | bytes), final: bool = False) -> str:
+        if (isinstance(data, str)):
+            return data
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            raise LexerError(f"line {self._next_line}; the input is not valid UTF-8") from None
+
+    def _load_next_segment(self) -> None:
+        while True:
+            chunk: (str | bytes) = self._source.read(self._chunk_size)
+
+            if (not chunk):
+                self._partial_line.append(self._decode(b'', final=True))
+                segment: str = ''.join(self._partial_line)
+                self._partial_line.clear()
+
+                # The last segment also holds the EOF token
+                self._stream = lex(segment, self._next_line)
+                self._index, self._limit = 0, len(self._stream)
+                return
+
+            text: str = self._decode(chunk)
+            cut: int = text.rfind(TokenType.EOL.value) + 1
+            if (not cut):
+                self._partial_line.append(text)
+                continue
+
+            self._partial_line.append(text[:cut])
+            segment: str = ''.join(self._partial_line)
+            self._partial_line = [text[cut:]]
+
+            self._stream = lex(segment, self._next_line)
+            self._next_line += segment.count(TokenType.EOL.value)
+
+            # A segment ends with an EOL, so its EOF token is not the end of the input; unless lexing
+            # stopped early with an error, in which case the error has to be raised at that point
+            self._index = 0
+            self._limit = len(self._stream) if (self._stream.error) else (len(self._stream) - 1)
+            return
+
+    def get_next_token(self) -> Token:
+        while True:
+            stream: (TokenStream | None) = self._stream
+
+            if ((stream is not None) and (self._index < self._limit)):
+                token: Token = stream.token(self._index)
+                self._index += 1
+                if (token.type == TokenType.EOF):
+                    self._eof = token
+                return token
+
+            if ((stream is not None) and (stream.error)):
+                raise stream.error
+
+            if (self._eof is not None):
+                # Lexer keeps advancing past the end of the input, one column per call
+                self._eof = Token(TokenType.EOF, TokenType.EOF.value, self._eof.line, self._eof.column + 1)
+                return self._eof
+
+            self._load_next_segment()
\ No newline at end of file
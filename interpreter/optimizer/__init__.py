@@ -0,0 +1,2 @@
+from .optimizer import *
+from .common_subexpressions import *
\ No newline at end of file
@@ -0,0 +1,375 @@
+# Standard library imports
+import copy
+import bisect
+
+# Local imports
+from ..token import Token, TokenType
+from ..parser.ast import ParsedProgram, statements, expressions
+from ..compiler import first_token, flatten_concatenation
+from ..resolver import SymbolTable, global_table, subroutine_table, pure_functions, EVALUATED_FIELDS, WRITING_STATEMENTS, evaluated_expressions, nested_blocks, called_functions
+
+def _replace(node: object, fields: dict[str, object]) -> object:
+    # A copy of a node with some of its fields replaced; the node itself is left as it is
+    if (all((getattr(node, field) is value) for field, value in fields.items())):
+        return node
+    replaced: object = copy.copy(node)
+    for field, value in fields.items():
+        setattr(replaced, field, value)
+    return replaced
+
+class CommonSubexpressionEliminator:
+    # Finds the expressions that are evaluated again with the same operands, and has them evaluated only once.
+    # Expressions are hash-consed: every distinct structure (the same operators, literals, variables and pure
+    # FUNCTIONs, see pure_functions(), put together the same way) is given a number, from the numbers of its
+    # operands. The first occurrence of an expression is kept in a temporary, and every later occurrence with
+    # the same number becomes a reference to that one shared node, which loads the temporary instead (see
+    # expressions.CommonSubexpression).
+    # An occurrence is only replaced when the first one is certain to have been evaluated before it, with none
+    # of its variables having been bound since: that is, earlier on in the same block, or in a block that the
+    # later one is inside of. An expression stops being available when a variable it uses is written to, and
+    # every expression does at a CALL or a call of a FUNCTION that is not pure. Inside a subroutine, writing to
+    # a variable that is not its own (or that is a BYREF parameter) could change any other such variable, so it
+    # makes every expression that uses one unavailable.
+    # A loop's condition and body are only given what its body leaves available, as they run again after
+    # it. Nodes that do not change are shared with the original program, which is left as it is
+    def __init__(self) -> None:
+        self._pure: set[str] = set()
+
+        # The number of every structure, and the number of every expression seen (None for one that cannot
+        # be reused) along with the variables that it uses, by id()
+        self._numbers: dict[tuple, int] = {}
+        self._descriptions: dict[int, tuple[(int | None), frozenset[str]]] = {}
+
+        # What every block of the program could write to (see _writes()), by id()
+        self._block_writes: dict[int, (set[str] | None)] = {}
+
+        # The table of the subroutine being walked; None for the main program
+        self._table: (SymbolTable | None) = None
+
+        # The expressions that are available, by number: the first occurrence of each, along with the version
+        # of each of its variables and the epochs when it was evaluated. Writing to a variable gives it a new
+        # version, and anything that could change every variable (or every shared one) starts a new epoch, so
+        # that nothing has to be removed from here; what a block adds is undone with the log at its end
+        self._available: dict[int, tuple[int, tuple[tuple[str, int], ...], int, int]] = {}
+        self._log: list[tuple[int, (tuple | None)]] = []
+        self._versions: dict[str, int] = {}
+        self._epoch: int = 0
+        self._shared_epoch: int = 0
+
+        # Every occurrence of an expression that could be replaced is numbered in the order it is walked in,
+        # which is the same in both walks of the program. The first walk finds the occurrences that can be
+        # replaced, along with the first occurrence that each one is replaced by, and the second puts the
+        # CommonSubexpressions in, only walking the top-level statements (and subroutines) that have any
+        self._occurrences: int = 0
+        self._replaced: dict[int, int] = {}
+        self._reused: set[int] = set()
+        self._ranges: list[tuple[int, int]] = []
+        self._rewriting: bool = False
+        self._firsts: dict[int, expressions.CommonSubexpression] = {}
+        self._temporaries: int = 0
+
+    def _is_shared(self, identifier: str) -> bool:
+        # Whether a variable could be changed through another name: a variable of the main program, or a BYREF
+        # parameter, seen from a subroutine
+        return (self._table is not None) and ((identifier not in self._table) or (identifier in self._table.references))
+
+    def _number(self, structure: tuple) -> int:
+        number: (int | None) = self._numbers.get(structure)
+        if (number is None):
+            number = self._numbers[structure] = len(self._numbers)
+        return number
+
+    def _describe(self, expression: expressions.Expression) -> tuple[(int | None), frozenset[str]]:
+        # The number of an expression's structure (None for one that cannot be reused), along with the
+        # variables that it uses
+        description: (tuple[(int | None), frozenset[str]] | None) = self._descriptions.get(id(expression))
+        if (description is not None):
+            return description
+
+        number: (int | None) = None
+        identifiers: frozenset[str] = frozenset()
+        match(expression):
+            case expressions.Atom():
+                token: Token = expression.token
+                number = self._number((expressions.Atom, token.kind, token.literal))
+                if (token.type == TokenType.IDENTIFIER):
+                    identifiers = frozenset((token.literal,))
+            case expressions.PrefixOperator():
+                operand, identifiers = self._describe(expression.operand)
+                if (operand is not None):
+                    number = self._number((expressions.PrefixOperator, expression.operator.kind, operand))
+            case expressions.InfixOperator():
+                lhs, identifiers = self._describe(expression.lhs)
+                if (expression.operator.type == TokenType.PERIOD):
+                    if ((lhs is not None) and (type(expression.rhs) is expressions.Atom)):
+                        number = self._number((expressions.InfixOperator, expression.operator.kind, lhs, expression.rhs.token.literal))
+                else:
+                    rhs, rhs_identifiers = self._describe(expression.rhs)
+                    identifiers = identifiers | rhs_identifiers
+                    if ((lhs is not None) and (rhs is not None)):
+                        number = self._number((expressions.InfixOperator, expression.operator.kind, lhs, rhs))
+            case expressions.ArrayIndexing():
+                parts: list[tuple[(int | None), frozenset[str]]] = [self._describe(expression.identifier)] + [self._describe(index) for index in expression.indexes]
+                identifiers = frozenset().union(*(part_identifiers for _, part_identifiers in parts))
+                if (all((part is not None) for part, _ in parts)):
+                    number = self._number((expressions.ArrayIndexing,) + tuple(part for part, _ in parts))
+            case expressions.FunctionCall():
+                parts: list[tuple[(int | None), frozenset[str]]] = [self._describe(argument) for argument in expression.arguments]
+                identifiers = frozenset().union(*(part_identifiers for _, part_identifiers in parts))
+                name: str = expression.identifier.token.literal
+                if ((name in self._pure) and all((part is not None) for part, _ in parts)):
+                    number = self._number((expressions.FunctionCall, name) + tuple(part for part, _ in parts))
+
+        description = self._descriptions[id(expression)] = (number, identifiers)
+        return description
+
+    def _kill(self, identifiers: (set[str] | None)) -> None:
+        # Makes the expressions that use any of the variables unavailable; None for every variable
+        if (identifiers is None):
+            self._epoch += 1
+            return
+        for identifier in identifiers:
+            self._versions[identifier] = self._versions.get(identifier, 0) + 1
+            if (self._is_shared(identifier)):
+                self._shared_epoch += 1
+
+    def _lookup(self, number: int) -> (int | None):
+        # The first occurrence of an expression, if it is still available
+        entry: (tuple[int, tuple[tuple[str, int], ...], int, int] | None) = self._available.get(number)
+        if ((entry is None) or (entry[2] != self._epoch) or (entry[3] not in (-1, self._shared_epoch))):
+            return None
+        versions: dict[str, int] = self._versions
+        if (any((versions.get(identifier, 0) != version) for identifier, version in entry[1])):
+            return None
+        return entry[0]
+
+    def _add(self, number: int, occurrence: int, identifiers: frozenset[str]) -> None:
+        shared: bool = any(self._is_shared(identifier) for identifier in identifiers)
+        self._log.append((number, self._available.get(number)))
+        self._available[number] = (occurrence, tuple((identifier, self._versions.get(identifier, 0)) for identifier in identifiers), self._epoch, (self._shared_epoch if (shared) else -1))
+
+    def _undo(self, mark: int) -> None:
+        # Takes back whatever was made available since the log was mark long
+        log: list[tuple[int, (tuple | None)]] = self._log
+        while (len(log) > mark):
+            number, entry = log.pop()
+            if (entry is None):
+                del self._available[number]
+            else:
+                self._available[number] = entry
+
+    def _writes(self, block: list[statements.Statement]) -> (set[str] | None):
+        # The variables that running the block could write to, or None if it could write to any of them;
+        # worked out once for every block, as the blocks inside it are asked about again when they are walked
+        if (id(block) in self._block_writes):
+            return self._block_writes[id(block)]
+
+        written: (set[str] | None) = set()
+        for statement in block:
+            if ((type(statement) is statements.CALL) or any(self._calls_impure(expression) for expression in evaluated_expressions(statement))):
+                written = None
+                break
+            if (isinstance(statement, WRITING_STATEMENTS)):
+                written.add(statement.identifier.literal)
+            for nested in nested_blocks(statement):
+                nested_written: (set[str] | None) = self._writes(nested)
+                if (nested_written is None):
+                    written = None
+                    break
+                written |= nested_written
+            if (written is None):
+                break
+        self._block_writes[id(block)] = written
+        return written
+
+    def _calls_impure(self, expression: expressions.Expression) -> bool:
+        return any((name not in self._pure) for name in called_functions(expression))
+
+    def _children(self, expression: expressions.Expression) -> expressions.Expression:
+        # The expression with its operands walked, in the order they are evaluated in
+        match(expression):
+            case expressions.PrefixOperator() | expressions.PostfixOperator():
+                return _replace(expression, {'operand': self._expression(expression.operand)})
+            case expressions.InfixOperator():
+                lhs: expressions.Expression = self._expression(expression.lhs)
+                if (expression.operator.type == TokenType.PERIOD):
+                    return _replace(expression, {'lhs': lhs})
+                return _replace(expression, {'lhs': lhs, 'rhs': self._expression(expression.rhs)})
+            case expressions.ArrayIndexing():
+                return _replace(expression, {'indexes': self._expressions(expression.indexes)})
+            case expressions.FunctionCall():
+                arguments: list[expressions.Expression] = self._expressions(expression.arguments)
+                if (expression.identifier.token.literal not in self._pure):
+                    # Anything could have changed once it returns
+                    self._kill(None)
+                return _replace(expression, {'arguments': arguments})
+        return expression
+
+    def _expressions(self, exprs: list[expressions.Expression]) -> list[expressions.Expression]:
+        walked: list[expressions.Expression] = [self._expression(expression) for expression in exprs]
+        return exprs if (all((new is old) for new, old in zip(walked, exprs))) else walked
+
+    def _expression(self, expression: expressions.Expression) -> expressions.Expression:
+        # Variables and literals cost no more to evaluate again than to load from a temporary
+        if (type(expression) is expressions.Atom):
+            return expression
+
+        number, identifiers = self._describe(expression)
+        if (number is None):
+            return self._children(expression)
+
+        occurrence: int = self._occurrences
+        self._occurrences += 1
+        if (self._rewriting):
+            first_occurrence: (int | None) = self._replaced.get(occurrence)
+            if (first_occurrence is not None):
+                first: expressions.CommonSubexpression = self._firsts[first_occurrence]
+                return expressions.CommonSubexpression(first.expression, first.temporary, False, first_token(expression))
+        else:
+            first_occurrence = self._lookup(number)
+            if (first_occurrence is not None):
+                self._replaced[occurrence] = first_occurrence
+                self._reused.add(first_occurrence)
+                return expression
+
+        walked: expressions.Expression = self._children(expression)
+        self._add(number, occurrence, identifiers)
+        if (self._rewriting and (occurrence in self._reused)):
+            first = self._firsts[occurrence] = expressions.CommonSubexpression(walked, self._temporaries, True, first_token(expression))
+            self._temporaries += 1
+            return first
+        return walked
+
+    def _append(self, statement: statements.ASSIGNMENT) -> (statements.ASSIGNMENT | None):
+        # An assignment of the form x <- x & ..., whose chain of '&' is left as it is, so that the compiler can
+        # still append to the variable in place; only the operands after the first are walked
+        expression: expressions.Expression = statement.expression
+        if ((type(expression) is not expressions.InfixOperator) or (expression.operator.type != TokenType.AMPERSAND)):
+            return None
+        operands, operators = flatten_concatenation(expression)
+        target: expressions.Expression = operands[0]
+        if ((type(target) is not expressions.Atom) or (target.token.type != TokenType.IDENTIFIER) or (target.token.literal != statement.identifier.literal)):
+            return None
+
+        rest: list[expressions.Expression] = operands[1:]
+        walked: list[expressions.Expression] = self._expressions(rest)
+        if (walked is rest):
+            return statement
+        for operand, operator in zip(walked, operators):
+            target = expressions.InfixOperator(operator, target, operand)
+        return _replace(statement, {'expression': target})
+
+    def _block(self, block: list[statements.Statement]) -> list[statements.Statement]:
+        # What the block makes available does not last past its end, as it might not have run; what it writes
+        # to stays unavailable
+        mark: int = len(self._log)
+        walked: list[statements.Statement] = [self._statement(statement) for statement in block]
+        self._undo(mark)
+        return walked
+
+    def _statement(self, statement: statements.Statement) -> statements.Statement:
+        match(statement):
+            case statements.IF():
+                # Only the first condition is certain to be evaluated, and each one after it only once those
+                # before it have been
+                branches: list[tuple[expressions.Expression, list[statements.Statement]]] = []
+                mark: int = -1
+                for condition, block in statement.branches:
+                    condition = self._expression(condition)
+                    if (mark == -1):
+                        mark = len(self._log)
+                    branches.append((condition, self._block(block)))
+                self._undo(mark)
+                if (all(((new[0] is old[0]) and (new[1] == old[1])) for new, old in zip(branches, statement.branches))):
+                    return statement
+                return statements.IF(branches)
+
+            case statements.WHILE():
+                # Whatever the condition and the body could write to is unavailable from the start, as they
+                # run again after they have run
+                written: (set[str] | None) = self._writes(statement.statements)
+                if (self._calls_impure(statement.condition)):
+                    written = None
+                self._kill(written)
+                condition: expressions.Expression = self._expression(statement.condition)
+                body: list[statements.Statement] = self._block(statement.statements)
+                if ((condition is statement.condition) and all((new is old) for new, old in zip(body, statement.statements))):
+                    return statement
+                return statements.WHILE(condition, body)
+
+            case statements.ASSIGNMENT() if (type(statement) is statements.ASSIGNMENT):
+                walked: (statements.Statement | None) = self._append(statement)
+                if (walked is None):
+                    walked = _replace(statement, {'expression': self._expression(statement.expression)})
+                self._kill({statement.identifier.literal})
+                return walked
+
+        fields: dict[str, object] = {}
+        for field in EVALUATED_FIELDS.get(type(statement), ()):
+            value: object = getattr(statement, field)
+            fields[field] = self._expressions(value) if (type(value) is list) else self._expression(value)
+        walked: statements.Statement = _replace(statement, fields)
+
+        if (type(statement) is statements.CALL):
+            self._kill(None)
+        elif (isinstance(statement, WRITING_STATEMENTS)):
+            self._kill({statement.identifier.literal})
+        return walked
+
+    def _enter(self, table: (SymbolTable | None)) -> tuple:
+        # Starts walking a scope with nothing available, and returns the state of the one it was in
+        outer: tuple = (self._table, self._available, self._log, self._versions, self._epoch, self._shared_epoch, self._temporaries)
+        (self._table, self._available, self._log, self._versions, self._epoch, self._shared_epoch, self._temporaries) = (table, {}, [], {}, 0, 0, 0)
+        return outer
+
+    def _subroutine(self, definition: statements.PROCEDURE, table: SymbolTable) -> statements.PROCEDURE:
+        # A subroutine has temporaries of its own, and can be called at any point, so nothing is available at its start
+        outer: tuple = self._enter(table)
+        body: list[statements.Statement] = self._block(definition.statements)
+        (self._table, self._available, self._log, self._versions, self._epoch, self._shared_epoch, self._temporaries) = outer
+        if (all((new is old) for new, old in zip(body, definition.statements))):
+            return definition
+        return _replace(definition, {'statements': body})
+
+    def _walk(self, program: list[statements.Statement], tables: dict[int, SymbolTable]) -> list[statements.Statement]:
+        self._enter(None)
+        self._occurrences = 0
+        # The occurrences that change, in order, for the second walk to tell which statements it can skip
+        changed: list[int] = sorted(self._replaced.keys() | self._reused)
+
+        walked: list[statements.Statement] = []
+        for index, statement in enumerate(program):
+            if (self._rewriting):
+                start, end = self._ranges[index]
+                position: int = bisect.bisect_left(changed, start)
+                if ((position == len(changed)) or (changed[position] >= end)):
+                    walked.append(statement)
+                    self._occurrences = end
+                    continue
+
+            start = self._occurrences
+            if (isinstance(statement, statements.PROCEDURE)):
+                walked.append(self._subroutine(statement, tables[id(statement)]))
+            elif (type(statement) is statements.TYPE):
+                walked.append(statement)
+            else:
+                walked.append(self._statement(statement))
+            if (not self._rewriting):
+                self._ranges.append((start, self._occurrences))
+        return walked
+
+    def eliminate(self, parsed_program: ParsedProgram) -> ParsedProgram:
+        program: list[statements.Statement] = parsed_program.statements
+        self._pure = pure_functions(parsed_program)
+        globals_: SymbolTable = global_table(program)
+        tables: dict[int, SymbolTable] = {id(statement): subroutine_table(statement, globals_) for statement in program if (isinstance(statement, statements.PROCEDURE))}
+
+        # The first walk only finds the first occurrences that are used again, which the second replaces
+        self._walk(program, tables)
+        eliminated: ParsedProgram = ParsedProgram()
+        if (self._reused):
+            self._rewriting = True
+            eliminated.statements = self._walk(program, tables)
+        else:
+            eliminated.statements = program
+        return eliminated
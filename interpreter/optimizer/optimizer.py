@@ -0,0 +1,356 @@
+# Standard library imports
+import datetime
+
+# Local imports
+from ..token import Token, TokenType
+from ..parser.ast import ParsedProgram, statements, expressions
+from ..compiler import first_token, nesting_error
+from ..resolver import bound_identifiers
+from ..runtime import Char, BINARY_OPERATORS, UNARY_OPERATORS, RUNTIME_FAULTS, literal_value, format_date
+from .common_subexpressions import CommonSubexpressionEliminator
+
+# Folded values bigger than these are left to be computed at run time, so that compiled programs stay small
+_MAX_FOLDED_STRING_LENGTH: int = 4096
+_MAX_FOLDED_INTEGER_BITS: int = 128
+
+_LITERAL_TOKEN_TYPES: dict[type, TokenType] = {
+    int: TokenType.INTEGER,
+    float: TokenType.REAL,
+    Char: TokenType.CHAR,
+    str: TokenType.STRING,
+    bool: TokenType.BOOLEAN,
+    datetime.date: TokenType.DATE,
+}
+
+# Marks an expression whose value is not known before run time
+_UNKNOWN: object = object()
+
+def _literal_atom(value: object, position: Token) -> (expressions.Atom | None):
+    # An Atom for the value, as if it had been written as a literal at the position of the given token
+    token_type: (TokenType | None) = _LITERAL_TOKEN_TYPES.get(type(value))
+    match(token_type):
+        case None:
+            return None
+        case TokenType.INTEGER:
+            if (value.bit_length() > _MAX_FOLDED_INTEGER_BITS):
+                return None
+            literal: str = str(value)
+        case TokenType.REAL:
+            literal: str = repr(value)
+        case TokenType.CHAR | TokenType.STRING:
+            if (len(value) > _MAX_FOLDED_STRING_LENGTH):
+                return None
+            literal: str = value
+        case TokenType.BOOLEAN:
+            literal: str = 'TRUE' if (value) else 'FALSE'
+        case TokenType.DATE:
+            literal: str = format_date(value)
+
+    token: Token = Token(token_type, literal, position.line, position.column)
+    token.is_literal = True
+    return expressions.Atom(token)
+
+def _value(expression: expressions.Expression) -> object:
+    # The value of a literal Atom, or _UNKNOWN
+    if ((type(expression) is expressions.Atom) and (expression.token.type != TokenType.IDENTIFIER)):
+        try:
+            return literal_value(expression.token)
+        except ValueError:
+            # Left for the compiler to report
+            pass
+    return _UNKNOWN
+
+# Operators that give an INTEGER for INTEGER operands (^ does not, for negative exponents)
+_INTEGER_OPERATORS: tuple[TokenType, ...] = (TokenType.PLUS, TokenType.HYPHEN, TokenType.ASTERISK, TokenType.INT_DIV, TokenType.MODULUS)
+
+def _is_integer(expression: expressions.Expression, integers: set[str]) -> bool:
+    # Whether the expression always evaluates to an INTEGER, if it evaluates at all
+    match(expression):
+        case expressions.Atom():
+            if (expression.token.type == TokenType.IDENTIFIER):
+                return (expression.token.literal in integers)
+            return (type(_value(expression)) is int)
+        case expressions.PrefixOperator():
+            return ((expression.operator.type == TokenType.HYPHEN) and _is_integer(expression.operand, integers))
+        case expressions.InfixOperator():
+            return ((expression.operator.type in _INTEGER_OPERATORS) and _is_integer(expression.lhs, integers) and _is_integer(expression.rhs, integers))
+    return False
+
+def _integer_value(expression: expressions.Expression) -> (int | None):
+    value: object = _value(expression)
+    return value if (type(value) is int) else None
+
+class Optimizer:
+    # Rewrites a parsed program into one that does the same with less work at run time:
+    # - operators whose operands are all literals are computed up front
+    # - identifiers bound by CONSTANT are replaced by their literal, after the CONSTANT statement
+    # - x ^ 2 becomes x * x where x is a variable declared as an INTEGER, and x + 0, x - 0, x * 1, x DIV 1 and
+    #   x ^ 1 become x where x is an INTEGER expression (these do not hold for REALs, because of -0.0 and overflows)
+    # An operation that would fail is left to fail at run time. Nodes that do not change are shared with the
+    # original program, which is left as it is.
+    # With eliminate_common_subexpressions, the optimized program is then given to a CommonSubexpressionEliminator
+    def __init__(self, eliminate_common_subexpressions: bool = False) -> None:
+        self._eliminate_common_subexpressions: bool = eliminate_common_subexpressions
+
+        # Every identifier that a statement so far (in the order of the source) binds a value to
+        self._bound: set[str] = set()
+
+    def _fold(self, operation: object, operands: tuple[object, ...], position: Token) -> (expressions.Atom | None):
+        # The folded literal takes the place of the leftmost token of the operation, which is what the
+        # backends report statements at
+        try:
+            return _literal_atom(operation(*operands), position)
+        except RUNTIME_FAULTS:
+            return None
+
+    def _infix(self, expression: expressions.InfixOperator, constants: dict[str, Token], integers: set[str]) -> expressions.Expression:
+        operator: Token = expression.operator
+        lhs: expressions.Expression = self._expression(expression.lhs, constants, integers)
+        if (operator.type == TokenType.PERIOD):
+            # The rhs is the identifier of a field, not a variable
+            return expression if (lhs is expression.lhs) else expressions.InfixOperator(operator, lhs, expression.rhs)
+        rhs: expressions.Expression = self._expression(expression.rhs, constants, integers)
+
+        operation: (object | None) = BINARY_OPERATORS.get(operator.type)
+        if (operation is not None):
+            lhs_value: object = _value(lhs)
+            rhs_value: object = _value(rhs)
+            if ((lhs_value is not _UNKNOWN) and (rhs_value is not _UNKNOWN)):
+                folded: (expressions.Atom | None) = self._fold(operation, (lhs_value, rhs_value), first_token(lhs))
+                if (folded is not None):
+                    return folded
+
+            rhs_integer: (int | None) = _integer_value(rhs)
+
+            # 0 + x and 1 * x are left as they are, as the position of the expression is that of its first token
+            match(operator.type):
+                case TokenType.CARET if ((rhs_integer == 2) and (type(lhs) is expressions.Atom) and _is_integer(lhs, integers)):
+                    # Only for a plain variable, which costs nothing to load twice
+                    multiply: Token = Token(TokenType.ASTERISK, TokenType.ASTERISK.value, operator.line, operator.column)
+                    return expressions.InfixOperator(multiply, lhs, lhs)
+                case TokenType.PLUS | TokenType.HYPHEN if ((rhs_integer == 0) and _is_integer(lhs, integers)):
+                    return lhs
+                case TokenType.ASTERISK | TokenType.INT_DIV | TokenType.CARET if ((rhs_integer == 1) and _is_integer(lhs, integers)):
+                    return lhs
+
+        if ((lhs is expression.lhs) and (rhs is expression.rhs)):
+            return expression
+        return expressions.InfixOperator(operator, lhs, rhs)
+
+    def _expressions(self, exprs: list[expressions.Expression], constants: dict[str, Token], integers: set[str]) -> list[expressions.Expression]:
+        optimized: list[expressions.Expression] = [self._expression(expression, constants, integers) for expression in exprs]
+        return exprs if (all((new is old) for new, old in zip(optimized, exprs))) else optimized
+
+    def _expression(self, expression: expressions.Expression, constants: dict[str, Token], integers: set[str]) -> expressions.Expression:
+        match(expression):
+            case expressions.Atom():
+                token: Token = expression.token
+                if ((token.type == TokenType.IDENTIFIER) and (token.literal in constants)):
+                    # Positioned at the identifier, which is where it is used
+                    value: Token = constants[token.literal]
+                    literal: Token = Token(value.type, value.literal, token.line, token.column)
+                    literal.is_literal = True
+                    return expressions.Atom(literal)
+                return expression
+
+            case expressions.PrefixOperator():
+                operand: expressions.Expression = self._expression(expression.operand, constants, integers)
+                operand_value: object = _value(operand)
+                operation: (object | None) = UNARY_OPERATORS.get(expression.operator.type)
+                if ((operand_value is not _UNKNOWN) and (operation is not None)):
+                    folded: (expressions.Atom | None) = self._fold(operation, (operand_value,), expression.operator)
+                    if (folded is not None):
+                        return folded
+                if (operand is expression.operand):
+                    return expression
+                return expressions.PrefixOperator(expression.operator, operand)
+
+            case expressions.InfixOperator():
+                return self._infix(expression, constants, integers)
+
+            case expressions.ArrayIndexing():
+                indexes: list[expressions.Expression] = self._expressions(expression.indexes, constants, integers)
+                if (indexes is expression.indexes):
+                    return expression
+                return expressions.ArrayIndexing(expression.identifier, indexes)
+
+            case expressions.FunctionCall():
+                arguments: list[expressions.Expression] = self._expressions(expression.arguments, constants, integers)
+                if (arguments is expression.arguments):
+                    return expression
+                return expressions.FunctionCall(expression.identifier, arguments)
+
+            case expressions.PostfixOperator():
+                operand: expressions.Expression = self._expression(expression.operand, constants, integers)
+                if (operand is expression.operand):
+                    return expression
+                return expressions.PostfixOperator(operand, expression.operator)
+
+        return expression
+
+    def _block(self, block: list[statements.Statement], constants: dict[str, Token], integers: set[str]) -> list[statements.Statement]:
+        # What a block learns about its identifiers does not hold after it, as it might not have run
+        constants = constants.copy()
+        integers = integers.copy()
+
+        optimized: list[statements.Statement] = []
+        for statement in block:
+            optimized.append(self._statement(statement, constants, integers))
+        return optimized
+
+    def _statement(self, statement: statements.Statement, constants: dict[str, Token], integers: set[str]) -> statements.Statement:
+        match(statement):
+            case statements.DECLARE_ARRAY():
+                self._bound.add(statement.identifier.literal)
+                sizes: list[expressions.Expression] = self._expressions(statement.dimensions_sizes, constants, integers)
+                if (sizes is statement.dimensions_sizes):
+                    return statement
+                return statements.DECLARE_ARRAY(statement.identifier, sizes, statement.datatype)
+
+            case statements.DECLARE():
+                self._bound.add(statement.identifier.literal)
+                # Once declared, it stays an INTEGER; declaring it again as anything else is an error
+                if (statement.datatype.literal == TokenType.INTEGER.value):
+                    integers.add(statement.identifier.literal)
+                return statement
+
+            case statements.CONSTANT():
+                # A constant made from a variable that has been bound before takes on its datatype, so only
+                # constants that are bound for the first time are propagated
+                identifier: str = statement.identifier.literal
+                if ((identifier not in self._bound) and (_value(expressions.Atom(statement.value)) is not _UNKNOWN)):
+                    constants[identifier] = statement.value
+                self._bound.add(identifier)
+                return statement
+
+            case statements.ASSIGNMENT_ARRAY():
+                self._bound.add(statement.identifier.literal)
+                indexes: list[expressions.Expression] = self._expressions(statement.indexes, constants, integers)
+                expression: expressions.Expression = self._expression(statement.expression, constants, integers)
+                if ((indexes is statement.indexes) and (expression is statement.expression)):
+                    return statement
+                return statements.ASSIGNMENT_ARRAY(statement.identifier, indexes, expression)
+
+            case statements.ASSIGNMENT_FIELD():
+                self._bound.add(statement.identifier.literal)
+                expression: expressions.Expression = self._expression(statement.expression, constants, integers)
+                if (expression is statement.expression):
+                    return statement
+                return statements.ASSIGNMENT_FIELD(statement.identifier, statement.field, expression)
+
+            case statements.ASSIGNMENT():
+                self._bound.add(statement.identifier.literal)
+                expression: expressions.Expression = self._expression(statement.expression, constants, integers)
+                if (expression is statement.expression):
+                    return statement
+                return statements.ASSIGNMENT(statement.identifier, expression)
+
+            case statements.INPUT():
+                self._bound.add(statement.identifier.literal)
+                return statement
+
+            case statements.OPENFILE() | statements.CLOSEFILE():
+                file: expressions.Expression = self._expression(statement.file, constants, integers)
+                if (file is statement.file):
+                    return statement
+                return statements.OPENFILE(file, statement.mode) if (type(statement) is statements.OPENFILE) else statements.CLOSEFILE(file)
+
+            case statements.READFILE():
+                self._bound.add(statement.identifier.literal)
+                file: expressions.Expression = self._expression(statement.file, constants, integers)
+                if (file is statement.file):
+                    return statement
+                return statements.READFILE(file, statement.identifier)
+
+            case statements.SEEK():
+                file: expressions.Expression = self._expression(statement.file, constants, integers)
+                address: expressions.Expression = self._expression(statement.address, constants, integers)
+                if ((file is statement.file) and (address is statement.address)):
+                    return statement
+                return statements.SEEK(file, address)
+
+            case statements.GETRECORD():
+                self._bound.add(statement.identifier.literal)
+                file: expressions.Expression = self._expression(statement.file, constants, integers)
+                if (file is statement.file):
+                    return statement
+                return type(statement)(file, statement.identifier)
+
+            case statements.WRITEFILE():
+                file: expressions.Expression = self._expression(statement.file, constants, integers)
+                expression: expressions.Expression = self._expression(statement.expression, constants, integers)
+                if ((file is statement.file) and (expression is statement.expression)):
+                    return statement
+                return statements.WRITEFILE(file, expression)
+
+            case statements.OUTPUT():
+                exprs: list[expressions.Expression] = self._expressions(statement.expressions, constants, integers)
+                if (exprs is statement.expressions):
+                    return statement
+                return statements.OUTPUT(exprs)
+
+            case statements.IF():
+                branches: list[tuple[expressions.Expression, list[statements.Statement]]] = []
+                for condition, block in statement.branches:
+                    branches.append((self._expression(condition, constants, integers), self._block(block, constants, integers)))
+                return statements.IF(branches)
+
+            case statements.WHILE():
+                # The condition and the body run again after the body, so whatever the body binds is taken to be
+                # bound from the start
+                self._bound.update(identifier for identifier, _ in bound_identifiers(statement.statements))
+                condition: expressions.Expression = self._expression(statement.condition, constants, integers)
+                body: list[statements.Statement] = self._block(statement.statements, constants, integers)
+                return statements.WHILE(condition, body)
+
+            case statements.PROCEDURE():
+                # A subroutine can run at any point, so nothing known about the main program holds inside it; its
+                # parameters are bound before its first statement
+                bound: set[str] = self._bound
+                self._bound = {parameter.identifier.literal for parameter in statement.parameters}
+                integers: set[str] = {parameter.identifier.literal for parameter in statement.parameters if ((not parameter.is_array) and (parameter.datatype.literal == TokenType.INTEGER.value))}
+                body: list[statements.Statement] = self._block(statement.statements, {}, integers)
+                self._bound = bound
+                if (type(statement) is statements.FUNCTION):
+                    return statements.FUNCTION(statement.identifier, statement.parameters, statement.returns, body)
+                return statements.PROCEDURE(statement.identifier, statement.parameters, body)
+
+            case statements.CALL():
+                # A variable passed to a procedure could be a BYREF argument, so it is left as a variable, and
+                # taken to be bound by the call
+                arguments: list[expressions.Expression] = []
+                for argument in statement.arguments:
+                    if ((type(argument) is expressions.Atom) and (argument.token.type == TokenType.IDENTIFIER)):
+                        self._bound.add(argument.token.literal)
+                        arguments.append(argument)
+                    else:
+                        arguments.append(self._expression(argument, constants, integers))
+                if (all((new is old) for new, old in zip(arguments, statement.arguments))):
+                    return statement
+                return statements.CALL(statement.identifier, arguments)
+
+            case statements.RETURN():
+                expression: expressions.Expression = self._expression(statement.expression, constants, integers)
+                if (expression is statement.expression):
+                    return statement
+                return statements.RETURN(statement.keyword, expression)
+
+        return statement
+
+    def optimize(self, parsed_program: ParsedProgram) -> ParsedProgram:
+        try:
+            return self._optimize_program(parsed_program)
+        except RecursionError:
+            raise nesting_error(parsed_program) from None
+
+    def _optimize_program(self, parsed_program: ParsedProgram) -> ParsedProgram:
+        # Subroutines can be called before they are defined, so whatever they bind is taken to be bound from the start
+        for statement in parsed_program.statements:
+            if (isinstance(statement, statements.PROCEDURE)):
+                self._bound.update(identifier for identifier, _ in bound_identifiers(statement.statements))
+
+        optimized: ParsedProgram = ParsedProgram()
+        optimized.statements = self._block(parsed_program.statements, {}, set())
+        if (self._eliminate_common_subexpressions):
+            optimized = CommonSubexpressionEliminator().eliminate(optimized)
+        return optimized
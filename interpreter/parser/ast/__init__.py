@@ -1,4 +1,5 @@
 from .node import *
 from .parsed_program import *
 from . import statements
-from . import expressions
\ No newline at end of file
+from . import expressions
+from .flat_program import *
\ No newline at end of file
@@ -3,12 +3,16 @@ from ...token import Token, TokenType
 from .node import Node
 
 class Expression(Node):
+    __slots__ = ()
+    
     def __init__(self) -> None:
         super().__init__()
         
 
 
 class Atom(Expression):
+    __slots__ = ('token',)
+    
     def __init__(self, token: Token) -> None:
         super().__init__()
         self.token: Token = token
@@ -21,6 +25,8 @@ class Atom(Expression):
         return self.token.literal
 
 class PrefixOperator(Expression):
+    __slots__ = ('operator', 'operand')
+    
     def __init__(self, operator: Token, operand: Token) -> None:
         super().__init__()
         self.operator: Token = operator
@@ -29,6 +35,8 @@ class PrefixOperator(Expression):
         return f"({f'{self.operator.type.value} ' if (self.operator.type == TokenType.NOT) else self.operator.type.value}{str(self.operand)})"
 
 class InfixOperator(Expression):
+    __slots__ = ('operator', 'lhs', 'rhs')
+    
     def __init__(self, operator: Token, lhs: Expression, rhs: Expression) -> None:
         super().__init__()
         self.operator: Token = operator
@@ -38,6 +46,8 @@ class InfixOperator(Expression):
         return f"({str(self.lhs)}{f' {self.operator.type.value} ' if (self.operator.type != TokenType.PERIOD) else self.operator.type.value}{str(self.rhs)})"
 
 class FunctionCall(Expression):
+    __slots__ = ('identifier', 'arguments')
+    
     def __init__(self, identifier: Expression, arguments: list[Expression]) -> None:
         super().__init__()
         self.identifier: Expression = identifier
@@ -49,6 +59,8 @@ class FunctionCall(Expression):
         return f"{str(self.identifier)}({args[0:-2]})"
 
 class ArrayIndexing(Expression):
+    __slots__ = ('identifier', 'indexes')
+    
     def __init__(self, identifier: Expression, indexes: list[Expression]) -> None:
         super().__init__()
         self.identifier: Expression = identifier
@@ -60,9 +72,28 @@ class ArrayIndexing(Expression):
         return f"{str(self.identifier)}[{indexes[0:-2]}]"
 
 class PostfixOperator(Expression):
+    __slots__ = ('operand', 'operator')
+    
     def __init__(self, operand: Expression, operator: Token) -> None:
         super().__init__()
         self.operand: Expression = operand
         self.operator: Token = operator
     def __str__(self) -> str:
-        return f"({str(self.operand)}{self.operator.type.value})"
\ No newline at end of file
+        return f"({str(self.operand)}{self.operator.type.value})"
+
+class CommonSubexpression(Expression):
+    # An occurrence of an expression that is evaluated more than once with the same operands, which the
+    # optimizer's CommonSubexpressionEliminator puts in place of each of them. Every occurrence shares the
+    # same expression node: the first one evaluates it and keeps its value in a temporary, numbered within
+    # the scope, which the others load instead of evaluating it again. The token is the first token of the
+    # occurrence, which is where it is reported at
+    __slots__ = ('expression', 'temporary', 'is_first', 'token')
+
+    def __init__(self, expression: Expression, temporary: int, is_first: bool, token: Token) -> None:
+        super().__init__()
+        self.expression: Expression = expression
+        self.temporary: int = temporary
+        self.is_first: bool = is_first
+        self.token: Token = token
+    def __str__(self) -> str:
+        return str(self.expression)
\ No newline at end of file
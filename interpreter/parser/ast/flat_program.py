@@ -0,0 +1,164 @@
+# Standard library imports
+from array import array
+
+# Local imports
+from ...token import Token, TokenType, TOKEN_TYPES
+from .node import Node, node_fields
+from .parsed_program import ParsedProgram
+from . import statements, expressions
+
+# Every type of node that can be in a program, by the small integer "kind" that stands for it in a FlatProgram
+NODE_TYPES: tuple[type, ...] = tuple(
+    value for module in (statements, expressions) for value in vars(module).values()
+    if (isinstance(value, type) and issubclass(value, Node) and (value.__module__ == module.__name__))
+)
+NODE_KINDS: dict[type, int] = {node_type: kind for kind, node_type in enumerate(NODE_TYPES)}
+
+# The kinds of the entries that are not nodes: the lists and tuples that nodes hold, references to tokens, and
+# plain values
+(LIST_KIND, TUPLE_KIND, TOKEN_KIND, FALSE_KIND, TRUE_KIND, NONE_KIND) = range(len(NODE_TYPES), len(NODE_TYPES) + 6)
+
+class FlatProgram:
+    # A program as parallel columns of machine integers, instead of a tree of objects. Every node of the tree is
+    # an entry, as is every list and tuple that a node holds, every reference to a token and every BOOLEAN flag.
+    # The children of an entry (the fields of a node, in the order of node_fields(), or the items of a list or
+    # tuple) are a run of entries in the children column, from starts[entry], counts[entry] long. For a token
+    # entry, starts[entry] is the index of the token in the token columns.
+    # Entries are added children first, so an entry's children always come before it. Nothing needs to be
+    # built to walk the tree; decode() builds the objects of any part of it
+    def __init__(self) -> None:
+        self.kinds: array = array('B')
+        self.starts: array = array('I')
+        self.counts: array = array('I')
+        self.children: array = array('I')
+
+        # The entries of the top-level statements, in order
+        self.statements: array = array('I')
+
+        # The tokens, with every distinct literal stored once
+        self.token_kinds: array = array('B')
+        self.token_literals: array = array('I')
+        self.token_lines: array = array('I')
+        self.token_columns: array = array('I')
+        self.token_literal_flags: array = array('B')
+        self.literals: list[str] = []
+        self._literal_indexes: dict[str, int] = {}
+
+    @classmethod
+    def encode(cls, parsed_program: ParsedProgram) -> 'FlatProgram':
+        flat_program: FlatProgram = cls()
+        for statement in parsed_program.statements:
+            flat_program.add_statement(statement)
+        return flat_program
+
+    def add_statement(self, statement: statements.Statement) -> int:
+        # Encodes a top-level statement; once it is encoded, the statement's objects are no longer needed
+        entry: int = self._add(statement)
+        self.statements.append(entry)
+        return entry
+
+    def _add_entry(self, kind: int, start: int, count: int) -> int:
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.counts.append(count)
+        return len(self.kinds) - 1
+
+    def _add_token(self, token: Token) -> int:
+        literal: (int | None) = self._literal_indexes.get(token.literal)
+        if (literal is None):
+            literal = self._literal_indexes[token.literal] = len(self.literals)
+            self.literals.append(token.literal)
+
+        self.token_kinds.append(token.kind)
+        self.token_literals.append(literal)
+        self.token_lines.append(token.line)
+        self.token_columns.append(token.column)
+        self.token_literal_flags.append(hasattr(token, 'is_literal'))
+        return self._add_entry(TOKEN_KIND, len(self.token_kinds) - 1, 0)
+
+    def _add(self, value: object) -> int:
+        if (isinstance(value, Token)):
+            return self._add_token(value)
+        if (value is None):
+            return self._add_entry(NONE_KIND, 0, 0)
+        if (type(value) is bool):
+            return self._add_entry((TRUE_KIND if (value) else FALSE_KIND), 0, 0)
+
+        if (isinstance(value, Node)):
+            kind: int = NODE_KINDS[type(value)]
+            entries: list[int] = [self._add(getattr(value, field)) for field in node_fields(type(value))]
+        elif (isinstance(value, (list, tuple))):
+            kind = LIST_KIND if (type(value) is list) else TUPLE_KIND
+            entries = [self._add(item) for item in value]
+        else:
+            raise TypeError(f'cannot encode {type(value).__name__} in a FlatProgram')
+
+        start: int = len(self.children)
+        self.children.extend(entries)
+        return self._add_entry(kind, start, len(entries))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def node_count(self) -> int:
+        return sum(1 for kind in self.kinds if (kind < LIST_KIND))
+
+    @property
+    def nbytes(self) -> int:
+        # Roughly the memory that the program takes up; the literals are counted by their characters
+        columns: tuple[array, ...] = (self.kinds, self.starts, self.counts, self.children, self.statements, self.token_kinds, self.token_literals, self.token_lines, self.token_columns, self.token_literal_flags)
+        return sum((column.itemsize * len(column)) for column in columns) + sum(len(literal) for literal in self.literals)
+
+    def node_type(self, entry: int) -> (type | None):
+        # The type of node of an entry, or None for an entry that is not a node
+        kind: int = self.kinds[entry]
+        return NODE_TYPES[kind] if (kind < LIST_KIND) else None
+
+    def entry_children(self, entry: int) -> array:
+        start: int = self.starts[entry]
+        return self.children[start : (start + self.counts[entry])]
+
+    def field(self, entry: int, name: str) -> int:
+        # The entry of a field of the node at entry
+        return self.children[self.starts[entry] + node_fields(NODE_TYPES[self.kinds[entry]]).index(name)]
+
+    def token_type(self, entry: int) -> TokenType:
+        return TOKEN_TYPES[self.token_kinds[self.starts[entry]]]
+
+    def token_literal(self, entry: int) -> str:
+        return self.literals[self.token_literals[self.starts[entry]]]
+
+    def token(self, entry: int) -> Token:
+        index: int = self.starts[entry]
+        token: Token = Token(TOKEN_TYPES[self.token_kinds[index]], self.literals[self.token_literals[index]], self.token_lines[index], self.token_columns[index])
+        if (self.token_literal_flags[index]):
+            token.is_literal = True
+        return token
+
+    def decode(self, entry: int) -> object:
+        # The objects of the entry and of everything below it, as the parser would have built them
+        kind: int = self.kinds[entry]
+        if (kind == TOKEN_KIND):
+            return self.token(entry)
+        if (kind >= FALSE_KIND):
+            return (True if (kind == TRUE_KIND) else (False if (kind == FALSE_KIND) else None))
+
+        start: int = self.starts[entry]
+        items: list[object] = [self.decode(child) for child in self.children[start : (start + self.counts[entry])]]
+        if (kind == LIST_KIND):
+            return items
+        if (kind == TUPLE_KIND):
+            return tuple(items)
+
+        # Built without __init__(), whose parameters are not always in the order of the fields
+        node_type: type = NODE_TYPES[kind]
+        node: Node = node_type.__new__(node_type)
+        for field, item in zip(node_fields(node_type), items):
+            setattr(node, field, item)
+        return node
+
+    def decode_program(self) -> ParsedProgram:
+        parsed_program: ParsedProgram = ParsedProgram()
+        parsed_program.statements = [self.decode(entry) for entry in self.statements]
+        return parsed_program
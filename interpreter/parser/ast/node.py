@@ -1,2 +1,15 @@
+# Standard library imports
+import functools
+
 class Node:
-    pass
\ No newline at end of file
+    # Every type of node declares the attributes that it adds in __slots__, so that no node has a __dict__;
+    # generated programs can have millions of them
+    __slots__ = ()
+
+@functools.cache
+def node_fields(node_type: type) -> tuple[str, ...]:
+    # The attributes of a type of node, those of its base classes first, in the order they are declared in
+    fields: list[str] = []
+    for base in reversed(node_type.__mro__):
+        fields.extend(base.__dict__.get('__slots__', ()))
+    return tuple(fields)
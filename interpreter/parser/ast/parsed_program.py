@@ -3,6 +3,8 @@ from .node import Node
 from .statements import Statement
 
 class ParsedProgram(Node):
+    __slots__ = ('statements',)
+    
     def __init__(self) -> None:
         super().__init__()
         self.statements: list[Statement] = []
\ No newline at end of file
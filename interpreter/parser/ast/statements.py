@@ -6,9 +6,11 @@ from .expressions import Expression
 from ...token import Token, TokenType
 
 class Statement(Node):
-    pass
+    __slots__ = ()
 
 class DECLARE(Statement):
+    __slots__ = ('identifier', 'datatype')
+    
     def __init__(self, identifier: Token, datatype: Token) -> None:
         super().__init__()
         
@@ -19,6 +21,8 @@ class DECLARE(Statement):
         return f"[DECLARE Statement]: 'DECLARE {self.identifier.literal} : {self.datatype.literal}'"
 
 class DECLARE_ARRAY(DECLARE):
+    __slots__ = ('dimensions_sizes',)
+    
     def __init__(self, identifier: Token, dimensions_sizes: list[Expression], datatype: Token) -> None:
         super().__init__(identifier, datatype)
         
@@ -31,6 +35,8 @@ class DECLARE_ARRAY(DECLARE):
         return f"[DECLARE ARRAY Statement]: 'DECLARE {self.identifier.literal} : ARRAY[{part[0:-2]}] OF {self.datatype.literal}'"
 
 class CONSTANT(Statement):
+    __slots__ = ('identifier', 'value')
+    
     def __init__(self, identifier: Token, value: Token) -> None:
         super().__init__()
         
@@ -41,6 +47,8 @@ class CONSTANT(Statement):
         return f"[CONSTANT Statement]: 'CONSTANT {self.identifier.literal} = {repr(self.value.literal)}'"
 
 class ASSIGNMENT(Statement):
+    __slots__ = ('identifier', 'expression')
+    
     def __init__(self, identifier: Token, expression: Expression) -> None:
         super().__init__()
         
@@ -51,6 +59,8 @@ class ASSIGNMENT(Statement):
         return f"[ASSIGNMENT Statement]: '{self.identifier.literal} <- {str(self.expression)}'"
 
 class ASSIGNMENT_ARRAY(ASSIGNMENT):
+    __slots__ = ('indexes',)
+    
     def __init__(self, identifier: Token, indexes: list[Expression], expression: Expression) -> None:
         super().__init__(identifier, expression)
         
@@ -62,7 +72,20 @@ class ASSIGNMENT_ARRAY(ASSIGNMENT):
             part += f'{str(index)}, '
         return f"[ASSIGNMENT ARRAY Statement]: '{self.identifier.literal}[{part[0:-2]}] <- {str(self.expression)}'"
 
+class ASSIGNMENT_FIELD(ASSIGNMENT):
+    __slots__ = ('field',)
+    
+    def __init__(self, identifier: Token, field: Token, expression: Expression) -> None:
+        super().__init__(identifier, expression)
+        
+        self.field: Token = field
+    
+    def __str__(self) -> str:
+        return f"[ASSIGNMENT FIELD Statement]: '{self.identifier.literal}.{self.field.literal} <- {str(self.expression)}'"
+
 class INPUT(Statement):
+    __slots__ = ('identifier',)
+    
     def __init__(self, identifier: Token) -> None:
         super().__init__()
         
@@ -72,6 +95,8 @@ class INPUT(Statement):
         return f"[INPUT Statement]: 'INPUT {self.identifier.literal}'"
 
 class OUTPUT(Statement):
+    __slots__ = ('expressions',)
+    
     def __init__(self, expressions: list[Expression]) -> None:
         super().__init__()
         
@@ -84,6 +109,8 @@ class OUTPUT(Statement):
         return f"[OUTPUT Statement]: 'OUTPUT {part[0:-2]}'"
 
 class IF(Statement):
+    __slots__ = ('branches',)
+    
     def __init__(self, branches: list[tuple[Expression, list[Statement]]]) -> None:
         super().__init__()
         
@@ -95,4 +122,184 @@ class IF(Statement):
             value += f"Condition {index + 1}: '{str(branch[0])}'\n"
             for statement in branch[1]:
                 value += str(statement) + '\n'
-        return value
\ No newline at end of file
+        return value
+
+class WHILE(Statement):
+    __slots__ = ('condition', 'statements')
+    
+    def __init__(self, condition: Expression, statements: list[Statement]) -> None:
+        super().__init__()
+        
+        self.condition: Expression = condition
+        self.statements: list[Statement] = statements
+    
+    def __str__(self) -> str:
+        value: str = f"\n[WHILE STATEMENT]:\nCondition: '{str(self.condition)}'\n"
+        for statement in self.statements:
+            value += str(statement) + '\n'
+        return value
+
+class Parameter(Node):
+    __slots__ = ('identifier', 'datatype', 'is_array', 'by_reference')
+    
+    def __init__(self, identifier: Token, datatype: Token, is_array: bool, by_reference: bool) -> None:
+        super().__init__()
+        
+        self.identifier: Token = identifier
+        
+        # For an array parameter, the datatype of its elements; arrays of any dimensions can be passed to it
+        self.datatype: Token = datatype
+        self.is_array: bool = is_array
+        self.by_reference: bool = by_reference
+    
+    def __str__(self) -> str:
+        return f"{'BYREF' if (self.by_reference) else 'BYVAL'} {self.identifier.literal} : {'ARRAY OF ' if (self.is_array) else ''}{self.datatype.literal}"
+
+class PROCEDURE(Statement):
+    __slots__ = ('identifier', 'parameters', 'statements')
+    
+    def __init__(self, identifier: Token, parameters: list[Parameter], statements: list[Statement]) -> None:
+        super().__init__()
+        
+        self.identifier: Token = identifier
+        self.parameters: list[Parameter] = parameters
+        self.statements: list[Statement] = statements
+    
+    def __str__(self) -> str:
+        value: str = f"\n[PROCEDURE Statement]: 'PROCEDURE {self.identifier.literal}({', '.join(str(parameter) for parameter in self.parameters)})'\n"
+        for statement in self.statements:
+            value += str(statement) + '\n'
+        return value
+
+class FUNCTION(PROCEDURE):
+    __slots__ = ('returns',)
+    
+    def __init__(self, identifier: Token, parameters: list[Parameter], returns: Token, statements: list[Statement]) -> None:
+        super().__init__(identifier, parameters, statements)
+        
+        self.returns: Token = returns
+    
+    def __str__(self) -> str:
+        value: str = f"\n[FUNCTION Statement]: 'FUNCTION {self.identifier.literal}({', '.join(str(parameter) for parameter in self.parameters)}) RETURNS {self.returns.literal}'\n"
+        for statement in self.statements:
+            value += str(statement) + '\n'
+        return value
+
+class CALL(Statement):
+    __slots__ = ('identifier', 'arguments')
+    
+    def __init__(self, identifier: Token, arguments: list[Expression]) -> None:
+        super().__init__()
+        
+        self.identifier: Token = identifier
+        self.arguments: list[Expression] = arguments
+    
+    def __str__(self) -> str:
+        return f"[CALL Statement]: 'CALL {self.identifier.literal}({', '.join(str(argument) for argument in self.arguments)})'"
+
+class RETURN(Statement):
+    __slots__ = ('keyword', 'expression')
+    
+    def __init__(self, keyword: Token, expression: Expression) -> None:
+        super().__init__()
+        
+        self.keyword: Token = keyword
+        self.expression: Expression = expression
+    
+    def __str__(self) -> str:
+        return f"[RETURN Statement]: 'RETURN {str(self.expression)}'"
+
+
+class TYPE(Statement):
+    __slots__ = ('identifier', 'fields')
+    
+    def __init__(self, identifier: Token, fields: list[DECLARE]) -> None:
+        super().__init__()
+        
+        self.identifier: Token = identifier
+        self.fields: list[DECLARE] = fields
+    
+    def __str__(self) -> str:
+        part: str = ''
+        for field in self.fields:
+            part += f'{field.identifier.literal} : {field.datatype.literal}, '
+        return f"[TYPE Statement]: 'TYPE {self.identifier.literal} ({part[0:-2]})'"
+
+class OPENFILE(Statement):
+    __slots__ = ('file', 'mode')
+    
+    def __init__(self, file: Expression, mode: Token) -> None:
+        super().__init__()
+        
+        # The file name, which is also what identifies the file in the other file statements
+        self.file: Expression = file
+        self.mode: Token = mode
+    
+    def __str__(self) -> str:
+        return f"[OPENFILE Statement]: 'OPENFILE {str(self.file)} FOR {self.mode.literal}'"
+
+class READFILE(Statement):
+    __slots__ = ('file', 'identifier')
+    
+    def __init__(self, file: Expression, identifier: Token) -> None:
+        super().__init__()
+        
+        self.file: Expression = file
+        self.identifier: Token = identifier
+    
+    def __str__(self) -> str:
+        return f"[READFILE Statement]: 'READFILE {str(self.file)}, {self.identifier.literal}'"
+
+class WRITEFILE(Statement):
+    __slots__ = ('file', 'expression')
+    
+    def __init__(self, file: Expression, expression: Expression) -> None:
+        super().__init__()
+        
+        self.file: Expression = file
+        self.expression: Expression = expression
+    
+    def __str__(self) -> str:
+        return f"[WRITEFILE Statement]: 'WRITEFILE {str(self.file)}, {str(self.expression)}'"
+
+class CLOSEFILE(Statement):
+    __slots__ = ('file',)
+    
+    def __init__(self, file: Expression) -> None:
+        super().__init__()
+        
+        self.file: Expression = file
+    
+    def __str__(self) -> str:
+        return f"[CLOSEFILE Statement]: 'CLOSEFILE {str(self.file)}'"
+
+
+class SEEK(Statement):
+    __slots__ = ('file', 'address')
+    
+    def __init__(self, file: Expression, address: Expression) -> None:
+        super().__init__()
+        
+        self.file: Expression = file
+        self.address: Expression = address
+    
+    def __str__(self) -> str:
+        return f"[SEEK Statement]: 'SEEK {str(self.file)}, {str(self.address)}'"
+
+class GETRECORD(Statement):
+    __slots__ = ('file', 'identifier')
+    
+    def __init__(self, file: Expression, identifier: Token) -> None:
+        super().__init__()
+        
+        self.file: Expression = file
+        self.identifier: Token = identifier
+    
+    def __str__(self) -> str:
+        return f"[GETRECORD Statement]: 'GETRECORD {str(self.file)}, {self.identifier.literal}'"
+
+class PUTRECORD(GETRECORD):
+    __slots__ = ()
+    
+    def __str__(self) -> str:
+        return f"[PUTRECORD Statement]: 'PUTRECORD {str(self.file)}, {self.identifier.literal}'"
@@ -0,0 +1,269 @@
+# Standard library imports
+from bisect import bisect_left
+
+# Local imports
+from ..token import Token, TokenType
+from ..lexer import Lexer, lex
+from ..errors import PseudocodeError
+from .parser import Parser
+from .ast import ParsedProgram, statements
+
+def _line_length(line: str) -> int:
+    # Number of characters in the line, not counting its EOL
+    return (len(line) - 1) if (line.endswith(TokenType.EOL.value)) else len(line)
+
+class _LinesLexer(Lexer):
+    # Hands out the already lexed tokens of an IncrementalParser's lines, starting from the given line
+    def __init__(self, document: 'IncrementalParser', line: int) -> None:
+        super().__init__('')
+
+        self._document: IncrementalParser = document
+        self._line_index: int = line - 1
+
+        self._tokens: list[Token] = []
+        self._error: (PseudocodeError | None) = None
+        self._index: int = 0
+
+        self._eof: (Token | None) = None
+
+    def get_next_token(self) -> Token:
+        while (self._index == len(self._tokens)):
+            if (self._error):
+                raise self._error
+
+            if (self._eof):
+                # Lexer keeps advancing past the end of the input, one column per call
+                self._eof = Token(TokenType.EOF, TokenType.EOF.value, self._eof.line, self._eof.column + 1)
+                return self._eof
+
+            (self._tokens, self._error) = self._document._line(self._line_index)
+            self._line_index += 1
+            self._index = 0
+
+        token: Token = self._tokens[self._index]
+        self._index += 1
+
+        if (token.type == TokenType.EOF):
+            self._eof = token
+        return token
+
+class IncrementalParser:
+    # Keeps a source lexed and parsed across edits, for editors that parse the buffer again on every keystroke.
+    # No token crosses an EOL, so every line is lexed on its own, and an edit only lexes the lines it touches.
+    # Top-level statements start and end on line boundaries, so an edit is parsed again from the first top-level
+    # statement it touches, until the parse is past the edit and lines up with a statement boundary of the previous
+    # parse; every other statement is kept as the same node. Lines and columns are 1-based, as in tokens.
+    # An edit that adds or removes lines moves every line after it. Rather than renumbering their tokens (and the
+    # statements they make up) there and then, the move is owed to every line from index _moved_line on, and to
+    # every statement from index _moved_statement on, and only paid once it is needed: a line's tokens when they
+    # are read, by the parse of a later edit or by parse_program(); a statement's lines when an edit is near it.
+    # The next edit moves the boundary to where it is, paying (or taking back) the delta of whatever lies in
+    # between, so that typing in one place costs nothing for the rest of the source
+    def __init__(self, source: str = '') -> None:
+        parts: list[str] = source.split(TokenType.EOL.value)
+        self._lines: list[str] = [(part + TokenType.EOL.value) for part in parts[0 : -1]] + [parts[-1]]
+
+        # The tokens of every line (the EOF token only belongs to the last line), and the error that stopped
+        # lexing it, if any
+        self._tokens: list[list[Token]] = [[] for _ in self._lines]
+        self._errors: list[(PseudocodeError | None)] = [None for _ in self._lines]
+        for index in range(len(self._lines)):
+            self._lex_line(index)
+
+        # The top-level statements, along with the first and last line of each
+        self._statements: list[statements.Statement] = []
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+
+        # The line that the parse stopped at, either because of an error or because it reached the end
+        self._parsed_until: int = 1
+        self.error: (PseudocodeError | None) = None
+
+        # The line number delta owed to the tokens of the lines from index _moved_line on, and to the first and last
+        # lines of the statements from index _moved_statement on
+        self._moved_line: int = len(self._lines)
+        self._line_delta: int = 0
+        self._moved_statement: int = 0
+        self._statement_delta: int = 0
+
+        self._parse(0, 1)
+
+    @property
+    def source(self) -> str:
+        return ''.join(self._lines)
+
+    def _lex_line(self, index: int) -> None:
+        stream = lex(self._lines[index], index + 1)
+        tokens: list[Token] = stream.tokens()
+
+        if ((stream.error is None) and (index != (len(self._lines) - 1))):
+            # Only the end of the last line is the end of the input
+            tokens.pop()
+
+        self._tokens[index] = tokens
+        self._errors[index] = stream.error
+
+    def _move_line_boundary(self, index: int) -> None:
+        # Pays the owed delta to the lines before index, or takes it back from the lines from index on, so that it
+        # is owed from index on. A line with an error is lexed again whenever it is read, so it is left as it is
+        if (self._line_delta):
+            for line_index in range(self._moved_line, index):
+                if (not self._errors[line_index]):
+                    for token in self._tokens[line_index]:
+                        token.line += self._line_delta
+            for line_index in range(index, self._moved_line):
+                if (not self._errors[line_index]):
+                    for token in self._tokens[line_index]:
+                        token.line -= self._line_delta
+        self._moved_line = index
+        if (index == len(self._lines)):
+            self._line_delta = 0
+
+    def _move_statement_boundary(self, index: int) -> None:
+        if (self._statement_delta):
+            for statement_index in range(self._moved_statement, index):
+                self._starts[statement_index] += self._statement_delta
+                self._ends[statement_index] += self._statement_delta
+            for statement_index in range(index, self._moved_statement):
+                self._starts[statement_index] -= self._statement_delta
+                self._ends[statement_index] -= self._statement_delta
+        self._moved_statement = index
+        if (index == len(self._statements)):
+            self._statement_delta = 0
+
+    def _line(self, index: int) -> tuple[list[Token], (PseudocodeError | None)]:
+        # The tokens of the line at index, with its delta paid, and the error that stopped lexing it
+        if (index >= self._moved_line):
+            self._move_line_boundary(index + 1)
+        if (self._errors[index]):
+            # Lexed again, since the error message holds the line number, which might have been moved since
+            self._lex_line(index)
+        return (self._tokens[index], self._errors[index])
+
+    def _parse(self, first: int, line: int, edit_end: (int | None) = None, delta: int = 0) -> None:
+        # Parses top-level statements from the given line, which has to be on a statement boundary, in place of
+        # the statements from index first on. Once past edit_end, it stops at the first line that was also on a
+        # statement boundary in the previous parse, and keeps the previous statements from there on, with their
+        # lines moved by delta. The statements from index first on have to owe the same delta (the statement
+        # boundary has to be at first)
+        (previous_parsed_until, previous_error) = (self._parsed_until, self.error)
+        owed: int = self._statement_delta
+
+        new_statements: list[statements.Statement] = []
+        new_starts: list[int] = []
+        new_ends: list[int] = []
+
+        while True:
+            try:
+                parser: Parser = Parser(_LinesLexer(self, line))
+            except PseudocodeError as error:
+                (self._parsed_until, self.error) = (line, error)
+                break
+
+            token: Token = parser._current_token
+            while (token.type != TokenType.EOF):
+                line = token.line
+
+                if ((edit_end is not None) and (line > edit_end) and ((line - delta) < previous_parsed_until)):
+                    previous_line: int = line - delta
+                    index: int = bisect_left(self._starts, (previous_line - owed), first)
+                    if ((index == 0) or ((self._ends[index - 1] + (owed if (index > first) else 0)) < previous_line)):
+                        self._statements[first:index] = new_statements
+                        self._starts[first:index] = new_starts
+                        self._ends[first:index] = new_ends
+
+                        # The statements that are kept owe the delta of the edit as well
+                        self._moved_statement = first + len(new_statements)
+                        self._statement_delta += delta
+
+                        if (previous_error is None):
+                            self._parsed_until += delta
+                            return
+
+                        # The previous parse stopped at an error, so there is nothing more to keep after that
+                        first = len(self._statements)
+                        line = previous_parsed_until + delta
+                        (new_statements, new_starts, new_ends) = ([], [], [])
+                        edit_end = None
+                        owed = self._statement_delta
+                        break
+
+                try:
+                    statement: (statements.Statement | None) = parser._parse_statement()
+                except PseudocodeError as error:
+                    (self._parsed_until, self.error) = (line, error)
+                    token = None
+                    break
+
+                token = parser._current_token
+                if (statement):
+                    new_statements.append(statement)
+                    new_starts.append(line)
+                    new_ends.append(token.line if (token.type == TokenType.EOF) else (token.line - 1))
+            else:
+                (self._parsed_until, self.error) = ((len(self._lines) + 1), None)
+                break
+
+            if (token is None):
+                break
+
+        # Stored as the statements before them are, which might still owe a delta
+        self._statements[first:] = new_statements
+        self._starts[first:] = [(start - owed) for start in new_starts] if (owed) else new_starts
+        self._ends[first:] = [(end - owed) for end in new_ends] if (owed) else new_ends
+
+    def edit(self, start_line: int, start_column: int, end_line: int, end_column: int, text: str) -> None:
+        # Replaces the text from (start_line, start_column) up to, but not including, (end_line, end_column)
+        lines: list[str] = self._lines
+
+        if (not (1 <= start_line <= end_line <= len(lines))):
+            raise IndexError(f"lines {start_line} to {end_line} are out of range")
+        if ((not (1 <= start_column <= (_line_length(lines[start_line - 1]) + 1)))
+                or (not (1 <= end_column <= (_line_length(lines[end_line - 1]) + 1)))
+                or ((start_line == end_line) and (end_column < start_column))):
+            raise IndexError(f"columns {start_column} to {end_column} are out of range")
+
+        parts: list[str] = (lines[start_line - 1][0 : (start_column - 1)] + text + lines[end_line - 1][(end_column - 1):]).split(TokenType.EOL.value)
+        new_lines: list[str] = [(part + TokenType.EOL.value) for part in parts[0 : -1]]
+        if (end_line == len(lines)):
+            new_lines.append(parts[-1])
+
+        start: int = start_line - 1
+        old_count: int = end_line - start_line + 1
+        new_count: int = len(new_lines)
+        delta: int = new_count - old_count
+
+        # The lines after the edit owe what they did before it, and its delta; their tokens are shared with the
+        # statements that are kept, so those are moved along with them once the delta is paid
+        self._move_line_boundary(start)
+        lines[start : (start + old_count)] = new_lines
+        self._tokens[start : (start + old_count)] = [[] for _ in new_lines]
+        self._errors[start : (start + old_count)] = [None for _ in new_lines]
+
+        for index in range(start, (start + new_count)):
+            self._lex_line(index)
+        self._moved_line = start + new_count
+        self._line_delta += delta
+
+        # The first statement that ends on or after the start of the edit, knowing that the statements from
+        # _moved_statement on are stored without the delta they owe
+        first: int = bisect_left(self._ends, start_line, 0, self._moved_statement)
+        if (first == self._moved_statement):
+            first = bisect_left(self._ends, (start_line - self._statement_delta), first)
+        self._move_statement_boundary(first)
+
+        parse_line: int = min(start_line, self._parsed_until)
+        if (first < len(self._starts)):
+            parse_line = min(parse_line, (self._starts[first] + self._statement_delta))
+
+        self._parse(first, parse_line, edit_end=(start_line + new_count - 1), delta=delta)
+
+    def parse_program(self) -> ParsedProgram:
+        # The same as Parser(Lexer(self.source)).parse_program(), without parsing the whole source again
+        self._move_line_boundary(len(self._lines))
+        if (self.error):
+            raise self.error
+
+        parsed_program: ParsedProgram = ParsedProgram()
+        parsed_program.statements = self._statements.copy()
+        return parsed_program
@@ -1,11 +1,12 @@
 # Standard library imports
 from enum import Enum
+from typing import Callable
 
 # Local imports
-from ..token import Token, TokenType
+from ..token import Token, TokenType, TOKEN_TYPES
 from ..lexer import Lexer
 from ..errors import ParserError
-from .ast import ParsedProgram, statements, expressions
+from .ast import ParsedProgram, FlatProgram, statements, expressions
 
 binding_powers = {
     'prefix': {
@@ -40,15 +41,63 @@ binding_powers = {
     },
 }
 
+def _kind_table(entries: dict[TokenType, object]) -> list:
+    # A table indexed by token kind, with None for every token type that is not in entries
+    table: list = [None] * len(TOKEN_TYPES)
+    for token_type, entry in entries.items():
+        table[token_type.kind] = entry
+    return table
+
+# The binding powers by token kind, so that the parser looks them up with a list index instead of hashing a
+# TokenType for every operator of every expression
+_PREFIX_BINDING_POWERS: list[(int | None)] = _kind_table({token_type: bp[1] for token_type, bp in binding_powers['prefix'].items()})
+_INFIX_BINDING_POWERS: list[(tuple[int, int] | None)] = _kind_table(binding_powers['infix'])
+
+DATATYPE_TOKEN_TYPES: list[TokenType] = [
+    TokenType.INTEGER, 
+    TokenType.REAL, 
+    TokenType.CHAR,
+    TokenType.STRING,
+    TokenType.BOOLEAN,
+    TokenType.DATE
+]
+
+# The kinds of the native datatypes (which are also the kinds of their literals), and of everything that can
+# name a datatype, which includes the identifiers of record types
+_DATATYPE_KINDS: frozenset[int] = frozenset(token_type.kind for token_type in DATATYPE_TOKEN_TYPES)
+_TYPE_NAME_KINDS: frozenset[int] = _DATATYPE_KINDS | {TokenType.IDENTIFIER.kind}
+
+_IDENTIFIER_KIND: int = TokenType.IDENTIFIER.kind
+_L_PARENTHESES_KIND: int = TokenType.L_PARENTHESES.kind
+_L_SQ_BRACKET_KIND: int = TokenType.L_SQ_BRACKET.kind
+
+# What an expression that the parser has put aside is waiting for: an operand, the end of its parentheses, or
+# its next argument or index
+(_INFIX_OPERAND, _PREFIX_OPERAND, _PARENTHESIZED, _ARGUMENT, _INDEX) = range(5)
+
+# How an operand starts, by token kind: with a value, a prefix operator or a parenthesis; None is a syntax error
+_ATOM: int = -1
+_OPERAND_STARTS: list[(int | None)] = _kind_table({
+    TokenType.IDENTIFIER: _ATOM,
+    **{token_type: _ATOM for token_type in DATATYPE_TOKEN_TYPES},
+    **{token_type: _PREFIX_OPERAND for token_type in binding_powers['prefix']},
+    TokenType.L_PARENTHESES: _PARENTHESIZED,
+})
+
+class _Block:
+    # A block statement that is being parsed: the keyword it starts with, what comes before its body (its
+    # condition, or its identifier, parameters and return type), and the statements of its body so far. end is
+    # the token type that ends it, or None for an IF, which can end after any of its statements
+    __slots__ = ('keyword', 'header', 'end', 'statements')
+    
+    def __init__(self, keyword: Token, header: tuple, end: (TokenType | None)) -> None:
+        self.keyword: Token = keyword
+        self.header: tuple = header
+        self.end: (TokenType | None) = end
+        self.statements: list[statements.Statement] = []
+
 class Parser:
-    DATATYPE_TOKEN_TYPES: list[TokenType] = [
-        TokenType.INTEGER, 
-        TokenType.REAL, 
-        TokenType.CHAR,
-        TokenType.STRING,
-        TokenType.BOOLEAN,
-        TokenType.DATE
-    ]
+    DATATYPE_TOKEN_TYPES: list[TokenType] = DATATYPE_TOKEN_TYPES
     
     def __init__(self, lexer: Lexer) -> None:
         self._lexer = lexer
@@ -57,6 +106,9 @@ class Parser:
         self._next_token: Token = lexer.get_next_token()
         
         self._parsed_program = ParsedProgram()
+        
+        # The PROCEDURE or FUNCTION keyword of the definition being parsed, if any
+        self._subroutine: (Token | None) = None
     
     def _advance(self) -> None:
         self._current_token: Token = self._next_token
@@ -106,18 +158,17 @@ class Parser:
         
         self._advance()
         
-        match(self._current_token.type):
-            case TokenType.INTEGER | TokenType.REAL | TokenType.CHAR | TokenType.STRING | TokenType.BOOLEAN | TokenType.DATE | TokenType.IDENTIFIER:
-                datatype: Token = self._current_token
-                
-                self._advance()
-                
-                if (TokenType.EOL != self._current_token.type != TokenType.EOF):
-                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
-                
-                self._advance()
-                
-                return statements.DECLARE_ARRAY(identifier, dimensions_sizes, datatype)
+        if (self._current_token.kind in _TYPE_NAME_KINDS):
+            datatype: Token = self._current_token
+            
+            self._advance()
+            
+            if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+            
+            self._advance()
+            
+            return statements.DECLARE_ARRAY(identifier, dimensions_sizes, datatype)
         
         raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a datatype, got {repr(self._current_token.literal)}")
     
@@ -139,18 +190,17 @@ class Parser:
         if (self._current_token.type == TokenType.ARRAY):
             return self._parse_statement_DECLARE_ARRAY(identifier)
         
-        match(self._current_token.type):
-            case TokenType.INTEGER | TokenType.REAL | TokenType.CHAR | TokenType.STRING | TokenType.BOOLEAN | TokenType.DATE | TokenType.IDENTIFIER:
-                datatype: Token = self._current_token
-                
-                self._advance()
-                
-                if (TokenType.EOL != self._current_token.type != TokenType.EOF):
-                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
-                
-                self._advance()
-                
-                return statements.DECLARE(identifier, datatype)
+        if (self._current_token.kind in _TYPE_NAME_KINDS):
+            datatype: Token = self._current_token
+            
+            self._advance()
+            
+            if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+            
+            self._advance()
+            
+            return statements.DECLARE(identifier, datatype)
         
         raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a datatype, got {repr(self._current_token.literal)}")
     
@@ -169,19 +219,17 @@ class Parser:
         
         self._advance()
         
-        match(self._current_token.type):
-            case TokenType.INTEGER | TokenType.REAL | TokenType.CHAR | TokenType.STRING | TokenType.BOOLEAN | TokenType.DATE:
-                if (hasattr(self._current_token, 'is_literal')):
-                    value: Token = self._current_token
-                    
-                    self._advance()
-                    
-                    if (TokenType.EOL != self._current_token.type != TokenType.EOF):
-                        raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
-                    
-                    self._advance()
-                    
-                    return statements.CONSTANT(identifier, value)
+        if ((self._current_token.kind in _DATATYPE_KINDS) and hasattr(self._current_token, 'is_literal')):
+            value: Token = self._current_token
+            
+            self._advance()
+            
+            if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+            
+            self._advance()
+            
+            return statements.CONSTANT(identifier, value)
         
         raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a literal, got {repr(self._current_token.literal)}")
     
@@ -222,6 +270,9 @@ class Parser:
         if (self._current_token.type == TokenType.L_SQ_BRACKET):
             return self._parse_statement_ASSIGNMENT_ARRAY(identifier)
         
+        if (self._current_token.type == TokenType.PERIOD):
+            return self._parse_statement_ASSIGNMENT_FIELD(identifier)
+        
         if (self._current_token.type != TokenType.ASSIGNMENT):
             raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.ASSIGNMENT.value)}, got {repr(self._current_token.literal)}")
         
@@ -236,6 +287,30 @@ class Parser:
         
         return statements.ASSIGNMENT(identifier, expression)
     
+    def _parse_statement_ASSIGNMENT_FIELD(self, identifier: Token) -> statements.ASSIGNMENT_FIELD:
+        self._advance()
+        
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a field identifier, got {repr(self._current_token.literal)}")
+        
+        field: Token = self._current_token
+        
+        self._advance()
+        
+        if (self._current_token.type != TokenType.ASSIGNMENT):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.ASSIGNMENT.value)}, got {repr(self._current_token.literal)}")
+        
+        self._advance()
+        
+        expression: expressions.Expression = self._parse_expression(0)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.ASSIGNMENT_FIELD(identifier, field, expression)
+    
     def _parse_statement_INPUT(self) -> statements.INPUT:
         self._advance()
         
@@ -269,7 +344,9 @@ class Parser:
         
         return statements.OUTPUT(exprs)
     
-    def _parse_statement_IF(self) -> statements.IF:
+    def _parse_block_start_IF(self) -> _Block:
+        keyword: Token = self._current_token
+        
         self._advance()
         
         condition: expressions.Expression = self._parse_expression(0)
@@ -284,151 +361,515 @@ class Parser:
         
         self._advance()
         
-        in_condition: list[statements.Statement] = []
+        return _Block(keyword, (condition,), None)
+    
+    def _parse_block_end_IF(self, block: _Block) -> statements.IF:
+        self._advance()
         
-        while (self._current_token.type != TokenType.EOF):
-            statement: (statements.Statement | None) = self._parse_statement()
+        if (self._current_token.type != TokenType.EOL):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        (condition,) = block.header
+        return statements.IF([(condition, block.statements)])
+    
+    def _parse_block_start_WHILE(self) -> _Block:
+        keyword: Token = self._current_token
+        
+        self._advance()
+        
+        condition: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.EOL):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return _Block(keyword, (condition,), TokenType.ENDWHILE)
+    
+    def _parse_block_end_WHILE(self, block: _Block) -> statements.WHILE:
+        self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        (condition,) = block.header
+        return statements.WHILE(condition, block.statements)
+    
+    def _parse_parameters(self, allow_by_reference: bool) -> list[statements.Parameter]:
+        self._advance()
+        
+        parameters: list[statements.Parameter] = []
+        if (self._current_token.type == TokenType.R_PARENTHESES):
+            self._advance()
+            return parameters
+        
+        # BYREF and BYVAL apply to every parameter after them, up to the next one of them; BYVAL is the default
+        by_reference: bool = False
+        
+        while True:
+            if (self._current_token.type in (TokenType.BYREF, TokenType.BYVAL)):
+                if ((self._current_token.type == TokenType.BYREF) and (not allow_by_reference)):
+                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; FUNCTION parameters cannot be passed BYREF")
+                by_reference = (self._current_token.type == TokenType.BYREF)
+                self._advance()
+            
+            if (self._current_token.type != TokenType.IDENTIFIER):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected identifier, got {repr(self._current_token.literal)}")
             
-            if (statement):
-                in_condition.append(statement)
+            identifier: Token = self._current_token
             
-            if (self._current_token.type == TokenType.ENDIF):
+            self._advance()
+            
+            if (self._current_token.type != TokenType.COLON):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.COLON.value)}, got {repr(self._current_token.literal)}")
+            
+            self._advance()
+            
+            is_array: bool = (self._current_token.type == TokenType.ARRAY)
+            if (is_array):
                 self._advance()
-                if (self._current_token.type != TokenType.EOL):
-                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
-                break
-        else:
-            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed IF block")
+                
+                if (self._current_token.type != TokenType.OF):
+                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.OF.value)}, got {repr(self._current_token.literal)}")
+                
+                self._advance()
+            
+            if (self._current_token.kind not in _TYPE_NAME_KINDS):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a datatype, got {repr(self._current_token.literal)}")
+            parameters.append(statements.Parameter(identifier, self._current_token, is_array, by_reference))
+            
+            self._advance()
+            
+            if (self._current_token.type == TokenType.COMMA):
+                self._advance()
+                continue
+            
+            if (self._current_token.type != TokenType.R_PARENTHESES):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.R_PARENTHESES.value)}, got {repr(self._current_token.literal)}")
+            
+            self._advance()
+            return parameters
+    
+    def _parse_block_start_PROCEDURE(self) -> _Block:
+        # Also parses FUNCTIONs, which differ only in their RETURNS clause and in that they can RETURN
+        keyword: Token = self._current_token
+        is_function: bool = (keyword.type == TokenType.FUNCTION)
+        
+        if (self._subroutine):
+            raise ParserError(f"line {keyword.line}, col {keyword.column}; a {keyword.literal} cannot be defined inside another {self._subroutine.literal}")
         
         self._advance()
-        return statements.IF([(condition, in_condition)])
-    
-    def _parse_statement(self) -> (statements.Statement | None):
-        match(self._current_token.type):
-            case TokenType.EOL:
-                return self._advance()
+        
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected identifier, got {repr(self._current_token.literal)}")
+        
+        identifier: Token = self._current_token
+        
+        self._advance()
+        
+        parameters: list[statements.Parameter] = []
+        if (self._current_token.type == TokenType.L_PARENTHESES):
+            parameters = self._parse_parameters(allow_by_reference=(not is_function))
+        
+        returns: (Token | None) = None
+        if (is_function):
+            if (self._current_token.type != TokenType.RETURNS):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.RETURNS.value)}, got {repr(self._current_token.literal)}")
             
-            case TokenType.DECLARE:
-                return self._parse_statement_DECLARE()
-            case TokenType.CONSTANT:
-                return self._parse_statement_CONSTANT()
-            case TokenType.IDENTIFIER:
-                return self._parse_statement_ASSIGNMENT()
+            self._advance()
             
-            case TokenType.INPUT:
-                return self._parse_statement_INPUT()
-            case TokenType.OUTPUT:
-                return self._parse_statement_OUTPUT()
+            if (self._current_token.kind not in _TYPE_NAME_KINDS):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a datatype, got {repr(self._current_token.literal)}")
+            returns = self._current_token
             
-            case TokenType.IF:
-                return self._parse_statement_IF()
+            self._advance()
+        
+        if (self._current_token.type != TokenType.EOL):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
         
-        raise ParserError(f"line {self._current_token.line}; invalid statement")
+        self._advance()
+        
+        self._subroutine = keyword
+        return _Block(keyword, (identifier, parameters, returns), (TokenType.ENDFUNCTION if (is_function) else TokenType.ENDPROCEDURE))
     
-    def _parse_expression_atom(self) -> (expressions.Atom | None):
-        current_token: Token = self._current_token
+    def _parse_block_end_PROCEDURE(self, block: _Block) -> statements.PROCEDURE:
+        self._subroutine = None
         
-        match(current_token.type):
-            case TokenType.IDENTIFIER:
-                self._advance()
-                return expressions.Atom(current_token)
-            case TokenType.INTEGER | TokenType.REAL | TokenType.CHAR | TokenType.STRING | TokenType.BOOLEAN | TokenType.DATE:
-                if (hasattr(current_token, 'is_literal')):
-                    self._advance()
-                    return expressions.Atom(current_token) 
-
-        return None
+        self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        (identifier, parameters, returns) = block.header
+        if (block.keyword.type == TokenType.FUNCTION):
+            return statements.FUNCTION(identifier, parameters, returns, block.statements)
+        return statements.PROCEDURE(identifier, parameters, block.statements)
     
-    def _parse_expression_prefix(self) -> (expressions.PrefixOperator | None):
-        operator: Token = self._current_token
+    def _parse_statement_CALL(self) -> statements.CALL:
+        self._advance()
         
-        bp: (tuple[None, int] | None) = binding_powers['prefix'].get(operator.type)
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected identifier, got {repr(self._current_token.literal)}")
         
-        # Not a prefix operator
-        if (not bp):
-            return None
+        identifier: Token = self._current_token
         
         self._advance()
-        return expressions.PrefixOperator(operator, operand=self._parse_expression(bp[1]))
+        
+        arguments: list[expressions.Expression] = []
+        if (self._current_token.type == TokenType.L_PARENTHESES):
+            self._advance()
+            
+            if (self._current_token.type != TokenType.R_PARENTHESES):
+                arguments.append(self._parse_expression(0))
+                
+                while (self._current_token.type == TokenType.COMMA):
+                    self._advance()
+                    arguments.append(self._parse_expression(0))
+                
+                if (self._current_token.type != TokenType.R_PARENTHESES):
+                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed parenthesis")
+            
+            self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.CALL(identifier, arguments)
     
-    def _parse_expression_enclosing_parentheses(self) -> (expressions.Expression | None):
-        if (self._current_token.type != TokenType.L_PARENTHESES):
-            return None
+    def _parse_statement_RETURN(self) -> statements.RETURN:
+        keyword: Token = self._current_token
+        
+        if ((not self._subroutine) or (self._subroutine.type != TokenType.FUNCTION)):
+            raise ParserError(f"line {keyword.line}, col {keyword.column}; RETURN can only be used inside a FUNCTION")
         
         self._advance()
-        parenthesized_expr: expressions.Expression = self._parse_expression(0)
         
-        if (self._current_token.type != TokenType.R_PARENTHESES):
-            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed parenthesis")
+        expression: expressions.Expression = self._parse_expression(0)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
         
         self._advance()
-        return parenthesized_expr
+        
+        return statements.RETURN(keyword, expression)
     
-    def _parse_expression_function_call(self, identifier: expressions.Expression) -> expressions.FunctionCall:
-        if ((not isinstance(identifier, expressions.Atom)) or (identifier.token.type != TokenType.IDENTIFIER)):
-            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; it must be a plain function identifier")
+    def _parse_statement_TYPE(self) -> statements.TYPE:
+        keyword: Token = self._current_token
         
-        arguments: list[expressions.Expression] = []
+        self._advance()
+        
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected identifier, got {repr(self._current_token.literal)}")
+        
+        identifier: Token = self._current_token
         
         self._advance()
-        if (self._current_token.type != TokenType.R_PARENTHESES):
-            arguments.append(self._parse_expression(0))
+        
+        if (self._current_token.type != TokenType.EOL):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        # A record type is made up of DECLARE statements only, one for each of its fields
+        fields: list[statements.DECLARE] = []
+        while (self._current_token.type != TokenType.EOF):
+            if (self._current_token.type == TokenType.ENDTYPE):
+                break
             
-            while (self._current_token.type == TokenType.COMMA):
+            if (self._current_token.type == TokenType.EOL):
                 self._advance()
-                arguments.append(self._parse_expression(0))
+                continue
             
-            if (self._current_token.type != TokenType.R_PARENTHESES):
-                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed parenthesis")
+            if (self._current_token.type != TokenType.DECLARE):
+                raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.DECLARE.value)} or {repr(TokenType.ENDTYPE.value)}, got {repr(self._current_token.literal)}")
+            
+            fields.append(self._parse_statement_DECLARE())
+        else:
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed {keyword.literal} block")
+        
+        if (not fields):
+            raise ParserError(f"line {keyword.line}, col {keyword.column}; the {keyword.literal} {repr(identifier.literal)} has no fields")
+        
+        self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.TYPE(identifier, fields)
+    
+    def _parse_statement_OPENFILE(self) -> statements.OPENFILE:
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.FOR):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.FOR.value)}, got {repr(self._current_token.literal)}")
+        
+        self._advance()
+        
+        if (self._current_token.type not in (TokenType.READ, TokenType.WRITE, TokenType.APPEND, TokenType.RANDOM)):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected a file mode ({TokenType.READ.value}, {TokenType.WRITE.value}, {TokenType.APPEND.value} or {TokenType.RANDOM.value}), got {repr(self._current_token.literal)}")
+        
+        mode: Token = self._current_token
+        
+        self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
         
         self._advance()
-        return expressions.FunctionCall(identifier, arguments)
+        
+        return statements.OPENFILE(file, mode)
     
-    def _parse_expression_array_indexing(self, identifier: expressions.Expression) -> expressions.ArrayIndexing:
-        if ((not isinstance(identifier, expressions.Atom)) or (identifier.token.type != TokenType.IDENTIFIER)):
-            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; it must be a plain array identifier")
+    def _parse_statement_READFILE(self) -> statements.READFILE:
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.COMMA):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.COMMA.value)}, got {repr(self._current_token.literal)}")
         
         self._advance()
-        indexes: list[expressions.Expression] = [self._parse_expression(0)]
         
-        while (self._current_token.type == TokenType.COMMA):
-            self._advance()
-            indexes.append(self._parse_expression(0))
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.IDENTIFIER.value)}, got {repr(self._current_token.literal)}")
         
-        if (self._current_token.type != TokenType.R_SQ_BRACKET):
-            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed square brackets")
+        identifier: Token = self._current_token
         
         self._advance()
-        return expressions.ArrayIndexing(identifier, indexes)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.READFILE(file, identifier)
     
-    def _parse_expression(self, other_bp: int) -> expressions.Expression:
-        lhs: (expressions.Expression | None) = self._parse_expression_atom()
-        if (not lhs):
-            lhs = self._parse_expression_prefix()
-            if (not lhs):
-                lhs = self._parse_expression_enclosing_parentheses()
-                if (not lhs):
-                    raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unexpected token {repr(self._current_token.literal)}")
-        
-        while (TokenType.EOL != self._current_token.type != TokenType.EOF):
-            operator: Token = self._current_token
-            
-            if (operator.type == TokenType.L_PARENTHESES):
-                lhs = self._parse_expression_function_call(identifier=lhs)
-                continue
+    def _parse_statement_WRITEFILE(self) -> statements.WRITEFILE:
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.COMMA):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.COMMA.value)}, got {repr(self._current_token.literal)}")
+        
+        self._advance()
+        
+        expression: expressions.Expression = self._parse_expression(0)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.WRITEFILE(file, expression)
+    
+    def _parse_statement_CLOSEFILE(self) -> statements.CLOSEFILE:
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.CLOSEFILE(file)
+    
+    def _parse_statement_SEEK(self) -> statements.SEEK:
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.COMMA):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.COMMA.value)}, got {repr(self._current_token.literal)}")
+        
+        self._advance()
+        
+        address: expressions.Expression = self._parse_expression(0)
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        return statements.SEEK(file, address)
+    
+    def _parse_statement_GETRECORD(self) -> statements.GETRECORD:
+        # Also parses PUTRECORD, which takes the same operands
+        keyword: Token = self._current_token
+        
+        self._advance()
+        
+        file: expressions.Expression = self._parse_expression(0)
+        
+        if (self._current_token.type != TokenType.COMMA):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.COMMA.value)}, got {repr(self._current_token.literal)}")
+        
+        self._advance()
+        
+        if (self._current_token.type != TokenType.IDENTIFIER):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected {repr(TokenType.IDENTIFIER.value)}, got {repr(self._current_token.literal)}")
+        
+        identifier: Token = self._current_token
+        
+        self._advance()
+        
+        if (TokenType.EOL != self._current_token.type != TokenType.EOF):
+            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; expected the line to end")
+        
+        self._advance()
+        
+        if (keyword.type == TokenType.PUTRECORD):
+            return statements.PUTRECORD(file, identifier)
+        return statements.GETRECORD(file, identifier)
+    
+    def _parse_statement_block(self) -> statements.Statement:
+        # Parses an IF, WHILE, PROCEDURE or FUNCTION along with every block inside it. The blocks that are open
+        # are kept on a stack rather than each being parsed by a call of its own, so that how deeply they can be
+        # nested is only limited by memory
+        blocks: list[_Block] = [_BLOCK_STARTS[self._current_token.kind](self)]
+        
+        while True:
+            block: _Block = blocks[-1]
+            token: Token = self._current_token
             
-            if (operator.type == TokenType.L_SQ_BRACKET):
-                lhs = self._parse_expression_array_indexing(identifier=lhs)
-                continue
+            if (token.type == TokenType.EOF):
+                # A WHILE block is reported where it starts, and the others where the program ends
+                position: Token = block.keyword if (block.keyword.type == TokenType.WHILE) else token
+                raise ParserError(f"line {position.line}, col {position.column}; unclosed {block.keyword.literal} block")
             
-            bp: (tuple[int, int] | None) = binding_powers['infix'].get(operator.type)
-            if ((not bp) or (other_bp >= bp[0])):
-                break
+            if (token.type == block.end):
+                statement: (statements.Statement | None) = _BLOCK_ENDS[block.keyword.kind](self, blocks.pop())
+                if (not blocks):
+                    return statement
+                blocks[-1].statements.append(statement)
+            else:
+                parse_block_start: (Callable[[Parser], _Block] | None) = _BLOCK_STARTS[token.kind]
+                if (parse_block_start is not None):
+                    blocks.append(parse_block_start(self))
+                    continue
+                
+                statement = self._parse_statement()
+                if (statement):
+                    block.statements.append(statement)
             
-            self._advance()
-            lhs = expressions.InfixOperator(operator, lhs, rhs=self._parse_expression(bp[1]))
+            # An IF ends at the ENDIF after any of its statements, which can end the IF that it is in as well
+            while ((blocks[-1].end is None) and (self._current_token.type == TokenType.ENDIF)):
+                statement = self._parse_block_end_IF(blocks.pop())
+                if (not blocks):
+                    return statement
+                blocks[-1].statements.append(statement)
+    
+    def _parse_statement(self) -> (statements.Statement | None):
+        parse: (Callable[[Parser], (statements.Statement | None)] | None) = _STATEMENT_PARSERS[self._current_token.kind]
+        if (parse is None):
+            raise ParserError(f"line {self._current_token.line}; invalid statement")
+        return parse(self)
+    
+    def _parse_expression(self, other_bp: int) -> expressions.Expression:
+        # Pratt parsing, with a stack of the expressions that are waiting for an operand instead of a call for
+        # every operand, parenthesis, argument and index, so that how deeply an expression can be nested is only
+        # limited by memory. Every entry is (what it is waiting for, the binding power that it was being parsed
+        # with, its operator or identifier, and its left operand or its arguments or indexes so far)
+        pending: list[tuple[int, int, object, object]] = []
+        bp: int = other_bp
+        
+        # Looked up once for every expression, rather than for every token of it
+        operand_starts: list[(int | None)] = _OPERAND_STARTS
+        infix_binding_powers: list[(tuple[int, int] | None)] = _INFIX_BINDING_POWERS
         
-        return lhs
+        while True:
+            token: Token = self._current_token
+            start: (int | None) = operand_starts[token.kind]
+            
+            # Datatype keywords share their kinds with literals, but are not values
+            if ((start == _ATOM) and ((token.kind == _IDENTIFIER_KIND) or hasattr(token, 'is_literal'))):
+                self._advance()
+                lhs: expressions.Expression = expressions.Atom(token)
+            elif (start == _PREFIX_OPERAND):
+                self._advance()
+                pending.append((_PREFIX_OPERAND, bp, token, None))
+                bp = _PREFIX_BINDING_POWERS[token.kind]
+                continue
+            elif (start == _PARENTHESIZED):
+                self._advance()
+                pending.append((_PARENTHESIZED, bp, token, None))
+                bp = 0
+                continue
+            else:
+                raise ParserError(f"line {token.line}, col {token.column}; unexpected token {repr(token.literal)}")
+            
+            # The operators after the operand, until one starts another operand. The ends of lines (and of the
+            # program) are neither postfix nor infix operators, so they complete every expression that is waiting
+            while True:
+                operator: Token = self._current_token
+                kind: int = operator.kind
+                
+                binding_power: (tuple[int, int] | None) = infix_binding_powers[kind]
+                if (binding_power is not None):
+                    if (bp < binding_power[0]):
+                        self._advance()
+                        pending.append((_INFIX_OPERAND, bp, operator, lhs))
+                        bp = binding_power[1]
+                        break
+                elif ((kind == _L_PARENTHESES_KIND) or (kind == _L_SQ_BRACKET_KIND)):
+                    if ((not isinstance(lhs, expressions.Atom)) or (lhs.token.type != TokenType.IDENTIFIER)):
+                        raise ParserError(f"line {operator.line}, col {operator.column}; it must be a plain {'function' if (kind == _L_PARENTHESES_KIND) else 'array'} identifier")
+                    
+                    self._advance()
+                    if (kind == _L_SQ_BRACKET_KIND):
+                        pending.append((_INDEX, bp, lhs, []))
+                    elif (self._current_token.type != TokenType.R_PARENTHESES):
+                        pending.append((_ARGUMENT, bp, lhs, []))
+                    else:
+                        self._advance()
+                        lhs = expressions.FunctionCall(lhs, [])
+                        continue
+                    bp = 0
+                    break
+                
+                # The operand is complete, and so is the expression that was waiting for it
+                if (not pending):
+                    return lhs
+                (waiting, bp, held, items) = pending.pop()
+                
+                if (waiting == _INFIX_OPERAND):
+                    lhs = expressions.InfixOperator(held, items, rhs=lhs)
+                elif (waiting == _PREFIX_OPERAND):
+                    lhs = expressions.PrefixOperator(held, operand=lhs)
+                elif (waiting == _PARENTHESIZED):
+                    if (self._current_token.type != TokenType.R_PARENTHESES):
+                        raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed parenthesis")
+                    self._advance()
+                else:
+                    items.append(lhs)
+                    if (self._current_token.type == TokenType.COMMA):
+                        self._advance()
+                        pending.append((waiting, bp, held, items))
+                        bp = 0
+                        break
+                    
+                    if (waiting == _ARGUMENT):
+                        if (self._current_token.type != TokenType.R_PARENTHESES):
+                            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed parenthesis")
+                        self._advance()
+                        lhs = expressions.FunctionCall(held, items)
+                    else:
+                        if (self._current_token.type != TokenType.R_SQ_BRACKET):
+                            raise ParserError(f"line {self._current_token.line}, col {self._current_token.column}; unclosed square brackets")
+                        self._advance()
+                        lhs = expressions.ArrayIndexing(held, items)
     
     def parse_program(self) -> ParsedProgram:
         parsed_program = self._parsed_program
@@ -437,4 +878,61 @@ class Parser:
             statement: (statements.Statement | None) = self._parse_statement()
             (statement and parsed_program.statements.append(statement))
         
-        return parsed_program
\ No newline at end of file
+        return parsed_program
+    
+    def parse_program_flat(self) -> FlatProgram:
+        # The same program as parse_program(), encoded a statement at a time as soon as it is parsed, so that the
+        # objects of no more than one top-level statement are alive at once
+        flat_program: FlatProgram = FlatProgram()
+        
+        while (self._current_token.type != TokenType.EOF):
+            statement: (statements.Statement | None) = self._parse_statement()
+            (statement and flat_program.add_statement(statement))
+        
+        return flat_program
+
+# What the parser does with the token that a statement starts with, and with the tokens that a block starts
+# and ends with, by token kind. Built once the methods exist; None is a syntax error, or not a block
+_STATEMENT_PARSERS: list[(Callable[[Parser], (statements.Statement | None)] | None)] = _kind_table({
+    TokenType.EOL: Parser._advance,
+    
+    TokenType.DECLARE: Parser._parse_statement_DECLARE,
+    TokenType.CONSTANT: Parser._parse_statement_CONSTANT,
+    TokenType.IDENTIFIER: Parser._parse_statement_ASSIGNMENT,
+    
+    TokenType.INPUT: Parser._parse_statement_INPUT,
+    TokenType.OUTPUT: Parser._parse_statement_OUTPUT,
+    
+    TokenType.IF: Parser._parse_statement_block,
+    TokenType.WHILE: Parser._parse_statement_block,
+    
+    TokenType.PROCEDURE: Parser._parse_statement_block,
+    TokenType.FUNCTION: Parser._parse_statement_block,
+    TokenType.CALL: Parser._parse_statement_CALL,
+    TokenType.RETURN: Parser._parse_statement_RETURN,
+    
+    TokenType.OPENFILE: Parser._parse_statement_OPENFILE,
+    TokenType.READFILE: Parser._parse_statement_READFILE,
+    TokenType.WRITEFILE: Parser._parse_statement_WRITEFILE,
+    TokenType.CLOSEFILE: Parser._parse_statement_CLOSEFILE,
+    TokenType.SEEK: Parser._parse_statement_SEEK,
+    TokenType.GETRECORD: Parser._parse_statement_GETRECORD,
+    TokenType.PUTRECORD: Parser._parse_statement_GETRECORD,
+    
+    TokenType.TYPE: Parser._parse_statement_TYPE,
+})
+
+_BLOCK_STARTS: list[(Callable[[Parser], _Block] | None)] = _kind_table({
+    TokenType.IF: Parser._parse_block_start_IF,
+    TokenType.WHILE: Parser._parse_block_start_WHILE,
+    TokenType.PROCEDURE: Parser._parse_block_start_PROCEDURE,
+    TokenType.FUNCTION: Parser._parse_block_start_PROCEDURE,
+})
+
+# By the kind of the keyword that the block starts with
+_BLOCK_ENDS: list[(Callable[[Parser, _Block], statements.Statement] | None)] = _kind_table({
+    TokenType.IF: Parser._parse_block_end_IF,
+    TokenType.WHILE: Parser._parse_block_end_WHILE,
+    TokenType.PROCEDURE: Parser._parse_block_end_PROCEDURE,
+    TokenType.FUNCTION: Parser._parse_block_end_PROCEDURE,
+})
\ No newline at end of file
@@ -0,0 +1 @@
+from .profiler import *
\ No newline at end of file
@@ -0,0 +1,122 @@
+# Standard library imports
+import time
+from typing import Callable
+
+# The name that the main program goes by in a profile; no identifier can clash with it
+MAIN_PROGRAM: str = '<main>'
+
+class Profiler:
+    # Where a run of a program spent its time. The VirtualMachine reports an event every time a statement
+    # starts (from the LINE instructions of code compiled with Compiler(profile=True)), and every time a
+    # PROCEDURE or FUNCTION is called or returns. The time between two events is charged to the statement that
+    # was running, and to the stack of calls that led to it.
+    # The times include the profiler's own work, which is roughly the same for every statement, so they are
+    # best read relative to each other
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns) -> None:
+        self._clock: Callable[[], int] = clock
+
+        # Hits and time (in nanoseconds) by source line; statements of subroutines are on lines of their own
+        self.line_hits: dict[int, int] = {}
+        self.line_times: dict[int, int] = {}
+
+        # Calls, time spent in the body itself and time spent in the body along with whatever it called, by
+        # subroutine (and MAIN_PROGRAM)
+        self.calls: dict[str, int] = {}
+        self.self_times: dict[str, int] = {}
+        self.cumulative_times: dict[str, int] = {}
+
+        # Time by stack of (subroutine, line) frames, from the main program down, for collapsed stacks
+        self.stack_times: dict[tuple[tuple[str, int], ...], int] = {}
+
+        # [subroutine, line being run, when it was called] of every call in progress
+        self._frames: list[list[object]] = []
+        self._stack: tuple[tuple[str, int], ...] = ()
+        self._last: int = 0
+
+    def start(self) -> None:
+        self._last = self._clock()
+        self._frames = [[MAIN_PROGRAM, 0, self._last]]
+        self._stack = ((MAIN_PROGRAM, 0),)
+        self.calls[MAIN_PROGRAM] = self.calls.get(MAIN_PROGRAM, 0) + 1
+
+    def _charge(self) -> int:
+        # Charges the time since the last event to whatever has been running since then
+        now: int = self._clock()
+        elapsed: int = now - self._last
+        self._last = now
+
+        frame: list[object] = self._frames[-1]
+        line: int = frame[1]
+        self.line_times[line] = self.line_times.get(line, 0) + elapsed
+        self.self_times[frame[0]] = self.self_times.get(frame[0], 0) + elapsed
+        self.stack_times[self._stack] = self.stack_times.get(self._stack, 0) + elapsed
+        return now
+
+    def line(self, line: int) -> None:
+        self._charge()
+        self._frames[-1][1] = line
+        self._stack = self._stack[:-1] + ((self._frames[-1][0], line),)
+        self.line_hits[line] = self.line_hits.get(line, 0) + 1
+
+    def call(self, name: str) -> None:
+        now: int = self._charge()
+        self._frames.append([name, 0, now])
+        self._stack += ((name, 0),)
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _leave(self, now: int) -> None:
+        name, _, called = self._frames.pop()
+        # A recursive call is already counted by the outermost call in progress
+        if (all((frame[0] != name) for frame in self._frames)):
+            self.cumulative_times[name] = self.cumulative_times.get(name, 0) + (now - called)
+        self._stack = self._stack[:-1]
+
+    def return_(self) -> None:
+        self._leave(self._charge())
+
+    def stop(self) -> None:
+        # The run ended, whether or not it got to the end of the program; any calls still in progress end with it
+        now: int = self._charge()
+        while (self._frames):
+            self._leave(now)
+
+    @property
+    def total_time(self) -> int:
+        return self.cumulative_times.get(MAIN_PROGRAM, 0)
+
+    def collapsed_stacks(self) -> str:
+        # One line per stack, in the format that flamegraph.pl (and compatible tools) take: the frames from the
+        # outermost in, separated by ';', then the time spent there in microseconds
+        lines: list[str] = []
+        for stack, elapsed in sorted(self.stack_times.items()):
+            microseconds: int = elapsed // 1000
+            if (microseconds):
+                lines.append(';'.join(f'{name}:{line}' if (line) else name for name, line in stack) + f' {microseconds}')
+        return '\n'.join(lines) + ('\n' if (lines) else '')
+
+    def write_collapsed_stacks(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.collapsed_stacks())
+
+    def report(self, source: (str | None) = None, limit: (int | None) = 20) -> str:
+        # The subroutines by cumulative time, then the lines by time, slowest first; the text of every line is
+        # shown if the source is given
+        total: int = self.total_time or 1
+        source_lines: list[str] = source.splitlines() if (source is not None) else []
+
+        parts: list[str] = [f'total time: {self.total_time / 1e6:.3f} ms', '']
+
+        parts.append(f"{'calls':>10} {'self ms':>12} {'cumulative ms':>14} {'%':>6}  subroutine")
+        for name in sorted(self.calls, key=(lambda name: (-self.cumulative_times.get(name, 0), name))):
+            cumulative: int = self.cumulative_times.get(name, 0)
+            parts.append(f'{self.calls[name]:>10} {self.self_times.get(name, 0) / 1e6:>12.3f} {cumulative / 1e6:>14.3f} {100 * cumulative / total:>6.1f}  {name}')
+        parts.append('')
+
+        parts.append(f"{'line':>6} {'hits':>10} {'ms':>12} {'%':>6}  source")
+        lines: list[int] = sorted((line for line in self.line_times if (line)), key=(lambda line: (-self.line_times[line], line)))
+        for line in lines[:limit]:
+            text: str = source_lines[line - 1].strip() if (line <= len(source_lines)) else ''
+            parts.append(f'{line:>6} {self.line_hits.get(line, 0):>10} {self.line_times[line] / 1e6:>12.3f} {100 * self.line_times[line] / total:>6.1f}  {text}')
+        if ((limit is not None) and (len(lines) > limit)):
+            parts.append(f'({len(lines) - limit} more lines)')
+        return '\n'.join(parts)
@@ -1,8 +1,16 @@
 # Standard library imports
-import cmd, enum
+import cmd, enum, shlex
 
 # Local imports
-from .lexer.lexer import Lexer, Token, TokenType
+from .lexer import Lexer, FastLexer
+from .token import Token, TokenType
+from .parser.parser import Parser
+from .optimizer import Optimizer
+from .compiler import Bytecode, Compiler
+from .cache import ProgramCache
+from .vm import VirtualMachine
+from .profiler import Profiler
+from .errors import PseudocodeError
 
 def output_tokens(input: str) -> None:
     lexer = Lexer(input)
@@ -28,13 +36,61 @@ For a multi-line input, add a backslash ('\\') at the end of each line input."""
     state: ShellState = ShellState.NORMAL
     stored_input: str = ""
     
+    program_cache: ProgramCache = ProgramCache()
+    
     def do_exit(self, arg: str):
         "Exits out of the shell."
         exit()
     
     def do_exec(self, arg: str):
         "Executes the script located at the path specified."
-        print("--Not yet implemented--")
+        try:
+            bytecode: Bytecode = self.program_cache.load_file(arg)
+            # The user is at the console, so nothing is held back
+            VirtualMachine(interactive=True).run(bytecode)
+        except OSError as error:
+            print(error)
+        except PseudocodeError as error:
+            print(error)
+    
+    def do_profile(self, arg: str):
+        """Executes the script located at the path specified, then reports how often each line and subroutine ran and how long they took.
+Usage: profile <script path> [<collapsed stacks path>]
+The collapsed stacks can be turned into a flamegraph by flamegraph.pl and compatible tools."""
+        try:
+            arguments: list[str] = shlex.split(arg)
+        except ValueError as error:
+            print(error)
+            return
+        if (len(arguments) not in (1, 2)):
+            print('Usage: profile <script path> [<collapsed stacks path>]')
+            return
+
+        profiler: Profiler = Profiler()
+        source: str = ''
+        try:
+            with open(arguments[0], 'r', encoding='utf-8') as file:
+                source = file.read()
+            # Not cached, since the code has a LINE instruction for every statement
+            bytecode: Bytecode = Compiler(profile=True).compile(Optimizer().optimize(Parser(FastLexer(source)).parse_program()))
+            VirtualMachine(interactive=True).run(bytecode, profiler)
+        except OSError as error:
+            print(error)
+        except PseudocodeError as error:
+            print(error)
+        except KeyboardInterrupt:
+            # A program that takes too long can be stopped, and what it did up to then is still reported
+            print('interrupted')
+
+        if (not profiler.calls):
+            return
+        print()
+        print(profiler.report(source))
+        if (len(arguments) == 2):
+            try:
+                profiler.write_collapsed_stacks(arguments[1])
+            except OSError as error:
+                print(error)
     
     def emptyline(self):
         return self.default('')
@@ -0,0 +1,2 @@
+from .resolver import *
+from .purity import *
\ No newline at end of file
@@ -0,0 +1,133 @@
+# Standard library imports
+from typing import Iterator
+
+# Local imports
+from ..token import TokenType
+from ..parser.ast import ParsedProgram, statements, expressions
+from .resolver import SymbolTable, global_table, subroutine_table
+
+# The fields of a statement that hold the expressions it evaluates, in the order the compiler evaluates them in;
+# the conditions of IF and WHILE are dealt with on their own
+EVALUATED_FIELDS: dict[type, tuple[str, ...]] = {
+    statements.DECLARE_ARRAY: ('dimensions_sizes',),
+    statements.ASSIGNMENT_ARRAY: ('expression', 'indexes'),
+    statements.ASSIGNMENT_FIELD: ('expression',),
+    statements.ASSIGNMENT: ('expression',),
+    statements.RETURN: ('expression',),
+    statements.OUTPUT: ('expressions',),
+    statements.CALL: ('arguments',),
+    statements.OPENFILE: ('file',),
+    statements.READFILE: ('file',),
+    statements.CLOSEFILE: ('file',),
+    statements.GETRECORD: ('file',),
+    statements.PUTRECORD: ('file',),
+    statements.WRITEFILE: ('file', 'expression'),
+    statements.SEEK: ('file', 'address'),
+}
+
+# The statements that bind a value to their identifier, or change it in place
+WRITING_STATEMENTS: tuple[type, ...] = (statements.DECLARE, statements.CONSTANT, statements.ASSIGNMENT, statements.INPUT, statements.READFILE, statements.GETRECORD)
+
+# The statements that a pure FUNCTION cannot have, as they do something other than compute its value
+IMPURE_STATEMENTS: tuple[type, ...] = (statements.INPUT, statements.OUTPUT, statements.OPENFILE, statements.READFILE, statements.WRITEFILE, statements.CLOSEFILE, statements.SEEK, statements.GETRECORD, statements.CALL)
+
+def evaluated_expressions(statement: statements.Statement) -> Iterator[expressions.Expression]:
+    # Every expression that a statement evaluates, including the conditions of the blocks it has (but not
+    # what is inside them)
+    for field in EVALUATED_FIELDS.get(type(statement), ()):
+        value: object = getattr(statement, field)
+        if (type(value) is list):
+            yield from value
+        else:
+            yield value
+    match(statement):
+        case statements.IF():
+            for condition, _ in statement.branches:
+                yield condition
+        case statements.WHILE():
+            yield statement.condition
+
+def subexpressions(expression: expressions.Expression) -> Iterator[expressions.Expression]:
+    # The expression and every expression inside it, except for the identifiers of fields and of FUNCTIONs,
+    # which are not variables
+    pending: list[expressions.Expression] = [expression]
+    while (pending):
+        expression = pending.pop()
+        yield expression
+        match(expression):
+            case expressions.PrefixOperator() | expressions.PostfixOperator():
+                pending.append(expression.operand)
+            case expressions.InfixOperator():
+                pending.append(expression.lhs)
+                if (expression.operator.type != TokenType.PERIOD):
+                    pending.append(expression.rhs)
+            case expressions.ArrayIndexing():
+                pending.append(expression.identifier)
+                pending.extend(expression.indexes)
+            case expressions.FunctionCall():
+                pending.extend(expression.arguments)
+            case expressions.CommonSubexpression():
+                pending.append(expression.expression)
+
+def nested_blocks(statement: statements.Statement) -> list[list[statements.Statement]]:
+    match(statement):
+        case statements.IF():
+            return [block for _, block in statement.branches]
+        case statements.WHILE():
+            return [statement.statements]
+    return []
+
+def called_functions(expression: expressions.Expression) -> Iterator[str]:
+    # The name of every FUNCTION that the expression calls
+    for subexpression in subexpressions(expression):
+        if (type(subexpression) is expressions.FunctionCall):
+            yield subexpression.identifier.token.literal
+
+def _is_self_contained(block: list[statements.Statement], table: SymbolTable, calls: set[str]) -> bool:
+    # Whether the block only reads and writes the variables of its own scope, and does no input or output;
+    # the names of the FUNCTIONs it calls are added to calls
+    for statement in block:
+        if (isinstance(statement, (IMPURE_STATEMENTS + (statements.PROCEDURE, statements.TYPE)))):
+            return False
+        if (isinstance(statement, WRITING_STATEMENTS) and (statement.identifier.literal not in table)):
+            return False
+        for expression in evaluated_expressions(statement):
+            for subexpression in subexpressions(expression):
+                if ((type(subexpression) is expressions.Atom) and (subexpression.token.type == TokenType.IDENTIFIER) and (subexpression.token.literal not in table)):
+                    return False
+            calls.update(called_functions(expression))
+        if (not all(_is_self_contained(nested, table, calls) for nested in nested_blocks(statement))):
+            return False
+    return True
+
+def pure_functions(parsed_program: ParsedProgram) -> set[str]:
+    # The names of the FUNCTIONs of the program whose value only depends on their arguments, and that do nothing
+    # else: they have no BYREF parameters, do no input or output (to the console or to files), CALL no
+    # PROCEDUREs, use no variables but their own, and only call FUNCTIONs that are pure as well. Calling one
+    # again with the same arguments gives the same value, and leaves the program as it was
+    program: list[statements.Statement] = parsed_program.statements
+    globals_: SymbolTable = global_table(program)
+
+    definitions: dict[str, int] = {}
+    for statement in program:
+        if (isinstance(statement, statements.PROCEDURE)):
+            definitions[statement.identifier.literal] = definitions.get(statement.identifier.literal, 0) + 1
+
+    # Every FUNCTION that is pure as far as its own statements go, along with the FUNCTIONs it calls
+    candidates: dict[str, set[str]] = {}
+    for statement in program:
+        if ((type(statement) is not statements.FUNCTION) or (definitions[statement.identifier.literal] != 1)):
+            continue
+        table: SymbolTable = subroutine_table(statement, globals_)
+        calls: set[str] = set()
+        if ((not table.references) and _is_self_contained(statement.statements, table, calls)):
+            candidates[statement.identifier.literal] = calls
+
+    # Those that call a FUNCTION that is not pure are not pure either, which can make others impure in turn
+    changed: bool = True
+    while (changed):
+        impure: list[str] = [name for name, calls in candidates.items() if (not calls.issubset(candidates))]
+        for name in impure:
+            del candidates[name]
+        changed = bool(impure)
+    return set(candidates)
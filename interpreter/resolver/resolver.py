@@ -0,0 +1,174 @@
+# Standard library imports
+from typing import Iterator
+
+# Local imports
+from ..token import Token, TokenType
+from ..errors import CompilerError
+from ..parser.ast import ParsedProgram, statements, expressions
+
+class SymbolTable:
+    # The variables of one scope (the main program's, or a subroutine's), each given a fixed slot in the storage
+    # of the scope at run time, in the order they are first bound in
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.slots: dict[str, int] = {}
+
+        # BYREF parameters, whose slots hold a reference to the caller's variable rather than a value
+        self.references: set[str] = set()
+
+    def add(self, identifier: str) -> int:
+        slot: (int | None) = self.slots.get(identifier)
+        if (slot is None):
+            slot = self.slots[identifier] = len(self.names)
+            self.names.append(identifier)
+        return slot
+
+    def __contains__(self, identifier: str) -> bool:
+        return (identifier in self.slots)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class Resolution:
+    def __init__(self, global_table: SymbolTable, subroutine_tables: list[SymbolTable]) -> None:
+        self.globals: SymbolTable = global_table
+
+        # One for every subroutine, in the order they are defined in
+        self.subroutines: list[SymbolTable] = subroutine_tables
+
+def bound_identifiers(block: list[statements.Statement]) -> Iterator[tuple[str, bool]]:
+    # (identifier, whether it is declared) for every identifier that the block declares (DECLARE or CONSTANT),
+    # assigns to, inputs into or reads a file into, in the order of the source; nested blocks are included,
+    # subroutine definitions are not
+    for statement in block:
+        match(statement):
+            case statements.DECLARE() | statements.CONSTANT():
+                yield (statement.identifier.literal, True)
+            case statements.ASSIGNMENT_ARRAY() | statements.ASSIGNMENT_FIELD():
+                # Only changes an element of an array, or a field of a record, that is already bound
+                pass
+            case statements.ASSIGNMENT() | statements.INPUT() | statements.READFILE():
+                yield (statement.identifier.literal, False)
+            case statements.CALL():
+                # Any of them could be passed BYREF, and be bound by the procedure
+                for argument in statement.arguments:
+                    if ((type(argument) is expressions.Atom) and (argument.token.type == TokenType.IDENTIFIER)):
+                        yield (argument.token.literal, False)
+            case statements.IF():
+                for _, branch in statement.branches:
+                    yield from bound_identifiers(branch)
+            case statements.WHILE():
+                yield from bound_identifiers(statement.statements)
+
+def global_table(program: list[statements.Statement]) -> SymbolTable:
+    # The main program's scope: every identifier that its statements (those outside of subroutines) bind
+    table: SymbolTable = SymbolTable()
+    for identifier, _ in bound_identifiers([statement for statement in program if (not isinstance(statement, statements.PROCEDURE))]):
+        table.add(identifier)
+    return table
+
+def subroutine_table(definition: statements.PROCEDURE, global_table: SymbolTable) -> SymbolTable:
+    # A subroutine's scope: its parameters, whatever it declares, and whatever else it binds that the main
+    # program does not
+    table: SymbolTable = SymbolTable()
+    for parameter in definition.parameters:
+        table.add(parameter.identifier.literal)
+        if (parameter.by_reference):
+            table.references.add(parameter.identifier.literal)
+    for identifier, declared in bound_identifiers(definition.statements):
+        if (declared or (identifier not in global_table)):
+            table.add(identifier)
+    return table
+
+class Resolver:
+    # Works out the scope of every identifier before anything is compiled: the main program has the identifiers
+    # that it binds anywhere; a subroutine has its parameters, whatever it declares, and whatever else it binds
+    # that the main program does not, and sees the main program's otherwise. Reading an identifier that is not
+    # bound in any scope that it can be seen from is reported here, rather than when (if ever) it is run
+    def __init__(self) -> None:
+        self._table: SymbolTable = SymbolTable()
+        self._globals: SymbolTable = self._table
+
+    def _check(self, identifier: Token) -> None:
+        if ((identifier.literal not in self._table) and (identifier.literal not in self._globals)):
+            raise CompilerError(f"line {identifier.line}, col {identifier.column}; {repr(identifier.literal)} is not declared")
+
+    def _check_expression(self, expression: expressions.Expression) -> None:
+        match(expression):
+            case expressions.Atom():
+                if (expression.token.type == TokenType.IDENTIFIER):
+                    self._check(expression.token)
+            case expressions.PrefixOperator() | expressions.PostfixOperator():
+                self._check_expression(expression.operand)
+            case expressions.InfixOperator():
+                self._check_expression(expression.lhs)
+                # The rhs of '.' is the identifier of a field, which belongs to the record rather than to a scope
+                if (expression.operator.type != TokenType.PERIOD):
+                    self._check_expression(expression.rhs)
+            case expressions.ArrayIndexing():
+                self._check_expression(expression.identifier)
+                self._check_expressions(expression.indexes)
+            case expressions.FunctionCall():
+                # The identifier is the name of the subroutine, which the compiler looks up
+                self._check_expressions(expression.arguments)
+            case expressions.CommonSubexpression():
+                self._check_expression(expression.expression)
+
+    def _check_expressions(self, exprs: list[expressions.Expression]) -> None:
+        for expression in exprs:
+            self._check_expression(expression)
+
+    def _check_block(self, block: list[statements.Statement]) -> None:
+        for statement in block:
+            match(statement):
+                case statements.DECLARE_ARRAY():
+                    self._check_expressions(statement.dimensions_sizes)
+                case statements.ASSIGNMENT_ARRAY():
+                    self._check(statement.identifier)
+                    self._check_expressions(statement.indexes)
+                    self._check_expression(statement.expression)
+                case statements.ASSIGNMENT_FIELD():
+                    self._check(statement.identifier)
+                    self._check_expression(statement.expression)
+                case statements.ASSIGNMENT() | statements.RETURN():
+                    self._check_expression(statement.expression)
+                case statements.OUTPUT():
+                    self._check_expressions(statement.expressions)
+                case statements.CALL():
+                    self._check_expressions(statement.arguments)
+                case statements.OPENFILE() | statements.READFILE() | statements.CLOSEFILE():
+                    self._check_expression(statement.file)
+                case statements.WRITEFILE():
+                    self._check_expression(statement.file)
+                    self._check_expression(statement.expression)
+                case statements.SEEK():
+                    self._check_expression(statement.file)
+                    self._check_expression(statement.address)
+                case statements.GETRECORD():
+                    self._check_expression(statement.file)
+                    self._check(statement.identifier)
+                case statements.IF():
+                    for condition, branch in statement.branches:
+                        self._check_expression(condition)
+                        self._check_block(branch)
+                case statements.WHILE():
+                    self._check_expression(statement.condition)
+                    self._check_block(statement.statements)
+
+    def resolve(self, parsed_program: ParsedProgram) -> Resolution:
+        program: list[statements.Statement] = parsed_program.statements
+
+        self._globals = self._table = global_table(program)
+        subroutine_tables: list[SymbolTable] = [subroutine_table(statement, self._globals) for statement in program if (isinstance(statement, statements.PROCEDURE))]
+
+        # Checked in the order of the source, so that the first undeclared identifier is the one reported
+        tables: Iterator[SymbolTable] = iter(subroutine_tables)
+        for statement in program:
+            if (isinstance(statement, statements.PROCEDURE)):
+                self._table = next(tables)
+                self._check_block(statement.statements)
+                self._table = self._globals
+            else:
+                self._check_block([statement])
+
+        return Resolution(self._globals, subroutine_tables)
@@ -0,0 +1,5 @@
+from .values import *
+from .arrays import *
+from .records import *
+from .operators import *
+from .faults import *
\ No newline at end of file
@@ -0,0 +1,188 @@
+# Standard library imports
+from array import array
+
+# Local imports
+from ..token import TokenType
+from .values import Char, DEFAULT_VALUES, COERCERS
+
+# Arrays with more elements than this start out sparse: nothing is allocated until they are assigned to, and
+# then only the assigned elements are stored, until more than 1 / _DENSE_FRACTION of them are
+SPARSE_THRESHOLD: int = (1 << 16)
+_DENSE_FRACTION: int = 16
+
+# CHARs are stored as bytes, where 0 is the empty CHAR (the default value) and n + 1 is the character with
+# code point n; the decoded values are shared, so that reading an element does not allocate
+_CHARS: tuple[Char, ...] = (Char(''),) + tuple(Char(chr(code)) for code in range(255))
+
+def _encode_CHAR(value: Char) -> int:
+    return (ord(value) + 1) if (value) else 0
+
+def _encode_BOOLEAN(value: bool) -> int:
+    return 1 if (value) else 0
+
+# datatype -> (array typecode, or None for a bytearray; value -> stored item; stored item -> value).
+# Datatypes that are not in here, and arrays holding a value that does not fit (an INTEGER over 64 bits, a CHAR
+# past U+00FE), are stored as a list of the values themselves
+_TYPED_STORAGE: dict[str, tuple[(str | None), (object | None), (object | None)]] = {
+    TokenType.INTEGER.value: ('q', None, None),
+    TokenType.REAL.value: ('d', None, None),
+    TokenType.BOOLEAN.value: (None, _encode_BOOLEAN, (False, True).__getitem__),
+    TokenType.CHAR.value: (None, _encode_CHAR, _CHARS.__getitem__),
+}
+
+class Array:
+    # Set by copy(): a counter shared by every array that shares this array's storage, which is copied by the
+    # first of them to be assigned to (unless it is the last one left); None while the storage is not shared
+    _owners: (list[int] | None) = None
+
+    def __init__(self, datatype: str, dimensions: tuple[int, ...]) -> None:
+        for size in dimensions:
+            if ((type(size) is not int) or (size < 1)):
+                raise ValueError(f'array dimension sizes must be positive INTEGERs, got {repr(size)}')
+
+        self.datatype: str = datatype
+        self.dimensions: tuple[int, ...] = dimensions
+
+        # Row-major strides, so that [i, j, ...] maps to a single offset in the flat storage
+        strides: list[int] = []
+        stride: int = 1
+        for size in reversed(dimensions):
+            strides.append(stride)
+            stride *= size
+        self.strides: tuple[int, ...] = tuple(reversed(strides))
+        self.length: int = stride
+
+        self._default: object = DEFAULT_VALUES[datatype]
+        self._coerce: object = COERCERS[datatype]
+        (self._typecode, self._encode, self._decode) = _TYPED_STORAGE.get(datatype, (None, None, None))
+
+        # Either the dense storage, or None while the array is sparse, in which case the elements that have
+        # been assigned to are kept in self._sparse, by offset
+        self._elements: (array | bytearray | list | None) = None
+        self._sparse: (dict[int, object] | None) = None
+
+        if (stride > SPARSE_THRESHOLD):
+            self._sparse = {}
+        else:
+            self._elements = self._allocate()
+
+    def _allocate(self) -> (array | bytearray | list):
+        if (self._encode is not None):
+            return bytearray(self.length)
+        if (self._typecode is not None):
+            return array(self._typecode, bytes(array(self._typecode).itemsize * self.length))
+        return [self._default] * self.length
+
+    def _generalize(self) -> None:
+        # Switches to storing the values themselves, for a value that the typed storage cannot hold
+        decode: (object | None) = self._decode
+        self._elements = [decode(item) for item in self._elements] if (decode) else list(self._elements)
+        (self._typecode, self._encode, self._decode) = (None, None, None)
+
+    def _store(self, offset: int, value: object) -> None:
+        encode: (object | None) = self._encode
+        try:
+            self._elements[offset] = encode(value) if (encode) else value
+        except (OverflowError, ValueError):
+            self._generalize()
+            self._elements[offset] = value
+
+    def _unshare(self) -> None:
+        owners: list[int] = self._owners
+        self._owners = None
+        if (owners[0] == 1):
+            return
+        owners[0] -= 1
+
+        elements: (array | bytearray | list | None) = self._elements
+        if (elements is None):
+            self._sparse = self._sparse.copy()
+        elif (type(elements) is bytearray):
+            self._elements = bytearray(memoryview(elements))
+        elif (type(elements) is array):
+            # Copied as raw bytes; passing the memoryview to array() would copy it element by element
+            self._elements = array(elements.typecode)
+            self._elements.frombytes(memoryview(elements).cast('B'))
+        else:
+            self._elements = elements[:]
+
+    def _densify(self) -> None:
+        sparse: dict[int, object] = self._sparse
+        self._elements = self._allocate()
+        self._sparse = None
+        for offset, value in sparse.items():
+            self._store(offset, value)
+
+    def _offset(self, indexes: tuple[object, ...]) -> int:
+        dimensions: tuple[int, ...] = self.dimensions
+        if (len(indexes) != len(dimensions)):
+            raise IndexError(f'expected {len(dimensions)} index(es), got {len(indexes)}')
+
+        # The common cases first; anything out of the ordinary is left for the general case to report
+        if (len(indexes) == 1):
+            index: object = indexes[0]
+            if ((type(index) is int) and (1 <= index <= dimensions[0])):
+                return index - 1
+        elif (len(indexes) == 2):
+            row, column = indexes
+            if ((type(row) is int) and (type(column) is int) and (1 <= row <= dimensions[0]) and (1 <= column <= dimensions[1])):
+                return ((row - 1) * dimensions[1]) + (column - 1)
+
+        offset: int = 0
+        for index, size, stride in zip(indexes, dimensions, self.strides):
+            if (type(index) is not int):
+                raise TypeError('array indexes must be INTEGERs')
+            if ((index < 1) or (index > size)):
+                raise IndexError(f'index {index} is out of bounds 1:{size}')
+            offset += (index - 1) * stride
+        return offset
+
+    def get(self, indexes: tuple[object, ...]) -> object:
+        offset: int = self._offset(indexes)
+        elements: (array | bytearray | list | None) = self._elements
+        if (elements is None):
+            return self._sparse.get(offset, self._default)
+        if (self._decode is None):
+            return elements[offset]
+        return self._decode(elements[offset])
+
+    def set(self, indexes: tuple[object, ...], value: object) -> None:
+        offset: int = self._offset(indexes)
+        value = self._coerce(value)
+        if (self._owners is not None):
+            self._unshare()
+
+        elements: (array | bytearray | list | None) = self._elements
+        if (elements is None):
+            self._sparse[offset] = value
+            if ((len(self._sparse) * _DENSE_FRACTION) > self.length):
+                self._densify()
+        elif (self._encode is None):
+            try:
+                elements[offset] = value
+            except OverflowError:
+                self._store(offset, value)
+        else:
+            self._store(offset, value)
+
+    def is_compatible(self, other: object) -> bool:
+        return ((type(other) is Array) and (other.datatype == self.datatype) and (other.dimensions == self.dimensions))
+
+    def copy(self) -> 'Array':
+        # Copy-on-write: the copy shares the storage until either of them is assigned to
+        owners: (list[int] | None) = self._owners
+        if (owners is None):
+            owners = self._owners = [1]
+        owners[0] += 1
+
+        duplicate: Array = Array.__new__(Array)
+        duplicate.__dict__.update(self.__dict__)
+        return duplicate
+
+    def __del__(self) -> None:
+        owners: (list[int] | None) = self._owners
+        if (owners is not None):
+            owners[0] -= 1
+
+    def __repr__(self) -> str:
+        return f"Array({self.datatype}, {list(self.dimensions)})"
@@ -0,0 +1,9 @@
+# Errors raised by the runtime and by the operations themselves while a program runs; the execution
+# backends report them as an ExecutionError pointing at the source position being executed
+RUNTIME_FAULTS: tuple[type, ...] = (TypeError, ValueError, NameError, IndexError, ZeroDivisionError, OverflowError, EOFError, RecursionError, OSError)
+
+def describe_fault(error: Exception) -> str:
+    # Python words division by zero differently depending on the operand types
+    if (isinstance(error, ZeroDivisionError)):
+        return 'division by zero'
+    return str(error)
\ No newline at end of file
@@ -0,0 +1,150 @@
+# Standard library imports
+import datetime
+
+# Local imports
+from ..token import TokenType
+from .values import Char, type_name
+
+_NUMBERS: tuple[type, ...] = (int, float)
+_TEXTS: tuple[type, ...] = (str, Char)
+_ORDERED: tuple[type, ...] = (int, float, str, Char, datetime.date)
+
+def _operand_error(symbol: str, lhs: object, rhs: object) -> TypeError:
+    return TypeError(f"unsupported operand types for '{symbol}': {type_name(lhs)} and {type_name(rhs)}")
+
+def add(lhs: object, rhs: object) -> object:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        return lhs + rhs
+    raise _operand_error(TokenType.PLUS.value, lhs, rhs)
+
+def subtract(lhs: object, rhs: object) -> object:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        return lhs - rhs
+    raise _operand_error(TokenType.HYPHEN.value, lhs, rhs)
+
+def multiply(lhs: object, rhs: object) -> object:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        return lhs * rhs
+    raise _operand_error(TokenType.ASTERISK.value, lhs, rhs)
+
+def divide(lhs: object, rhs: object) -> float:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        if (rhs == 0):
+            raise ZeroDivisionError('division by zero')
+        return lhs / rhs
+    raise _operand_error(TokenType.FORWARD_SLASH.value, lhs, rhs)
+
+def int_divide(lhs: object, rhs: object) -> int:
+    if ((type(lhs) is int) and (type(rhs) is int)):
+        if (rhs == 0):
+            raise ZeroDivisionError('division by zero')
+        return lhs // rhs
+    raise _operand_error(TokenType.INT_DIV.value, lhs, rhs)
+
+def modulus(lhs: object, rhs: object) -> object:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        if (rhs == 0):
+            raise ZeroDivisionError('division by zero')
+        return lhs % rhs
+    raise _operand_error(TokenType.MODULUS.value, lhs, rhs)
+
+def power(lhs: object, rhs: object) -> object:
+    if ((type(lhs) in _NUMBERS) and (type(rhs) in _NUMBERS)):
+        if ((lhs == 0) and (rhs < 0)):
+            raise ZeroDivisionError('division by zero')
+        result: object = lhs ** rhs
+        if (type(result) is complex):
+            raise ValueError(f'{lhs} ^ {rhs} is not a real number')
+        return result
+    raise _operand_error(TokenType.CARET.value, lhs, rhs)
+
+def concatenate(lhs: object, rhs: object) -> str:
+    if ((type(lhs) in _TEXTS) and (type(rhs) in _TEXTS)):
+        return str.__add__(lhs, rhs)
+    raise _operand_error(TokenType.AMPERSAND.value, lhs, rhs)
+
+def _check_compared(symbol: str, lhs: object, rhs: object, types: (tuple[type, ...] | None)) -> None:
+    # Values of different datatypes can only be compared if both are numbers, or both are text;
+    # values of the same datatype, if it is one of the given types (or any datatype, without any)
+    lhs_type: type = type(lhs)
+    rhs_type: type = type(rhs)
+    if ((lhs_type in _NUMBERS) and (rhs_type in _NUMBERS)):
+        return
+    if ((lhs_type in _TEXTS) and (rhs_type in _TEXTS)):
+        return
+    if ((lhs_type is rhs_type) and ((types is None) or (lhs_type in types))):
+        return
+    raise _operand_error(symbol, lhs, rhs)
+
+def equals_to(lhs: object, rhs: object) -> bool:
+    _check_compared(TokenType.EQUALS_TO.value, lhs, rhs, None)
+    return (lhs == rhs)
+
+def not_equals_to(lhs: object, rhs: object) -> bool:
+    _check_compared(TokenType.NOT_EQUALS_TO.value, lhs, rhs, None)
+    return (lhs != rhs)
+
+def _check_ordered(symbol: str, lhs: object, rhs: object) -> None:
+    _check_compared(symbol, lhs, rhs, _ORDERED)
+
+def lesser_than(lhs: object, rhs: object) -> bool:
+    _check_ordered(TokenType.L_ANGLE_BRACKET.value, lhs, rhs)
+    return (lhs < rhs)
+
+def lesser_or_equals_to(lhs: object, rhs: object) -> bool:
+    _check_ordered(TokenType.LESSER_OR_EQUALS_TO.value, lhs, rhs)
+    return (lhs <= rhs)
+
+def greater_than(lhs: object, rhs: object) -> bool:
+    _check_ordered(TokenType.R_ANGLE_BRACKET.value, lhs, rhs)
+    return (lhs > rhs)
+
+def greater_or_equals_to(lhs: object, rhs: object) -> bool:
+    _check_ordered(TokenType.GREATER_OR_EQUALS_TO.value, lhs, rhs)
+    return (lhs >= rhs)
+
+def logical_and(lhs: object, rhs: object) -> bool:
+    if ((type(lhs) is bool) and (type(rhs) is bool)):
+        return (lhs and rhs)
+    raise _operand_error(TokenType.AND.value, lhs, rhs)
+
+def logical_or(lhs: object, rhs: object) -> bool:
+    if ((type(lhs) is bool) and (type(rhs) is bool)):
+        return (lhs or rhs)
+    raise _operand_error(TokenType.OR.value, lhs, rhs)
+
+def negate(operand: object) -> object:
+    if (type(operand) in _NUMBERS):
+        return -operand
+    raise TypeError(f"unsupported operand type for '{TokenType.HYPHEN.value}': {type_name(operand)}")
+
+def logical_not(operand: object) -> bool:
+    if (type(operand) is bool):
+        return (not operand)
+    raise TypeError(f"unsupported operand type for '{TokenType.NOT.value}': {type_name(operand)}")
+
+BINARY_OPERATORS: dict[TokenType, object] = {
+    TokenType.PLUS: add,
+    TokenType.HYPHEN: subtract,
+    TokenType.ASTERISK: multiply,
+    TokenType.FORWARD_SLASH: divide,
+    TokenType.INT_DIV: int_divide,
+    TokenType.MODULUS: modulus,
+    TokenType.CARET: power,
+    TokenType.AMPERSAND: concatenate,
+
+    TokenType.EQUALS_TO: equals_to,
+    TokenType.NOT_EQUALS_TO: not_equals_to,
+    TokenType.L_ANGLE_BRACKET: lesser_than,
+    TokenType.LESSER_OR_EQUALS_TO: lesser_or_equals_to,
+    TokenType.R_ANGLE_BRACKET: greater_than,
+    TokenType.GREATER_OR_EQUALS_TO: greater_or_equals_to,
+
+    TokenType.AND: logical_and,
+    TokenType.OR: logical_or,
+}
+
+UNARY_OPERATORS: dict[TokenType, object] = {
+    TokenType.HYPHEN: negate,
+    TokenType.NOT: logical_not,
+}
\ No newline at end of file
@@ -0,0 +1,120 @@
+# Standard library imports
+import struct
+import datetime
+
+# Local imports
+from ..token import TokenType
+from .values import Char, DEFAULT_VALUES, COERCERS, type_name
+
+# The most bytes (of UTF-8) that a STRING field of a record can take up in a RANDOM file
+RECORD_STRING_SIZE: int = 255
+
+_DATE_ORIGIN: int = datetime.date.min.toordinal()
+
+def _encode_CHAR(value: Char) -> int:
+    return (ord(value) + 1) if (value) else 0
+
+def _decode_CHAR(item: int) -> Char:
+    return Char(chr(item - 1)) if (item) else Char('')
+
+def _encode_STRING(value: str) -> bytes:
+    encoded: bytes = value.encode('utf-8')
+    if (len(encoded) > RECORD_STRING_SIZE):
+        raise ValueError(f"a STRING field of a record takes at most {RECORD_STRING_SIZE} bytes, got {len(encoded)}")
+    return encoded
+
+def _decode_STRING(item: bytes) -> str:
+    return item.decode('utf-8')
+
+def _encode_DATE(value: datetime.date) -> int:
+    return value.toordinal() - _DATE_ORIGIN
+
+def _decode_DATE(item: int) -> datetime.date:
+    return datetime.date.fromordinal(item + _DATE_ORIGIN)
+
+# datatype -> (struct format; value -> stored item, or None if it is stored as it is; stored item -> value).
+# Every field takes the same number of bytes in every record, and a field of zero bytes is the default value
+# of its datatype, so that the records that a file is extended by before one that is put past its end are
+# records of default values
+_RECORD_FIELDS: dict[str, tuple[str, (object | None), (object | None)]] = {
+    TokenType.INTEGER.value: ('q', None, None),
+    TokenType.REAL.value: ('d', None, None),
+    TokenType.BOOLEAN.value: ('?', None, None),
+    TokenType.CHAR.value: ('I', _encode_CHAR, _decode_CHAR),
+    TokenType.STRING.value: (f'{RECORD_STRING_SIZE + 1}p', _encode_STRING, _decode_STRING),
+    TokenType.DATE.value: ('i', _encode_DATE, _decode_DATE),
+}
+
+class RecordType:
+    # A type defined by TYPE ... ENDTYPE: the identifier and datatype of every field, in the order of the
+    # definition, which is also the order they are laid out in a RANDOM file
+    def __init__(self, name: str, fields: tuple[tuple[str, str], ...]) -> None:
+        self.name: str = name
+        self.fields: tuple[tuple[str, str], ...] = fields
+        self.indexes: dict[str, int] = {field: index for index, (field, _) in enumerate(fields)}
+
+        self._defaults: list[object] = [DEFAULT_VALUES[datatype] for _, datatype in fields]
+        self.coercers: list[object] = [COERCERS[datatype] for _, datatype in fields]
+
+        # Little-endian and unpadded, so that a file has the same layout wherever it is written
+        self.layout: struct.Struct = struct.Struct('<' + ''.join(_RECORD_FIELDS[datatype][0] for _, datatype in fields))
+        self.size: int = self.layout.size
+        self._encoders: tuple[tuple[int, object], ...] = tuple((index, _RECORD_FIELDS[datatype][1]) for index, (_, datatype) in enumerate(fields) if (_RECORD_FIELDS[datatype][1]))
+        self._decoders: tuple[tuple[int, object], ...] = tuple((index, _RECORD_FIELDS[datatype][2]) for index, (_, datatype) in enumerate(fields) if (_RECORD_FIELDS[datatype][2]))
+
+    def new(self) -> 'Record':
+        return Record(self, self._defaults.copy())
+
+    def coerce(self, value: object) -> 'Record':
+        if ((type(value) is not Record) or (value.record_type is not self)):
+            raise TypeError(f'expected {self.name}, got {type_name(value)}')
+        return value.copy()
+
+    def field_index(self, field: str) -> int:
+        index: (int | None) = self.indexes.get(field)
+        if (index is None):
+            raise NameError(f"{self.name} has no field {repr(field)}")
+        return index
+
+    def pack_into(self, buffer: object, offset: int, record: 'Record') -> None:
+        values: list[object] = record.values
+        if (self._encoders):
+            values = values.copy()
+            for index, encode in self._encoders:
+                values[index] = encode(values[index])
+        try:
+            self.layout.pack_into(buffer, offset, *values)
+        except struct.error:
+            raise OverflowError('an INTEGER field of a record must fit in 64 bits')
+
+    def unpack_from(self, buffer: object, offset: int) -> list[object]:
+        values: list[object] = list(self.layout.unpack_from(buffer, offset))
+        for index, decode in self._decoders:
+            values[index] = decode(values[index])
+        return values
+
+    def __repr__(self) -> str:
+        return self.name
+
+class Record:
+    __slots__ = ('record_type', 'values')
+
+    def __init__(self, record_type: RecordType, values: list[object]) -> None:
+        self.record_type: RecordType = record_type
+
+        # The value of every field, in the order of record_type.fields
+        self.values: list[object] = values
+
+    def copy(self) -> 'Record':
+        # Records are small, so assigning one copies it straight away
+        return Record(self.record_type, self.values.copy())
+
+    def get(self, field: str) -> object:
+        return self.values[self.record_type.field_index(field)]
+
+    def set(self, field: str, value: object) -> None:
+        index: int = self.record_type.field_index(field)
+        self.values[index] = self.record_type.coercers[index](value)
+
+    def __repr__(self) -> str:
+        return self.record_type.name
@@ -0,0 +1,153 @@
+# Standard library imports
+import datetime
+
+# Local imports
+from ..token import Token, TokenType
+
+class Char(str):
+    # CHAR values are kept apart from STRING values so that the datatype of an
+    # implicitly declared variable can be detected from the value assigned to it
+    __slots__ = ()
+
+DATATYPES: tuple[str, ...] = (
+    TokenType.INTEGER.value,
+    TokenType.REAL.value,
+    TokenType.CHAR.value,
+    TokenType.STRING.value,
+    TokenType.BOOLEAN.value,
+    TokenType.DATE.value,
+)
+
+DEFAULT_VALUES: dict[str, object] = {
+    TokenType.INTEGER.value: 0,
+    TokenType.REAL.value: 0.0,
+    TokenType.CHAR.value: Char(''),
+    TokenType.STRING.value: '',
+    TokenType.BOOLEAN.value: False,
+    TokenType.DATE.value: datetime.date.min,
+}
+
+def type_name(value: object) -> str:
+    value_type: type = type(value)
+    if (value_type is int):
+        return TokenType.INTEGER.value
+    if (value_type is float):
+        return TokenType.REAL.value
+    if (value_type is Char):
+        return TokenType.CHAR.value
+    if (value_type is str):
+        return TokenType.STRING.value
+    if (value_type is bool):
+        return TokenType.BOOLEAN.value
+    if (value_type is datetime.date):
+        return TokenType.DATE.value
+    # A Record (defined in records.py, which builds on this module) is of the type it was declared as
+    record_type: (object | None) = getattr(value, 'record_type', None)
+    if (record_type is not None):
+        return record_type.name
+    return TokenType.ARRAY.value
+
+def parse_date(text: str) -> datetime.date:
+    dd, mm, yyyy = text.split('/')
+    return datetime.date(int(yyyy), int(mm), int(dd))
+
+def format_date(date: datetime.date) -> str:
+    return f'{date.day:02}/{date.month:02}/{date.year:04}'
+
+def literal_value(token: Token) -> object:
+    match(token.type):
+        case TokenType.INTEGER:
+            return int(token.literal)
+        case TokenType.REAL:
+            return float(token.literal)
+        case TokenType.CHAR:
+            return Char(token.literal)
+        case TokenType.STRING:
+            return token.literal
+        case TokenType.BOOLEAN:
+            return (token.literal == 'TRUE')
+        case TokenType.DATE:
+            return parse_date(token.literal)
+    raise ValueError(f'{repr(token.literal)} is not a literal')
+
+def _coerce_INTEGER(value: object) -> int:
+    if (type(value) is int):
+        return value
+    raise TypeError(f'expected INTEGER, got {type_name(value)}')
+
+def _coerce_REAL(value: object) -> float:
+    value_type: type = type(value)
+    if (value_type is float):
+        return value
+    if (value_type is int):
+        return float(value)
+    raise TypeError(f'expected REAL, got {type_name(value)}')
+
+def _coerce_CHAR(value: object) -> Char:
+    if (type(value) is Char):
+        return value
+    if ((type(value) is str) and (len(value) == 1)):
+        return Char(value)
+    raise TypeError(f'expected CHAR, got {type_name(value)}')
+
+def _coerce_STRING(value: object) -> str:
+    if (type(value) is str):
+        return value
+    if (type(value) is Char):
+        return str(value)
+    raise TypeError(f'expected STRING, got {type_name(value)}')
+
+def _coerce_BOOLEAN(value: object) -> bool:
+    if (type(value) is bool):
+        return value
+    raise TypeError(f'expected BOOLEAN, got {type_name(value)}')
+
+def _coerce_DATE(value: object) -> datetime.date:
+    if (type(value) is datetime.date):
+        return value
+    raise TypeError(f'expected DATE, got {type_name(value)}')
+
+COERCERS: dict[str, object] = {
+    TokenType.INTEGER.value: _coerce_INTEGER,
+    TokenType.REAL.value: _coerce_REAL,
+    TokenType.CHAR.value: _coerce_CHAR,
+    TokenType.STRING.value: _coerce_STRING,
+    TokenType.BOOLEAN.value: _coerce_BOOLEAN,
+    TokenType.DATE.value: _coerce_DATE,
+}
+
+def coerce(value: object, datatype: str) -> object:
+    return COERCERS[datatype](value)
+
+def format_value(value: object) -> str:
+    value_type: type = type(value)
+    if (value_type is str):
+        return value
+    if (value_type is bool):
+        return 'TRUE' if (value) else 'FALSE'
+    if (value_type is datetime.date):
+        return format_date(value)
+    if ((value_type is int) or (value_type is float) or (value_type is Char)):
+        return str(value)
+    raise TypeError(f'a value of type {type_name(value)} cannot be output')
+
+def parse_input(text: str, datatype: str) -> object:
+    try:
+        match(datatype):
+            case TokenType.INTEGER.value:
+                return int(text)
+            case TokenType.REAL.value:
+                return float(text)
+            case TokenType.CHAR.value:
+                if (len(text) == 1):
+                    return Char(text)
+            case TokenType.STRING.value:
+                return text
+            case TokenType.BOOLEAN.value:
+                if ((text == 'TRUE') or (text == 'FALSE')):
+                    return (text == 'TRUE')
+            case TokenType.DATE.value:
+                return parse_date(text)
+    except ValueError:
+        pass
+    raise ValueError(f'{repr(text)} is not a valid {datatype}')
\ No newline at end of file
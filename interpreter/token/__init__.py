@@ -1 +1,2 @@
-from .token import *
\ No newline at end of file
+from .token import *
+from .token_stream import *
\ No newline at end of file
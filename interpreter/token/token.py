@@ -59,8 +59,9 @@ class TokenType(enum.Enum):
     ENDPROCEDURE = 'ENDPROCEDURE'
     CALL = 'CALL'
     
-    # Making a parameter pass by reference in a procedure
+    # Making a parameter pass by reference or by value in a procedure
     BYREF = 'BYREF'
+    BYVAL = 'BYVAL'
     
     # Function definition and returning
     FUNCTION = 'FUNCTION'
@@ -82,9 +83,14 @@ class TokenType(enum.Enum):
     OPENFILE = 'OPENFILE'
     READFILE = 'READFILE'
     WRITEFILE = 'WRITEFILE'
+    CLOSEFILE = 'CLOSEFILE'
     READ = 'READ'
     WRITE = 'WRITE'
     APPEND = 'APPEND'
+    RANDOM = 'RANDOM'
+    SEEK = 'SEEK'
+    GETRECORD = 'GETRECORD'
+    PUTRECORD = 'PUTRECORD'
     
     # OOP
     PUBLIC = 'PUBLIC'
@@ -131,9 +137,22 @@ class TokenType(enum.Enum):
     
     COMMA = ','
 
+# Every token type as a small integer "kind", so that it can index tables and be stored in a byte array. A
+# TokenType hashes in Python code, which is slow enough to show in the parser; its kind is an attribute of its
+# own, and of every Token
+TOKEN_TYPES: tuple[TokenType, ...] = tuple(TokenType)
+TOKEN_KINDS: dict[TokenType, int] = {token_type: kind for kind, token_type in enumerate(TOKEN_TYPES)}
+for token_type, kind in TOKEN_KINDS.items():
+    token_type.kind = kind
+del token_type, kind
+
 class Token:
+    # is_literal is only ever set (to True) on literals, and is tested for with hasattr()
+    __slots__ = ('type', 'kind', 'literal', 'line', 'column', 'is_literal')
+    
     def __init__(self, type: TokenType, literal: str, line: int, column: int) -> None:
         self.type: TokenType = type
+        self.kind: int = type.kind
         self.literal: str = literal
         
         self.line, self.column = line, column
@@ -0,0 +1,70 @@
+# Standard library imports
+import sys
+from array import array
+
+# Local imports
+from ..errors import PseudocodeError
+from .token import Token, TokenType, TOKEN_TYPES, TOKEN_KINDS
+
+_STRING_KIND: int = TOKEN_KINDS[TokenType.STRING]
+_CHAR_KIND: int = TOKEN_KINDS[TokenType.CHAR]
+_DATE_KIND: int = TOKEN_KINDS[TokenType.DATE]
+_EOF_KIND: int = TOKEN_KINDS[TokenType.EOF]
+_IDENTIFIER_KIND: int = TOKEN_KINDS[TokenType.IDENTIFIER]
+
+class TokenStream:
+    # The tokens of a source as parallel columns of machine integers, instead of one Token object per token.
+    # Literals are not stored; they are sliced out of the source when a token is materialized
+    def __init__(self, source: str, first_line: int = 1) -> None:
+        self.source: str = source
+
+        # Line number of the first line of the source, for sources that are a slice of a larger input
+        self.first_line: int = first_line
+
+        self.kinds: array = array('B')
+        self.starts: array = array('I')
+        self.ends: array = array('I')
+        self.lines: array = array('I')
+        self.literal_flags: array = array('B')
+
+        # Offset of the first character of every line, from which token columns are derived
+        self.line_starts: array = array('I', [0])
+
+        # The error that stopped lexing, raised once a reader gets past the last token before it
+        self.error: (PseudocodeError | None) = None
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def column(self, index: int) -> int:
+        return self.starts[index] - self.line_starts[self.lines[index] - self.first_line] + 1
+
+    def literal(self, index: int) -> str:
+        kind: int = self.kinds[index]
+        start: int = self.starts[index]
+        end: int = self.ends[index]
+
+        # The STRING, CHAR and DATE datatype keywords share their token types with the literals
+        if (self.literal_flags[index]):
+            if ((kind == _STRING_KIND) or (kind == _CHAR_KIND)):
+                return self.source[(start + 1) : (end - 1)].replace('\\', '')
+            if (kind == _DATE_KIND):
+                return self.source[(start + 2) : (end - 1)].replace('\\', '')
+        if (kind == _EOF_KIND):
+            return TokenType.EOF.value
+        if (kind == _IDENTIFIER_KIND):
+            # Interned, so that every use of a name is the same string, which hashes and compares by identity
+            return sys.intern(self.source[start:end])
+        return self.source[start:end]
+
+    def token(self, index: int) -> Token:
+        token: Token = Token(TOKEN_TYPES[self.kinds[index]], self.literal(index), self.lines[index], self.column(index))
+        if (self.literal_flags[index]):
+            token.is_literal = True
+        return token
+
+    def tokens(self) -> list[Token]:
+        return [self.token(index) for index in range(len(self))]
\ No newline at end of file
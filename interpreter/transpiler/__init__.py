@@ -0,0 +1 @@
+from .transpiler import *
\ No newline at end of file
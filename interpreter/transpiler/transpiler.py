@@ -0,0 +1,627 @@
+# Standard library imports
+import re
+import dis
+import sys
+import contextlib
+import types
+from typing import TextIO
+
+# Local imports
+from ..token import Token, TokenType
+from ..errors import CompilerError, ExecutionError
+from ..console import Console
+from ..files import FileTable, FILE_MODES
+from ..parser.ast import ParsedProgram, statements, expressions
+from ..compiler import first_token, flatten_concatenation, nesting_error, BUILTIN_EOF
+from ..resolver import Resolver
+from ..runtime import Array, COERCERS, DATATYPES, BINARY_OPERATORS, UNARY_OPERATORS, RUNTIME_FAULTS
+from ..runtime import literal_value, type_name, format_value, parse_input, describe_fault
+from ..vm import Scope
+
+# Filename given to the generated code, used to find its frames in a traceback
+GENERATED_FILENAME: str = '<pseudocode>'
+
+_NUMERIC: tuple[str, ...] = (TokenType.INTEGER.value, TokenType.REAL.value)
+_TEXT: tuple[str, ...] = (TokenType.CHAR.value, TokenType.STRING.value)
+
+# Operators that map onto a Python operator once the datatypes of both operands are known to suit it
+_NATIVE_ARITHMETIC: dict[TokenType, str] = {
+    TokenType.PLUS: '+',
+    TokenType.HYPHEN: '-',
+    TokenType.ASTERISK: '*',
+    TokenType.MODULUS: '%',
+}
+_NATIVE_COMPARISON: dict[TokenType, str] = {
+    TokenType.L_ANGLE_BRACKET: '<',
+    TokenType.LESSER_OR_EQUALS_TO: '<=',
+    TokenType.R_ANGLE_BRACKET: '>',
+    TokenType.GREATER_OR_EQUALS_TO: '>=',
+}
+_NATIVE_LOGICAL: dict[TokenType, str] = {
+    # Bitwise operators, since both operands are always evaluated
+    TokenType.AND: '&',
+    TokenType.OR: '|',
+}
+
+# The statements that bind a value to their identifier, and so can be the first to mention a variable
+_BINDING_STATEMENTS: tuple[type, ...] = (statements.DECLARE, statements.DECLARE_ARRAY, statements.CONSTANT, statements.ASSIGNMENT, statements.INPUT, statements.READFILE)
+
+# Marks the part of a generated line that an expression was lowered into: '\x02' <index of its token> '\x03'
+# <source> '\x04'. The markers are taken out before the line is emitted, leaving the span it covers behind
+_MARKER: re.Pattern = re.compile('\x02(\\d+)\x03|\x04')
+
+class TranspiledProgram:
+    def __init__(self, source: str, code: types.CodeType, line_map: list[tuple[int, int]], spans: list[list[tuple[int, int, int, int]]], constants: dict[str, object], identifiers: dict[str, str], declarations: dict[str, tuple[int, int]], scope_names: list[str]) -> None:
+        self.source: str = source
+        self.code: types.CodeType = code
+
+        # Values of the CHAR and DATE literals, which the generated code refers to by name
+        self.constants: dict[str, object] = constants
+
+        # (line, column) of the pseudocode that each line of the generated source was lowered from,
+        # indexed by (generated line number - 1)
+        self.line_map: list[tuple[int, int]] = line_map
+
+        # (start, end, line, column) of the expressions on each line of the generated source, where start and end
+        # are the (UTF-8) column offsets of the Python code they were lowered into, and (line, column) is where
+        # the virtual machine reports their faults
+        self.spans: list[list[tuple[int, int, int, int]]] = spans
+
+        # Generated Python name -> pseudocode identifier
+        self._identifiers: dict[str, str] = identifiers
+
+        # (line, column) of the DECLARE statement of every variable (that is not kept in the scope) declared by one
+        self._declarations: dict[str, tuple[int, int]] = declarations
+
+        # The variables whose datatype depends on the path taken through the program, which are kept in a Scope
+        # (as they are by the virtual machine) instead of in Python variables
+        self.scope_names: list[str] = scope_names
+
+    def _describe_fault(self, error: Exception, generated: (types.TracebackType | None), position: tuple[int, int]) -> str:
+        if (isinstance(error, NameError) and (generated is not None)):
+            # The name is not given by every kind of NameError, so it is taken from the instruction that raised it
+            name: (object | None) = None
+            for instruction in dis.get_instructions(generated.tb_frame.f_code):
+                if (instruction.offset == generated.tb_lasti):
+                    name = instruction.argval
+                    break
+            if (name in self._identifiers):
+                identifier: str = self._identifiers[name]
+                declaration: (tuple[int, int] | None) = self._declarations.get(identifier)
+                if ((declaration is not None) and (declaration < position)):
+                    return f"{repr(identifier)} is used before being assigned a value"
+                return f"{repr(identifier)} is not declared"
+        return describe_fault(error)
+
+    def _position(self, generated: (types.TracebackType | None)) -> tuple[int, int]:
+        if (generated is None):
+            return (0, 0)
+
+        # The smallest expression that the failing instruction is part of, if any; otherwise the statement
+        line: int = generated.tb_lineno
+        _, _, start, end = list(generated.tb_frame.f_code.co_positions())[generated.tb_lasti // 2]
+        position: tuple[int, int] = self.line_map[line - 1]
+        if ((start is not None) and (end is not None)):
+            width: int = -1
+            for span_start, span_end, span_line, span_column in self.spans[line - 1]:
+                if ((span_start <= start) and (end <= span_end) and ((width < 0) or (span_end - span_start < width))):
+                    position = (span_line, span_column)
+                    width = span_end - span_start
+        return position
+
+    def run(self, input_stream: TextIO = sys.stdin, output_stream: TextIO = sys.stdout, interactive: (bool | None) = None) -> None:
+        console: Console = Console(input_stream, output_stream, interactive)
+        files: FileTable = FileTable()
+        namespace: dict[str, object] = _runtime_namespace(console, files)
+        namespace.update(self.constants)
+        namespace['_scope'] = Scope(self.scope_names)
+        exec(self.code, namespace)
+        try:
+            namespace['__program__']()
+            files.close_all()
+        except RUNTIME_FAULTS as error:
+            # The innermost frame that belongs to the generated code
+            generated: (types.TracebackType | None) = None
+            traceback: (types.TracebackType | None) = error.__traceback__
+            while (traceback is not None):
+                if (traceback.tb_frame.f_code.co_filename == GENERATED_FILENAME):
+                    generated = traceback
+                traceback = traceback.tb_next
+            line, column = position = self._position(generated)
+            raise ExecutionError(f"line {line}, col {column}; {self._describe_fault(error, generated, position)}") from None
+        finally:
+            with contextlib.suppress(OSError):
+                files.close_all()
+            console.flush()
+
+class Transpiler:
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+        self._line_map: list[tuple[int, int]] = []
+        self._spans: list[list[tuple[int, int, int, int]]] = []
+        self._indentation: int = 0
+
+        # The token of every marked expression, by the index in its marker
+        self._marked: list[Token] = []
+
+        # Statically known datatype of every identifier seen so far, in program order;
+        # None marks a variable whose datatype is only known at runtime
+        self._datatypes: dict[str, (str | None)] = {}
+        self._array_datatypes: dict[str, (str | None)] = {}
+        self._constants: set[str] = set()
+        self._declarations: dict[str, tuple[int, int]] = {}
+
+        self._identifiers: dict[str, str] = {}
+        self._python_names: dict[str, str] = {}
+
+        self._constant_names: dict[tuple[type, object], str] = {}
+
+        # Slot (in the runtime Scope) of every variable that is first bound inside an IF or a WHILE, or that is
+        # declared again: whether they are bound, and with what datatype, depends on the path taken
+        self._slots: dict[str, int] = {}
+
+    def _emit(self, line: str, token: (Token | None)) -> None:
+        line = ('    ' * self._indentation) + line
+        spans: list[tuple[int, int, int, int]] = []
+        if ('\x02' in line):
+            line, spans = self._unmark(line)
+        self._lines.append(line)
+        self._line_map.append((token.line, token.column) if (token) else (0, 0))
+        self._spans.append(spans)
+
+    def _mark(self, source: str, token: Token) -> str:
+        # Faults raised by the expression are reported at the token, as they are by the virtual machine
+        self._marked.append(token)
+        return f'\x02{len(self._marked) - 1}\x03{source}\x04'
+
+    def _unmark(self, line: str) -> tuple[str, list[tuple[int, int, int, int]]]:
+        pieces: list[str] = []
+        spans: list[tuple[int, int, int, int]] = []
+        opened: list[tuple[int, Token]] = []
+        offset: int = 0
+        position: int = 0
+        for match in _MARKER.finditer(line):
+            piece: str = line[position:match.start()]
+            pieces.append(piece)
+            # Python reports the columns of instructions in UTF-8 bytes
+            offset += len(piece.encode())
+            if (match.group(1) is None):
+                start, token = opened.pop()
+                spans.append((start, offset, token.line, token.column))
+            else:
+                opened.append((offset, self._marked[int(match.group(1))]))
+            position = match.end()
+        pieces.append(line[position:])
+        return (''.join(pieces), spans)
+
+    def _find_path_dependent(self, block: list[statements.Statement], nested: bool, bound: set[str]) -> None:
+        # Gives a slot to every variable whose first binding (in program order) is inside an IF or a WHILE, since
+        # it might not have run, or might run again, when a later statement uses the variable; and to every
+        # variable that is declared again (or made a constant), which unbinds its value or changes what it takes
+        for statement in block:
+            if (type(statement) in _BINDING_STATEMENTS):
+                identifier: str = statement.identifier.literal
+                if (identifier not in bound):
+                    bound.add(identifier)
+                    if (nested):
+                        self._slots[identifier] = len(self._slots)
+                elif (isinstance(statement, (statements.DECLARE, statements.CONSTANT)) and (identifier not in self._slots)):
+                    self._slots[identifier] = len(self._slots)
+            match(statement):
+                case statements.IF():
+                    for _, nested_block in statement.branches:
+                        self._find_path_dependent(nested_block, True, bound)
+                case statements.WHILE():
+                    self._find_path_dependent(statement.statements, True, bound)
+
+    def _load(self, identifier: Token) -> str:
+        slot: (int | None) = self._slots.get(identifier.literal)
+        if (slot is not None):
+            return f'_scope.load({slot})'
+        return self._python_name(identifier.literal)
+
+    def _python_name(self, identifier: str) -> str:
+        python_name: (str | None) = self._python_names.get(identifier)
+        if (python_name is None):
+            python_name = 'v_' + identifier
+            if ((not python_name.isidentifier()) or (python_name in self._identifiers)):
+                python_name = f'v{len(self._identifiers)}'
+            self._python_names[identifier] = python_name
+            self._identifiers[python_name] = identifier
+        return python_name
+
+    def _literal(self, token: Token) -> tuple[str, str]:
+        try:
+            value: object = literal_value(token)
+        except ValueError:
+            raise CompilerError(f"line {token.line}, col {token.column}; invalid {token.type.value} literal {repr(token.literal)}")
+
+        if (type(value) in (int, float, str, bool)):
+            return (repr(value), token.type.value)
+
+        # CHAR and DATE literals are not Python literals, so they are built once and looked up as globals
+        key: tuple[type, object] = (type(value), value)
+        name: (str | None) = self._constant_names.get(key)
+        if (name is None):
+            name = self._constant_names[key] = f'_k{len(self._constant_names)}'
+        return (name, token.type.value)
+
+    def _expression(self, expression: expressions.Expression) -> tuple[str, (str | None)]:
+        # Lowers an expression to Python source, along with its statically known datatype (if any)
+        match(expression):
+            case expressions.Atom():
+                token: Token = expression.token
+                if (token.type == TokenType.IDENTIFIER):
+                    return (self._mark(self._load(token), token), self._datatypes.get(token.literal))
+                return self._literal(token)
+
+            case expressions.PrefixOperator():
+                operand, datatype = self._expression(expression.operand)
+                operator: Token = expression.operator
+                match(operator.type):
+                    case TokenType.HYPHEN:
+                        if (datatype in _NUMERIC):
+                            return (self._mark(f'(-{operand})', operator), datatype)
+                    case TokenType.NOT:
+                        if (datatype == TokenType.BOOLEAN.value):
+                            return (f'(not {operand})', datatype)
+                return (self._mark(f'_unary_{operator.type.name}({operand})', operator), TokenType.BOOLEAN.value if (operator.type == TokenType.NOT) else None)
+
+            case expressions.InfixOperator():
+                return self._infix(expression)
+
+            case expressions.ArrayIndexing():
+                token: Token = expression.identifier.token
+                array: str = self._mark(self._load(token), token)
+                indexes: str = ''.join(self._expression(index)[0] + ', ' for index in expression.indexes)
+                if (self._datatypes.get(token.literal) == TokenType.ARRAY.value):
+                    return (self._mark(f'{array}.get(({indexes}))', token), self._array_datatypes.get(token.literal))
+                return (self._mark(f'_load_index({array}, ({indexes}))', token), None)
+
+            case expressions.FunctionCall():
+                token: Token = expression.identifier.token
+                if (token.literal == BUILTIN_EOF):
+                    if (len(expression.arguments) != 1):
+                        raise CompilerError(f"line {token.line}, col {token.column}; {repr(token.literal)} takes 1 argument(s), got {len(expression.arguments)}")
+                    return (self._mark(f'_file_eof({self._expression(expression.arguments[0])[0]})', token), TokenType.BOOLEAN.value)
+                raise CompilerError(f"line {token.line}, col {token.column}; subroutines are not supported by the transpiler yet")
+
+            case expressions.CommonSubexpression():
+                # Every occurrence is evaluated where it is, as it was written
+                return self._expression(expression.expression)
+
+        raise CompilerError(f"unsupported expression {str(expression)}")
+
+    def _infix(self, expression: expressions.InfixOperator) -> tuple[str, (str | None)]:
+        token: Token = expression.operator
+        operator: TokenType = token.type
+        if (operator not in BINARY_OPERATORS):
+            raise CompilerError(f"line {token.line}, col {token.column}; the {repr(token.literal)} operator is not supported yet")
+
+        if (operator == TokenType.AMPERSAND):
+            operands, operators = flatten_concatenation(expression)
+            if (len(operands) > 2):
+                lowered: list[tuple[str, (str | None)]] = [self._expression(operand) for operand in operands]
+                if (all((datatype in _TEXT) for _, datatype in lowered)):
+                    # None of the operations can fail, so the chain is joined in one go
+                    return (f"''.join(({', '.join(value for value, _ in lowered)}))", TokenType.STRING.value)
+
+                # Otherwise every operation is checked in turn, as it is when the chain is not flattened
+                value, datatype = lowered[0]
+                for (rhs, rhs_datatype), ampersand in zip(lowered[1:], operators):
+                    value = f'({value} + {rhs})' if ((datatype in _TEXT) and (rhs_datatype in _TEXT)) else self._mark(f'_binary_AMPERSAND({value}, {rhs})', ampersand)
+                    datatype = TokenType.STRING.value
+                return (value, datatype)
+
+        lhs, lhs_datatype = self._expression(expression.lhs)
+        rhs, rhs_datatype = self._expression(expression.rhs)
+
+        numeric: bool = ((lhs_datatype in _NUMERIC) and (rhs_datatype in _NUMERIC))
+        integral: bool = (lhs_datatype == rhs_datatype == TokenType.INTEGER.value)
+
+        if (numeric and (operator in _NATIVE_ARITHMETIC)):
+            return (self._mark(f'({lhs} {_NATIVE_ARITHMETIC[operator]} {rhs})', token), TokenType.INTEGER.value if (integral) else TokenType.REAL.value)
+        if (numeric and (operator == TokenType.FORWARD_SLASH)):
+            return (self._mark(f'({lhs} / {rhs})', token), TokenType.REAL.value)
+        if (integral and (operator == TokenType.INT_DIV)):
+            return (self._mark(f'({lhs} // {rhs})', token), TokenType.INTEGER.value)
+        if ((lhs_datatype in _TEXT) and (rhs_datatype in _TEXT) and (operator == TokenType.AMPERSAND)):
+            return (f'({lhs} + {rhs})', TokenType.STRING.value)
+        comparable: bool = (numeric or ((lhs_datatype in _TEXT) and (rhs_datatype in _TEXT)))
+        if (operator in (TokenType.EQUALS_TO, TokenType.NOT_EQUALS_TO)):
+            if (comparable or ((lhs_datatype is not None) and (lhs_datatype == rhs_datatype))):
+                return (f"({lhs} {'==' if (operator == TokenType.EQUALS_TO) else '!='} {rhs})", TokenType.BOOLEAN.value)
+            return (self._mark(f'_binary_{operator.name}({lhs}, {rhs})', token), TokenType.BOOLEAN.value)
+        if (operator in _NATIVE_COMPARISON):
+            if (comparable or (lhs_datatype == rhs_datatype == TokenType.DATE.value)):
+                return (f'({lhs} {_NATIVE_COMPARISON[operator]} {rhs})', TokenType.BOOLEAN.value)
+            return (self._mark(f'_binary_{operator.name}({lhs}, {rhs})', token), TokenType.BOOLEAN.value)
+        if ((lhs_datatype == rhs_datatype == TokenType.BOOLEAN.value) and (operator in _NATIVE_LOGICAL)):
+            return (f'({lhs} {_NATIVE_LOGICAL[operator]} {rhs})', TokenType.BOOLEAN.value)
+
+        return (self._mark(f'_binary_{operator.name}({lhs}, {rhs})', token), _result_datatype(operator, lhs_datatype, rhs_datatype))
+
+    def _store(self, identifier: Token, value: str, value_datatype: (str | None)) -> None:
+        slot: (int | None) = self._slots.get(identifier.literal)
+        if (slot is not None):
+            self._emit(f'_scope.store({slot}, {value})', identifier)
+            return
+
+        name: str = self._python_name(identifier.literal)
+        if (identifier.literal not in self._datatypes):
+            # Implicit declaration; the datatype is detected from the value
+            self._datatypes[identifier.literal] = value_datatype
+            if (value_datatype == TokenType.ARRAY.value):
+                self._emit(f'{name} = {value}.copy()', identifier)
+            elif (value_datatype is None):
+                self._emit(f'{name} = _copy_if_array({value})', identifier)
+            else:
+                self._emit(f'{name} = {value}', identifier)
+            return
+
+        datatype: (str | None) = self._datatypes[identifier.literal]
+        if (identifier.literal in self._constants):
+            self._emit(f"_fail({value}, 'cannot assign to a constant')", identifier)
+        elif (datatype == TokenType.ARRAY.value):
+            self._emit(f'{name} = _assign_array({repr(identifier.literal)}, {name}, {value})', identifier)
+        elif (datatype is None):
+            # Implicitly declared with a value whose datatype was only known at runtime
+            self._emit(f'{name} = _assign_like({repr(identifier.literal)}, {name}, {value})', identifier)
+        elif (datatype == value_datatype):
+            self._emit(f'{name} = {value}', identifier)
+        elif ((datatype == TokenType.REAL.value) and (value_datatype == TokenType.INTEGER.value)):
+            self._emit(f'{name} = float({value})', identifier)
+        else:
+            self._emit(f'{name} = _coerce_{datatype}({value})', identifier)
+
+    def _input(self, identifier: Token, line: str) -> None:
+        # Mirrors Scope.input() for the variables that are not kept in the scope
+        slot: (int | None) = self._slots.get(identifier.literal)
+        if (slot is not None):
+            self._emit(f'_scope.input({slot}, {line})', identifier)
+            return
+
+        if (identifier.literal not in self._datatypes):
+            self._store(identifier, line, TokenType.STRING.value)
+            return
+
+        datatype: (str | None) = self._datatypes[identifier.literal]
+        if (datatype == TokenType.ARRAY.value):
+            # The line is read before the variable is found not to take it, as it is by the virtual machine
+            self._emit(f"_fail({line}, {repr(f'cannot input into {repr(identifier.literal)}, as it is declared as {datatype}')})", identifier)
+        elif (datatype is None):
+            name: str = self._python_name(identifier.literal)
+            self._emit(f'{name} = _input_like({repr(identifier.literal)}, {name}, {line})', identifier)
+        else:
+            self._store(identifier, f'_parse_input({line}, {repr(datatype)})', datatype)
+
+    def _datatype(self, datatype: Token) -> str:
+        if (datatype.literal not in DATATYPES):
+            raise CompilerError(f"line {datatype.line}, col {datatype.column}; unknown datatype {repr(datatype.literal)}")
+        return datatype.literal
+
+    def _block(self, block: list[statements.Statement], token: (Token | None)) -> None:
+        self._indentation += 1
+        line_count: int = len(self._lines)
+        for statement in block:
+            self._statement(statement)
+        if (len(self._lines) == line_count):
+            # Declarations alone do not generate any code
+            self._emit('pass', token)
+        self._indentation -= 1
+
+    def _statement(self, statement: statements.Statement) -> None:
+        match(statement):
+            case statements.DECLARE_ARRAY():
+                datatype: str = self._datatype(statement.datatype)
+                sizes: str = ''.join(self._expression(size)[0] + ', ' for size in statement.dimensions_sizes)
+                slot: (int | None) = self._slots.get(statement.identifier.literal)
+                if (slot is not None):
+                    self._emit(f'_scope.declare_array({slot}, {repr(datatype)}, ({sizes}))', statement.identifier)
+                else:
+                    # Any other declaration of the variable would have given it a slot
+                    self._datatypes[statement.identifier.literal] = TokenType.ARRAY.value
+                    self._array_datatypes[statement.identifier.literal] = datatype
+                    self._emit(f'{self._python_name(statement.identifier.literal)} = _Array({repr(datatype)}, ({sizes}))', statement.identifier)
+
+            case statements.DECLARE():
+                datatype: str = self._datatype(statement.datatype)
+                slot: (int | None) = self._slots.get(statement.identifier.literal)
+                if (slot is not None):
+                    self._emit(f'_scope.declare({slot}, {repr(datatype)})', statement.identifier)
+                else:
+                    self._datatypes[statement.identifier.literal] = datatype
+                    self._declarations[statement.identifier.literal] = (statement.identifier.line, statement.identifier.column)
+
+            case statements.CONSTANT():
+                value, datatype = self._literal(statement.value)
+                slot: (int | None) = self._slots.get(statement.identifier.literal)
+                if (slot is not None):
+                    self._emit(f'_scope.declare_constant({slot}, {value})', statement.identifier)
+                else:
+                    # Any other declaration of the constant would have given it a slot
+                    self._store(statement.identifier, value, datatype)
+                    self._constants.add(statement.identifier.literal)
+
+            case statements.ASSIGNMENT_ARRAY():
+                value, datatype = self._expression(statement.expression)
+                array: str = self._load(statement.identifier)
+                indexes: str = ''.join(self._expression(index)[0] + ', ' for index in statement.indexes)
+                # The value is evaluated before the array and the indexes, as it is by the virtual machine
+                self._emit(f'_value = {value}', statement.identifier)
+                if (self._datatypes.get(statement.identifier.literal) == TokenType.ARRAY.value):
+                    self._emit(f'{array}.set(({indexes}), _value)', statement.identifier)
+                else:
+                    self._emit(f'_store_index({array}, ({indexes}), _value)', statement.identifier)
+
+            case statements.TYPE() | statements.ASSIGNMENT_FIELD() | statements.GETRECORD():
+                token: Token = statement.identifier
+                raise CompilerError(f"line {token.line}, col {token.column}; records are not supported by the transpiler yet")
+
+            case statements.SEEK():
+                token: Token = first_token(statement.file)
+                raise CompilerError(f"line {token.line}, col {token.column}; records are not supported by the transpiler yet")
+
+            case statements.ASSIGNMENT():
+                self._store(statement.identifier, *self._expression(statement.expression))
+
+            case statements.INPUT():
+                self._input(statement.identifier, '_read_line()')
+
+            case statements.OPENFILE():
+                self._emit(f'_open_file({self._expression(statement.file)[0]}, {FILE_MODES.index(statement.mode.type.value)})', first_token(statement.file))
+
+            case statements.READFILE():
+                self._input(statement.identifier, f'_read_file_line({self._expression(statement.file)[0]})')
+
+            case statements.WRITEFILE():
+                file: str = self._expression(statement.file)[0]
+                self._emit(f'_write_file({file}, _format({self._expression(statement.expression)[0]}))', first_token(statement.file))
+
+            case statements.CLOSEFILE():
+                self._emit(f'_close_file({self._expression(statement.file)[0]})', first_token(statement.file))
+
+            case statements.OUTPUT():
+                parts: list[str] = []
+                for expression in statement.expressions:
+                    value, datatype = self._expression(expression)
+                    if (datatype in _TEXT):
+                        parts.append(value)
+                    elif (datatype in _NUMERIC):
+                        # str() agrees with the OUTPUT format for numbers
+                        parts.append(f'str({value})')
+                    else:
+                        parts.append(f'_format({value})')
+                self._emit(f"_write({' + '.join(parts)} + '\\n')", first_token(statement.expressions[0]))
+
+            case statements.IF():
+                for index, (condition, block) in enumerate(statement.branches):
+                    value, datatype = self._expression(condition)
+                    if (datatype != TokenType.BOOLEAN.value):
+                        value = f'_condition({value})'
+                    token: Token = first_token(condition)
+                    self._emit(f"{'if' if (index == 0) else 'elif'} {value}:", token)
+                    self._block(block, token)
+
+            case statements.WHILE():
+                value, datatype = self._expression(statement.condition)
+                if (datatype != TokenType.BOOLEAN.value):
+                    value = f'_condition({value})'
+                token: Token = first_token(statement.condition)
+                self._emit(f'while {value}:', token)
+                self._block(statement.statements, token)
+
+            case statements.PROCEDURE() | statements.CALL():
+                # RETURN can only be inside a FUNCTION, so it is never reached
+                token: Token = statement.identifier
+                raise CompilerError(f"line {token.line}, col {token.column}; subroutines are not supported by the transpiler yet")
+
+            case _:
+                raise CompilerError(f"unsupported statement {str(statement)}")
+
+    def transpile(self, parsed_program: ParsedProgram) -> TranspiledProgram:
+        try:
+            return self._transpile_program(parsed_program)
+        except RecursionError:
+            raise nesting_error(parsed_program) from None
+
+    def _transpile_program(self, parsed_program: ParsedProgram) -> TranspiledProgram:
+        # Only run for its checks, so that undeclared identifiers are reported before the program runs, as they
+        # are by the compiler
+        Resolver().resolve(parsed_program)
+        self._find_path_dependent(parsed_program.statements, False, set())
+
+        self._emit('def __program__():', None)
+        self._block(parsed_program.statements, None)
+
+        # The CHAR and DATE constants are rebuilt from their source tokens' values when the program runs
+        constants: dict[str, object] = {name: value for (_, value), name in self._constant_names.items()}
+
+        source: str = '\n'.join(self._lines) + '\n'
+        code: types.CodeType = compile(source, GENERATED_FILENAME, 'exec')
+
+        return TranspiledProgram(source, code, self._line_map, self._spans, constants, self._identifiers, self._declarations, list(self._slots))
+
+def _result_datatype(operator: TokenType, lhs_datatype: (str | None), rhs_datatype: (str | None)) -> (str | None):
+    # Datatype of a checked (non-native) operation, where it does not depend on the values themselves
+    match(operator):
+        case TokenType.FORWARD_SLASH:
+            return TokenType.REAL.value
+        case TokenType.INT_DIV:
+            return TokenType.INTEGER.value
+        case TokenType.AMPERSAND:
+            return TokenType.STRING.value
+        case TokenType.EQUALS_TO | TokenType.NOT_EQUALS_TO | TokenType.AND | TokenType.OR:
+            return TokenType.BOOLEAN.value
+        case TokenType.CARET:
+            if (TokenType.REAL.value in (lhs_datatype, rhs_datatype)):
+                return TokenType.REAL.value
+    return None
+
+def _fail(value: object, message: str) -> None:
+    raise TypeError(message)
+
+def _copy_if_array(value: object) -> object:
+    return value.copy() if (type(value) is Array) else value
+
+def _assign_array(identifier: str, array: Array, value: object) -> Array:
+    if (not array.is_compatible(value)):
+        raise TypeError(f"cannot assign {('an ' + repr(value)) if (type(value) is Array) else ('a value of type ' + type_name(value))} to {repr(identifier)}, which is an {repr(array)}")
+    return value.copy()
+
+def _assign_like(identifier: str, variable: object, value: object) -> object:
+    # Assigns to a variable that was implicitly declared with the datatype of the value it holds
+    if (type(variable) is Array):
+        return _assign_array(identifier, variable, value)
+    return COERCERS[type_name(variable)](value)
+
+def _input_like(identifier: str, variable: object, line: str) -> object:
+    if (type(variable) is Array):
+        raise TypeError(f"cannot input into {repr(identifier)}, as it is declared as {TokenType.ARRAY.value}")
+    return parse_input(line, type_name(variable))
+
+def _check_array(value: object) -> Array:
+    if (type(value) is not Array):
+        raise TypeError(f"a value of type {type_name(value)} cannot be indexed")
+    return value
+
+def _load_index(array: object, indexes: tuple[object, ...]) -> object:
+    return _check_array(array).get(indexes)
+
+def _store_index(array: object, indexes: tuple[object, ...], value: object) -> None:
+    _check_array(array).set(indexes, value)
+
+def _condition(value: object) -> bool:
+    if (type(value) is not bool):
+        raise TypeError(f"expected a BOOLEAN condition, got {type_name(value)}")
+    return value
+
+def _runtime_namespace(console: Console, files: FileTable) -> dict[str, object]:
+    namespace: dict[str, object] = {
+        '__builtins__': {'float': float, 'str': str},
+        '_Array': Array,
+        '_write': console.write,
+        '_read_line': console.read_line,
+        '_parse_input': parse_input,
+        '_open_file': files.open,
+        '_read_file_line': files.read_line,
+        '_write_file': files.write_line,
+        '_close_file': files.close,
+        '_file_eof': files.at_end,
+        '_format': format_value,
+        '_fail': _fail,
+        '_copy_if_array': _copy_if_array,
+        '_assign_array': _assign_array,
+        '_assign_like': _assign_like,
+        '_input_like': _input_like,
+        '_load_index': _load_index,
+        '_store_index': _store_index,
+        '_condition': _condition,
+    }
+    for datatype, coercer in COERCERS.items():
+        namespace[f'_coerce_{datatype}'] = coercer
+    for operator, function in BINARY_OPERATORS.items():
+        namespace[f'_binary_{operator.name}'] = function
+    for operator, function in UNARY_OPERATORS.items():
+        namespace[f'_unary_{operator.name}'] = function
+    return namespace
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .limits import *
+from .scope import *
+from .function_cache import *
+from .vm import *
\ No newline at end of file
@@ -0,0 +1,80 @@
+# Standard library imports
+import math
+import datetime
+from collections import OrderedDict
+
+# Local imports
+from ..runtime import Char
+
+# How many calls a FunctionCache remembers, unless it is given another size
+DEFAULT_MAX_ENTRIES: int = 4096
+
+# The types of the values that a call can be remembered by, and that it can return; arrays and records can be
+# changed after the call, so a call that takes or gives one is always made
+_VALUE_TYPES: frozenset[type] = frozenset((int, float, Char, str, bool, datetime.date))
+
+# What get() gives for a call that is not remembered, since a FUNCTION can return any value
+NOT_CACHED: object = object()
+
+class FunctionCache:
+    # The values that the calls of pure FUNCTIONs (see Subroutine.pure) returned, by the FUNCTION and the values
+    # of its arguments, so that a call with the same arguments can be answered without running the FUNCTION
+    # again. Only the max_entries calls used most recently are remembered.
+    # A VirtualMachine that is given one uses it for every run, and empties it at the start of each, as the
+    # FUNCTIONs are those of the program being run; the counts are then those of the latest run
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if (max_entries < 1):
+            raise ValueError(f'a FunctionCache must be able to hold at least 1 entry, not {max_entries}')
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        # Calls that could not be looked up at all, as they take an argument that they cannot be remembered by
+        self.uncacheable: int = 0
+
+    @staticmethod
+    def key(index: int, arguments: list[object]) -> (tuple | None):
+        # What a call of the subroutine at index (in Bytecode.subroutines) is remembered by, or None if it takes
+        # an argument that it cannot be. The types are part of it, as 1 and TRUE are equal in Python, and so
+        # is the sign of zero, as 0.0 and -0.0 are too
+        key: list[object] = [index]
+        for argument in arguments:
+            argument_type: type = type(argument)
+            if (argument_type not in _VALUE_TYPES):
+                return None
+            key.append((argument_type, argument, math.copysign(1.0, argument)) if (argument_type is float) else (argument_type, argument))
+        return tuple(key)
+
+    def get(self, key: (tuple | None)) -> object:
+        # The value that the call returned, or NOT_CACHED
+        if (key is None):
+            self.uncacheable += 1
+            return NOT_CACHED
+        value: object = self._entries.get(key, NOT_CACHED)
+        if (value is NOT_CACHED):
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: (tuple | None), value: object) -> None:
+        if ((key is None) or (type(value) not in _VALUE_TYPES)):
+            return
+        self._entries[key] = value
+        if (len(self._entries) > self.max_entries):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'uncacheable': self.uncacheable, 'evictions': self.evictions, 'entries': len(self._entries), 'max_entries': self.max_entries}
@@ -0,0 +1,19 @@
+class Limits:
+    # What a run of a program is allowed to use; None is no limit. Going over any of them stops the run with a
+    # LimitExceededError.
+    # - max_steps: loop iterations and subroutine calls. The code between two steps runs straight through, so
+    #   it is no longer than the program, and the steps bound the work that a run does without every
+    #   instruction having to be counted
+    # - max_array_elements: elements of any one array, counted over all of its dimensions when it is declared
+    # - max_string_length: characters of any STRING that '&' builds
+    # - max_output: characters written by OUTPUT and WRITEFILE, line endings included
+    def __init__(self, max_steps: (int | None) = None, max_array_elements: (int | None) = None, max_string_length: (int | None) = None, max_output: (int | None) = None) -> None:
+        self.max_steps: (int | None) = max_steps
+        self.max_array_elements: (int | None) = max_array_elements
+        self.max_string_length: (int | None) = max_string_length
+        self.max_output: (int | None) = max_output
+
+class LimitFault(Exception):
+    # Raised where a run goes over a limit; the VirtualMachine reports it as a LimitExceededError, at the
+    # position of the instruction that raised it
+    pass
@@ -0,0 +1,179 @@
+# Standard library imports
+from typing import Callable
+
+# Local imports
+from ..token import TokenType
+from ..runtime import Array, Record, RecordType, COERCERS, type_name, parse_input
+
+# Marks a variable that is declared, but has not been assigned a value yet
+UNBOUND: object = object()
+
+_coerce_STRING: Callable[[object], object] = COERCERS[TokenType.STRING.value]
+
+def _constant_coercer(value: object) -> object:
+    raise TypeError('cannot assign to a constant')
+
+def _array_coercer(identifier: str, array: Array) -> Callable[[object], object]:
+    def coercer(value: object) -> Array:
+        if (not array.is_compatible(value)):
+            raise TypeError(f"cannot assign {('an ' + repr(value)) if (type(value) is Array) else ('a value of type ' + type_name(value))} to {repr(identifier)}, which is an {repr(array)}")
+        # Copy-on-write, so this does not copy any elements yet
+        return value.copy()
+    return coercer
+
+class Scope:
+    # The variables of the main program, or of one call of a subroutine, in the slots that the Resolver gave them
+    def __init__(self, names: list[str]) -> None:
+        # The identifier in every slot, for error messages
+        self.names: list[str] = names
+
+        self.values: list[object] = [UNBOUND] * len(names)
+        self.datatypes: list[(str | None)] = [None] * len(names)
+
+        # Every declared variable has a coercer, which checks (and converts, if needed) a value being
+        # assigned to it; this way a single lookup covers typed variables, arrays and constants alike
+        self.coercers: list[(Callable[[object], object] | None)] = [None] * len(names)
+
+        # The pieces of the STRING variables that are being appended to, by slot, which are only joined once the
+        # variable is loaded. The slot holds UNBOUND in the meantime, so that loading it takes the slow path; a
+        # buffer is only in use while that is the case
+        self.buffers: dict[int, list[str]] = {}
+
+    def _check_redeclaration(self, slot: int, datatype: str) -> None:
+        declared_datatype: (str | None) = self.datatypes[slot]
+        if (declared_datatype is None):
+            return
+        if (self.coercers[slot] is _constant_coercer):
+            raise TypeError(f"{repr(self.names[slot])} is already declared as a constant")
+        if (declared_datatype != datatype):
+            raise TypeError(f"{repr(self.names[slot])} is already declared as {declared_datatype}")
+
+    def declare(self, slot: int, datatype: str) -> None:
+        self._check_redeclaration(slot, datatype)
+        self.datatypes[slot] = datatype
+        self.coercers[slot] = COERCERS[datatype]
+        self.values[slot] = UNBOUND
+        self.buffers.pop(slot, None)
+
+    def declare_array(self, slot: int, datatype: str, dimensions: tuple[int, ...]) -> None:
+        self._check_redeclaration(slot, TokenType.ARRAY.value)
+        array: Array = Array(datatype, dimensions)
+        self.datatypes[slot] = TokenType.ARRAY.value
+        self.coercers[slot] = _array_coercer(self.names[slot], array)
+        self.values[slot] = array
+
+    def declare_record(self, slot: int, record_type: RecordType) -> None:
+        self._check_redeclaration(slot, record_type.name)
+        self.datatypes[slot] = record_type.name
+        self.coercers[slot] = record_type.coerce
+        self.values[slot] = record_type.new()
+
+    def declare_constant(self, slot: int, value: object) -> None:
+        declared_datatype: (str | None) = self.datatypes[slot]
+        if (declared_datatype is None):
+            self.datatypes[slot] = type_name(value)
+        else:
+            if (self.coercers[slot] is _constant_coercer):
+                raise TypeError(f"{repr(self.names[slot])} is already declared as a constant")
+            value = self.coercers[slot](value)
+        self.coercers[slot] = _constant_coercer
+        self.values[slot] = value
+
+    def declare_implicitly(self, slot: int, value: object) -> object:
+        if (type(value) is Array):
+            value = value.copy()
+            self.datatypes[slot] = TokenType.ARRAY.value
+            self.coercers[slot] = _array_coercer(self.names[slot], value)
+        elif (type(value) is Record):
+            value = value.copy()
+            self.datatypes[slot] = value.record_type.name
+            self.coercers[slot] = value.record_type.coerce
+        else:
+            datatype: str = type_name(value)
+            self.datatypes[slot] = datatype
+            self.coercers[slot] = COERCERS[datatype]
+        return value
+
+    def load(self, slot: int) -> object:
+        value: object = self.values[slot]
+        if (value is UNBOUND):
+            value = self.unbound(slot)
+        return value
+
+    def unbound(self, slot: int) -> object:
+        # Only reached once the fast path (indexing the slot) has found it empty: either the variable is being
+        # appended to, or it really has no value
+        buffer: (list[str] | None) = self.buffers.pop(slot, None)
+        if (buffer is not None):
+            value: str = ''.join(buffer)
+            self.values[slot] = value
+            return value
+        if (self.datatypes[slot] is not None):
+            raise NameError(f"{repr(self.names[slot])} is used before being assigned a value")
+        raise NameError(f"{repr(self.names[slot])} is not declared")
+
+    def store(self, slot: int, value: object) -> None:
+        coercer: (Callable[[object], object] | None) = self.coercers[slot]
+        if (coercer is None):
+            self.values[slot] = self.declare_implicitly(slot, value)
+        else:
+            self.values[slot] = coercer(value)
+
+    def buffer(self, slot: int) -> object:
+        # What x <- x & ... appends to: the buffer of a STRING variable, which then takes the place of its value
+        if (self.coercers[slot] is not _coerce_STRING):
+            # A CHAR, a constant, or anything else that might not take the result: assigned the joined pieces
+            # by store_buffer(), as it is for any other concatenation
+            return self.load(slot)
+
+        value: object = self.values[slot]
+        if (value is UNBOUND):
+            buffer: (list[str] | None) = self.buffers.get(slot)
+            if (buffer is None):
+                self.unbound(slot)
+            return buffer
+        buffer: list[str] = [value]
+        self.buffers[slot] = buffer
+        self.values[slot] = UNBOUND
+        return buffer
+
+    def store_buffer(self, slot: int, pieces: list[str]) -> None:
+        if ((self.values[slot] is UNBOUND) and (self.buffers.get(slot) is pieces)):
+            # Appended to in place
+            return
+        self.store(slot, ''.join(pieces))
+
+    def input(self, slot: int, line: str) -> None:
+        datatype: (str | None) = self.datatypes[slot]
+        if (datatype is None):
+            self.values[slot] = self.declare_implicitly(slot, line)
+            return
+        if (datatype not in COERCERS):
+            raise TypeError(f"cannot input into {repr(self.names[slot])}, as it is declared as {datatype}")
+        self.values[slot] = self.coercers[slot](parse_input(line, datatype))
+
+class Reference:
+    # What a BYREF parameter is bound to: the variable itself, in the scope of the caller, rather than its value
+    __slots__ = ('scope', 'slot')
+
+    def __init__(self, scope: Scope, slot: int) -> None:
+        self.scope: Scope = scope
+        self.slot: int = slot
+
+    def bind(self, parameter: str, datatype: str, is_array: bool) -> None:
+        # Checks that the variable suits the parameter; one that is not declared yet is declared as the parameter is
+        declared_datatype: (str | None) = self.scope.datatypes[self.slot]
+        if (is_array):
+            value: object = self.scope.load(self.slot)
+            if ((type(value) is not Array) or (value.datatype != datatype)):
+                raise TypeError(f"the BYREF parameter {repr(parameter)} is an ARRAY OF {datatype}, got {repr(value) if (type(value) is Array) else type_name(value)}")
+        elif (declared_datatype is None):
+            self.scope.declare(self.slot, datatype)
+        elif (declared_datatype != datatype):
+            raise TypeError(f"the BYREF parameter {repr(parameter)} is {datatype}, but {repr(self.scope.names[self.slot])} is declared as {declared_datatype}")
+
+    def load(self) -> object:
+        return self.scope.load(self.slot)
+
+    def store(self, value: object) -> None:
+        self.scope.store(self.slot, value)
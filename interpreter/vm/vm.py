@@ -0,0 +1,429 @@
+# Standard library imports
+import sys
+import math
+import contextlib
+from typing import Callable, TextIO
+
+# Local imports
+from ..token import TokenType
+from ..errors import ExecutionError, LimitExceededError
+from ..console import Console
+from ..files import FileTable
+from ..profiler import Profiler
+from ..compiler import Bytecode, Subroutine, Opcode, BINARY_OPERATIONS, UNARY_OPERATIONS, SCOPE_LOCAL, SCOPE_GLOBAL
+from ..runtime import Array, Record, COERCERS, BINARY_OPERATORS, UNARY_OPERATORS, RUNTIME_FAULTS, type_name, format_value, describe_fault, concatenate, Char
+from .scope import Scope, Reference, UNBOUND
+from .limits import Limits, LimitFault
+from .function_cache import FunctionCache, NOT_CACHED
+
+# Subroutine calls nested any deeper than this are taken to be runaway recursion
+MAX_CALL_DEPTH: int = 10000
+
+# What a limit that is not set counts down from, so that a run without limits makes the same checks as one with them
+_UNLIMITED: int = sys.maxsize
+
+class VirtualMachine:
+    def __init__(self, input_stream: TextIO = sys.stdin, output_stream: TextIO = sys.stdout, interactive: (bool | None) = None, limits: (Limits | None) = None, function_cache: (FunctionCache | None) = None) -> None:
+        # Kept across runs, so that a run does not lose any input that was read ahead by an earlier one
+        self._console: Console = Console(input_stream, output_stream, interactive)
+
+        # Applied to every run separately
+        self._limits: Limits = Limits() if (limits is None) else limits
+
+        # Memoizes the calls of pure FUNCTIONs when it is given; without one, every call is made, as the spec has it
+        self.function_cache: (FunctionCache | None) = function_cache
+
+        self._binary_operations: list[Callable[[object, object], object]] = [BINARY_OPERATORS[operator] for operator in BINARY_OPERATIONS]
+        self._unary_operations: list[Callable[[object], object]] = [UNARY_OPERATORS[operator] for operator in UNARY_OPERATIONS]
+
+    def _input(self, scope: Scope, slot: int) -> None:
+        scope.input(slot, self._console.read_line())
+
+    @staticmethod
+    def _read_file(files: FileTable, name: object, scope: Scope, slot: int) -> None:
+        scope.input(slot, files.read_line(name))
+
+    @staticmethod
+    def _check_array(dimensions: tuple[object, ...], max_array_elements: int) -> None:
+        # Sizes that are not positive INTEGERs are left for Array to report
+        if (all(((type(size) is int) and (size >= 1)) for size in dimensions)):
+            elements: int = math.prod(dimensions)
+            if (elements > max_array_elements):
+                raise LimitFault(f"an array of {elements} elements is larger than the limit of {max_array_elements}")
+
+    @staticmethod
+    def _limited_concatenation(concatenate: Callable[[object, object], object], max_string_length: int) -> Callable[[object, object], object]:
+        # '&' of two operands is a BINARY_OP, which only checks the length of its result when there is a limit
+        def concatenation(lhs: object, rhs: object) -> object:
+            value: object = concatenate(lhs, rhs)
+            if (len(value) > max_string_length):
+                raise LimitFault(f"a STRING of {len(value)} characters is longer than the limit of {max_string_length}")
+            return value
+        return concatenation
+
+    def _bind(self, subroutine: Subroutine, arguments: list[object]) -> Scope:
+        # The scope of a call of the subroutine, where the parameters are the first slots
+        scope: Scope = Scope(subroutine.bytecode.names)
+        values: list[object] = scope.values
+        for slot, ((identifier, datatype, is_array, by_reference), argument) in enumerate(zip(subroutine.parameters, arguments)):
+            if (by_reference):
+                argument.bind(identifier, datatype, is_array)
+                values[slot] = argument
+            elif (is_array):
+                if ((type(argument) is not Array) or (argument.datatype != datatype)):
+                    raise TypeError(f"the parameter {repr(identifier)} is an ARRAY OF {datatype}, got {repr(argument) if (type(argument) is Array) else type_name(argument)}")
+                # Passed by value, which copy-on-write makes as cheap as passing it by reference until it is changed
+                values[slot] = scope.declare_implicitly(slot, argument)
+            else:
+                scope.declare(slot, datatype)
+                values[slot] = scope.coercers[slot](argument)
+        return scope
+
+    def run(self, bytecode: Bytecode, profiler: (Profiler | None) = None) -> None:
+        # The profiler is told about every call and return, and about every statement of code that was compiled
+        # with Compiler(profile=True)
+        LOAD_CONST: int = Opcode.LOAD_CONST.value
+        LOAD_LOCAL: int = Opcode.LOAD_LOCAL.value
+        STORE_LOCAL: int = Opcode.STORE_LOCAL.value
+        DECLARE: int = Opcode.DECLARE.value
+        DECLARE_ARRAY: int = Opcode.DECLARE_ARRAY.value
+        DECLARE_STATIC_ARRAY: int = Opcode.DECLARE_STATIC_ARRAY.value
+        DECLARE_CONSTANT: int = Opcode.DECLARE_CONSTANT.value
+        LOAD_GLOBAL: int = Opcode.LOAD_GLOBAL.value
+        STORE_GLOBAL: int = Opcode.STORE_GLOBAL.value
+        LOAD_DEREF: int = Opcode.LOAD_DEREF.value
+        STORE_DEREF: int = Opcode.STORE_DEREF.value
+        LOAD_REFERENCE: int = Opcode.LOAD_REFERENCE.value
+        LOAD_BUFFER: int = Opcode.LOAD_BUFFER.value
+        STORE_BUFFER: int = Opcode.STORE_BUFFER.value
+        LOAD_INDEX: int = Opcode.LOAD_INDEX.value
+        STORE_INDEX: int = Opcode.STORE_INDEX.value
+        BINARY_OP: int = Opcode.BINARY_OP.value
+        UNARY_OP: int = Opcode.UNARY_OP.value
+        CONCAT: int = Opcode.CONCAT.value
+        JUMP: int = Opcode.JUMP.value
+        POP_JUMP_IF_FALSE: int = Opcode.POP_JUMP_IF_FALSE.value
+        CALL: int = Opcode.CALL.value
+        RETURN_VALUE: int = Opcode.RETURN_VALUE.value
+        RETURN: int = Opcode.RETURN.value
+        OUTPUT: int = Opcode.OUTPUT.value
+        INPUT: int = Opcode.INPUT.value
+        OPEN_FILE: int = Opcode.OPEN_FILE.value
+        READ_FILE: int = Opcode.READ_FILE.value
+        WRITE_FILE: int = Opcode.WRITE_FILE.value
+        CLOSE_FILE: int = Opcode.CLOSE_FILE.value
+        FILE_EOF: int = Opcode.FILE_EOF.value
+        SEEK_FILE: int = Opcode.SEEK_FILE.value
+        GET_RECORD: int = Opcode.GET_RECORD.value
+        PUT_RECORD: int = Opcode.PUT_RECORD.value
+        DECLARE_RECORD: int = Opcode.DECLARE_RECORD.value
+        LOAD_FIELD: int = Opcode.LOAD_FIELD.value
+        STORE_FIELD: int = Opcode.STORE_FIELD.value
+        SAVE_TEMPORARY: int = Opcode.SAVE_TEMPORARY.value
+        LOAD_TEMPORARY: int = Opcode.LOAD_TEMPORARY.value
+        LINE: int = Opcode.LINE.value
+
+        code: list[int] = bytecode.code
+        constants: list[object] = bytecode.constants
+        subroutines: list[Subroutine] = bytecode.subroutines
+
+        # The main program's variables, and those of the scope being run
+        global_scope: Scope = Scope(bytecode.names)
+        scope: Scope = global_scope
+        values: list[object] = scope.values
+        coercers: list[(Callable[[object], object] | None)] = scope.coercers
+
+        # The types of the values that '&' takes
+        texts: tuple[type, ...] = (str, Char)
+
+        binary_operations: list[Callable[[object, object], object]] = self._binary_operations
+        unary_operations: list[Callable[[object], object]] = self._unary_operations
+        write: Callable[[str], None] = self._console.write
+
+        # The files that the program has open, which are closed when it ends
+        files: FileTable = FileTable()
+
+        stack: list[object] = []
+        push: Callable[[object], None] = stack.append
+        pop: Callable[[], object] = stack.pop
+
+        # The subroutine being run (None for the main program), and the state of each caller that is waiting
+        # for a call to return: (bytecode, pc, scope, subroutine)
+        subroutine: (Subroutine | None) = None
+        frames: list[tuple[Bytecode, int, Scope, (Subroutine | None)]] = []
+
+        # Counted down as the program runs; steps are loop iterations (jumps backwards) and calls
+        limits: Limits = self._limits
+        steps: int = _UNLIMITED if (limits.max_steps is None) else limits.max_steps
+        output_left: int = _UNLIMITED if (limits.max_output is None) else limits.max_output
+        max_string_length: int = _UNLIMITED if (limits.max_string_length is None) else limits.max_string_length
+        max_array_elements: int = _UNLIMITED if (limits.max_array_elements is None) else limits.max_array_elements
+        if (limits.max_string_length is not None):
+            binary_operations = binary_operations.copy()
+            index: int = BINARY_OPERATIONS.index(TokenType.AMPERSAND)
+            binary_operations[index] = self._limited_concatenation(binary_operations[index], max_string_length)
+
+        # The keys of the calls of pure FUNCTIONs that are being made, which their values are remembered by when
+        # they return
+        function_cache: (FunctionCache | None) = self.function_cache
+        call_keys: list[(tuple | None)] = []
+        if (function_cache is not None):
+            function_cache.clear()
+
+        pc: int = 0
+        end: int = len(code)
+
+        if (profiler is not None):
+            profiler.start()
+
+        try:
+            while (pc < end):
+                opcode: int = code[pc]
+                argument: int = code[pc + 1]
+                pc += 2
+
+                if (opcode == LOAD_LOCAL):
+                    value: object = values[argument]
+                    if (value is UNBOUND):
+                        value = scope.unbound(argument)
+                    push(value)
+                elif (opcode == LOAD_CONST):
+                    push(constants[argument])
+                elif (opcode == BINARY_OP):
+                    rhs: object = pop()
+                    stack[-1] = binary_operations[argument](stack[-1], rhs)
+                elif (opcode == STORE_LOCAL):
+                    coercer: (Callable[[object], object] | None) = coercers[argument]
+                    if (coercer is None):
+                        values[argument] = scope.declare_implicitly(argument, pop())
+                    else:
+                        values[argument] = coercer(pop())
+                elif (opcode == POP_JUMP_IF_FALSE):
+                    condition: object = pop()
+                    if (condition is False):
+                        pc = argument
+                    elif (condition is not True):
+                        raise TypeError(f"expected a BOOLEAN condition, got {type_name(condition)}")
+                elif (opcode == JUMP):
+                    if (argument < pc):
+                        steps -= 1
+                        if (steps < 0):
+                            raise LimitFault(f"the program took more than {limits.max_steps} steps")
+                    pc = argument
+                elif (opcode == LOAD_INDEX):
+                    indexes: tuple[object, ...] = tuple(stack[-argument:])
+                    del stack[-argument:]
+                    array: object = stack[-1]
+                    if (type(array) is not Array):
+                        raise TypeError(f"a value of type {type_name(array)} cannot be indexed")
+                    stack[-1] = array.get(indexes)
+                elif (opcode == STORE_INDEX):
+                    indexes: tuple[object, ...] = tuple(stack[-argument:])
+                    del stack[-argument:]
+                    array: object = pop()
+                    if (type(array) is not Array):
+                        raise TypeError(f"a value of type {type_name(array)} cannot be indexed")
+                    array.set(indexes, pop())
+                elif (opcode == LOAD_TEMPORARY):
+                    push(values[argument])
+                elif (opcode == SAVE_TEMPORARY):
+                    values[argument] = stack[-1]
+                elif (opcode == LOAD_FIELD):
+                    record: object = stack[-1]
+                    if (type(record) is not Record):
+                        raise TypeError(f"a value of type {type_name(record)} has no fields")
+                    stack[-1] = record.get(constants[argument])
+                elif (opcode == STORE_FIELD):
+                    record: object = pop()
+                    if (type(record) is not Record):
+                        raise TypeError(f"a value of type {type_name(record)} has no fields")
+                    record.set(constants[argument], pop())
+                elif (opcode == UNARY_OP):
+                    stack[-1] = unary_operations[argument](stack[-1])
+                elif (opcode == CONCAT):
+                    # The lhs is either the first operand of the chain, or the list of the pieces so far (no value
+                    # of the language is a list); each step is checked as a '&' operation of its own would be
+                    rhs: object = pop()
+                    pieces: object = stack[-1]
+                    if (type(pieces) is list):
+                        if (type(rhs) not in texts):
+                            concatenate('', rhs)
+                        pieces.append(rhs)
+                    else:
+                        if ((type(pieces) not in texts) or (type(rhs) not in texts)):
+                            concatenate(pieces, rhs)
+                        pieces = stack[-1] = [pieces, rhs]
+                    if (argument):
+                        joined: str = ''.join(pieces)
+                        stack[-1] = joined
+                        if (len(joined) > max_string_length):
+                            raise LimitFault(f"a STRING of {len(joined)} characters is longer than the limit of {max_string_length}")
+                elif (opcode == LOAD_BUFFER):
+                    target, slot = constants[argument]
+                    if (target == SCOPE_LOCAL):
+                        push(scope.buffer(slot))
+                    elif (target == SCOPE_GLOBAL):
+                        push(global_scope.buffer(slot))
+                    else:
+                        reference: Reference = values[slot]
+                        push(reference.scope.buffer(reference.slot))
+                elif (opcode == STORE_BUFFER):
+                    # A STRING that is appended to in place is measured whenever its number of pieces doubles,
+                    # which costs a constant amount per append, and lets it go at most twice over the limit
+                    pieces: list[object] = stack[-1]
+                    count: int = len(pieces)
+                    if (((count & (count - 1)) == 0) and (sum(map(len, pieces)) > max_string_length)):
+                        raise LimitFault(f"a STRING of {sum(map(len, pieces))} characters is longer than the limit of {max_string_length}")
+                    target, slot = constants[argument]
+                    if (target == SCOPE_LOCAL):
+                        scope.store_buffer(slot, pop())
+                    elif (target == SCOPE_GLOBAL):
+                        global_scope.store_buffer(slot, pop())
+                    else:
+                        reference: Reference = values[slot]
+                        reference.scope.store_buffer(reference.slot, pop())
+                elif (opcode == LOAD_GLOBAL):
+                    push(global_scope.load(argument))
+                elif (opcode == STORE_GLOBAL):
+                    global_scope.store(argument, pop())
+                elif (opcode == LOAD_DEREF):
+                    push(values[argument].load())
+                elif (opcode == STORE_DEREF):
+                    values[argument].store(pop())
+                elif (opcode == CALL):
+                    callee: Subroutine = subroutines[argument]
+                    count: int = len(callee.parameters)
+                    arguments: list[object] = []
+                    if (count):
+                        arguments = stack[-count:]
+                        del stack[-count:]
+                    steps -= 1
+                    if (steps < 0):
+                        raise LimitFault(f"the program took more than {limits.max_steps} steps")
+                    if (len(frames) == MAX_CALL_DEPTH):
+                        raise RecursionError(f"subroutine calls are nested more than {MAX_CALL_DEPTH} deep")
+                    if ((function_cache is not None) and callee.pure):
+                        key: (tuple | None) = function_cache.key(argument, arguments)
+                        value = function_cache.get(key)
+                        if (value is not NOT_CACHED):
+                            push(value)
+                            continue
+                        call_keys.append(key)
+                    callee_scope: Scope = self._bind(callee, arguments)
+                    if (profiler is not None):
+                        profiler.call(callee.name)
+
+                    frames.append((bytecode, pc, scope, subroutine))
+                    (bytecode, pc, scope, subroutine) = (callee.bytecode, 0, callee_scope, callee)
+                    (code, constants, end) = (bytecode.code, bytecode.constants, len(bytecode.code))
+                    (values, coercers) = (scope.values, scope.coercers)
+                elif (opcode == RETURN_VALUE):
+                    value: object = COERCERS[subroutine.returns](pop())
+                    if ((function_cache is not None) and subroutine.pure):
+                        function_cache.put(call_keys.pop(), value)
+                    if (profiler is not None):
+                        profiler.return_()
+                    (bytecode, pc, scope, subroutine) = frames.pop()
+                    (code, constants, end) = (bytecode.code, bytecode.constants, len(bytecode.code))
+                    (values, coercers) = (scope.values, scope.coercers)
+                    push(value)
+                elif (opcode == RETURN):
+                    if (subroutine.returns is not None):
+                        raise ValueError(f"FUNCTION {repr(subroutine.name)} ended without returning a value")
+                    if (profiler is not None):
+                        profiler.return_()
+                    (bytecode, pc, scope, subroutine) = frames.pop()
+                    (code, constants, end) = (bytecode.code, bytecode.constants, len(bytecode.code))
+                    (values, coercers) = (scope.values, scope.coercers)
+                elif (opcode == LOAD_REFERENCE):
+                    target, slot = constants[argument]
+                    if (target == SCOPE_LOCAL):
+                        push(Reference(scope, slot))
+                    elif (target == SCOPE_GLOBAL):
+                        push(Reference(global_scope, slot))
+                    else:
+                        # Passed on as it is, so it still refers to the variable of the original caller
+                        push(values[slot])
+                elif (opcode == OUTPUT):
+                    output: list[object] = stack[-argument:]
+                    del stack[-argument:]
+                    line: str = ''.join([format_value(value) for value in output]) + '\n'
+                    output_left -= len(line)
+                    if (output_left < 0):
+                        raise LimitFault(f"the program output more than {limits.max_output} characters")
+                    write(line)
+                elif (opcode == INPUT):
+                    target, slot = constants[argument]
+                    if (target == SCOPE_LOCAL):
+                        self._input(scope, slot)
+                    elif (target == SCOPE_GLOBAL):
+                        self._input(global_scope, slot)
+                    else:
+                        reference: Reference = values[slot]
+                        self._input(reference.scope, reference.slot)
+                elif (opcode == READ_FILE):
+                    target, slot = constants[argument]
+                    name: object = pop()
+                    if (target == SCOPE_LOCAL):
+                        self._read_file(files, name, scope, slot)
+                    elif (target == SCOPE_GLOBAL):
+                        self._read_file(files, name, global_scope, slot)
+                    else:
+                        reference: Reference = values[slot]
+                        self._read_file(files, name, reference.scope, reference.slot)
+                elif (opcode == FILE_EOF):
+                    stack[-1] = files.at_end(stack[-1])
+                elif (opcode == WRITE_FILE):
+                    line: str = format_value(pop())
+                    output_left -= len(line) + 1
+                    if (output_left < 0):
+                        raise LimitFault(f"the program output more than {limits.max_output} characters")
+                    files.write_line(pop(), line)
+                elif (opcode == GET_RECORD):
+                    record: object = pop()
+                    files.get_record(pop(), record)
+                elif (opcode == PUT_RECORD):
+                    record: object = pop()
+                    files.put_record(pop(), record)
+                elif (opcode == SEEK_FILE):
+                    address: object = pop()
+                    files.seek(pop(), address)
+                elif (opcode == OPEN_FILE):
+                    files.open(pop(), argument)
+                elif (opcode == CLOSE_FILE):
+                    files.close(pop())
+                elif (opcode == DECLARE):
+                    scope.declare(*constants[argument])
+                elif (opcode == DECLARE_ARRAY):
+                    slot, datatype, dimensions_count = constants[argument]
+                    dimensions: tuple[object, ...] = tuple(stack[-dimensions_count:])
+                    del stack[-dimensions_count:]
+                    self._check_array(dimensions, max_array_elements)
+                    scope.declare_array(slot, datatype, dimensions)
+                elif (opcode == DECLARE_RECORD):
+                    scope.declare_record(*constants[argument])
+                elif (opcode == DECLARE_STATIC_ARRAY):
+                    self._check_array(constants[argument][2], max_array_elements)
+                    scope.declare_array(*constants[argument])
+                elif (opcode == DECLARE_CONSTANT):
+                    scope.declare_constant(argument, pop())
+                elif (opcode == LINE):
+                    if (profiler is not None):
+                        profiler.line(argument)
+                else:
+                    raise ValueError(f"unknown opcode {opcode}")
+            files.close_all()
+        except RUNTIME_FAULTS as error:
+            line, column = bytecode.position(pc - 2)
+            raise ExecutionError(f"line {line}, col {column}; {describe_fault(error)}") from None
+        except LimitFault as fault:
+            line, column = bytecode.position(pc - 2)
+            raise LimitExceededError(f"line {line}, col {column}; {fault}") from None
+        finally:
+            # Stopped however the run ends, so that a program that failed, or was interrupted, can still be profiled
+            if (profiler is not None):
+                profiler.stop()
+            # Whatever was written to a file is kept even if the program stops with an error
+            with contextlib.suppress(OSError):
+                files.close_all()
+            self._console.flush()